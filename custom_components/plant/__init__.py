@@ -2,9 +2,12 @@
 
 from __future__ import annotations
 
+import base64
+import itertools
 import logging
 import os
-from datetime import datetime
+import time
+from typing import Callable
 
 import voluptuous as vol
 
@@ -24,8 +27,9 @@ from homeassistant.const import (
     STATE_PROBLEM,
     STATE_UNAVAILABLE,
     STATE_UNKNOWN,
+    EVENT_HOMEASSISTANT_STARTED,
 )
-from homeassistant.core import HomeAssistant, callback
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
 from homeassistant.helpers import (
     config_validation as cv,
     device_registry as dr,
@@ -33,8 +37,7 @@ from homeassistant.helpers import (
 )
 from homeassistant.helpers.entity import Entity, async_generate_entity_id
 from homeassistant.helpers.entity_component import EntityComponent
-from homeassistant.helpers.storage import Store
-from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.event import async_call_later, async_track_state_change_event
 
 from .const import (
     ATTR_CONDUCTIVITY,
@@ -107,11 +110,8 @@ from .const import (
     ICON_DEVICE_PLANT,
     ICON_DEVICE_CYCLE,
     CYCLE_DOMAIN,
+    CYCLE_MEDIAN_UPDATE_DELAY,
     AGGREGATION_MEDIAN,
-    AGGREGATION_MEAN,
-    AGGREGATION_MIN,
-    AGGREGATION_MAX,
-    AGGREGATION_ORIGINAL,
     DEFAULT_AGGREGATIONS,
     ATTR_ORIGINAL_FLOWERING_DURATION,
     ATTR_WATER_CONSUMPTION,
@@ -123,14 +123,58 @@ from .const import (
     ATTR_POSITION_X,
     ATTR_POSITION_Y,
     ATTR_PH,
+    DATA_EXPORT_JOBS,
+    DATA_IMAGE_UPLOADS,
+    DATA_UPLOAD_VIEW,
+    DATA_PLANT_HISTORY,
+    DATA_PLANT_REGISTRY,
+    DATA_WINDOW_STORE,
 )
+from .plant_aggregation import MemberAggregator
 from .plant_helpers import PlantHelper
+from .plant_ids import async_reserve_ids
+from .plant_info import project_info, static_info
+from .plant_info_subscription import async_plant_added, async_subscribe_info
+from .plant_registry import PlantRegistry
+from .plant_status import (
+    STATUS_HIGH,
+    STATUS_LOW,
+    STATUS_OK,
+    ThresholdEngine,
+    evaluate_engines,
+    parse_value,
+)
+from .plant_upload import (
+    PlantImageUploadView,
+    async_get_image_uploads,
+    async_get_upload_target,
+)
+from .plant_window_store import PlantWindowStore
 from .services import async_setup_services, async_unload_services
 from .sensor_configuration import get_decimals_for
 
 _LOGGER = logging.getLogger(__name__)
+
+# Versionen der websocket_info Snapshots, auch über Neustarts hinweg aufsteigend
+_INFO_VERSIONS = itertools.count(time.time_ns() // 1000)
 PLATFORMS = [Platform.NUMBER, Platform.SENSOR, Platform.SELECT, Platform.TEXT]
 
+# Slots, deren aktueller Wert bei Cycles aus den aggregierten Member-Werten kommt
+CYCLE_MEDIAN_KEYS = (
+    "temperature",
+    "moisture",
+    "conductivity",
+    "illuminance",
+    "humidity",
+    "CO2",
+    "dli",
+)
+THRESHOLD_STATUS_STATES = {
+    STATUS_LOW: STATE_LOW,
+    STATUS_OK: STATE_OK,
+    STATUS_HIGH: STATE_HIGH,
+}
+
 # Use this during testing to generate some dummy-sensors
 # to provide random readings for temperature, moisture etc.
 SETUP_DUMMY_SENSORS = False
@@ -145,13 +189,72 @@ def _async_find_matching_config_entry(hass: HomeAssistant) -> ConfigEntry | None
 
 async def _get_next_id(hass: HomeAssistant, device_type: str) -> str:
     """Get next ID from storage based on device type."""
-    store = Store(hass, version=1, key=f"{DOMAIN}_{device_type}_counter")
-    data = await store.async_load() or {"counter": 0}
-    
-    next_id = data["counter"] + 1
-    await store.async_save({"counter": next_id})
-    
-    return f"{next_id:04d}"  # Formatiert als 4-stellige Nummer mit führenden Nullen
+    return (await async_reserve_ids(hass, device_type))[0]
+
+@callback
+def _async_get_plant_registry(hass: HomeAssistant) -> PlantRegistry:
+    """Return the plant registry, create it (incl. rename listener) on first use."""
+    if DATA_PLANT_REGISTRY not in hass.data:
+        plant_registry = PlantRegistry()
+        hass.data[DATA_PLANT_REGISTRY] = plant_registry
+
+        @callback
+        def _handle_entity_registry_updated(event) -> None:
+            """Halte den Index bei Umbenennungen der entity_id aktuell."""
+            if event.data.get("action") != "update" or "old_entity_id" not in event.data:
+                return
+            plant_registry.rename(event.data["old_entity_id"], event.data["entity_id"])
+            # Die Snapshots enthalten die entity_ids
+            for plant in plant_registry:
+                plant.invalidate_websocket_info()
+
+        @callback
+        def _handle_device_registry_updated(event) -> None:
+            """Spiegele via_device_id Änderungen (Cycle-Zuordnung) im Index."""
+            device_id = event.data.get("device_id")
+            if event.data.get("action") == "remove":
+                plant_registry.remove_device(device_id)
+                return
+            if event.data.get("action") == "update" and "via_device_id" not in event.data.get("changes", {}):
+                return
+            device = dr.async_get(hass).async_get(device_id)
+            if device is None or not any(ident[0] == DOMAIN for ident in device.identifiers):
+                return
+            plant_registry.set_via_device(device.id, device.via_device_id)
+
+        plant_registry.unsub_listeners.append(
+            hass.bus.async_listen(
+                er.EVENT_ENTITY_REGISTRY_UPDATED, _handle_entity_registry_updated
+            )
+        )
+        plant_registry.unsub_listeners.append(
+            hass.bus.async_listen(
+                dr.EVENT_DEVICE_REGISTRY_UPDATED, _handle_device_registry_updated
+            )
+        )
+
+        @callback
+        def _handle_homeassistant_started(_event) -> None:
+            """Werte nach dem Start alle Plants/Cycles in einem Durchlauf aus."""
+            if hass.data.get(DATA_PLANT_REGISTRY) is plant_registry:
+                _async_evaluate_all_plants(plant_registry)
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STARTED, _handle_homeassistant_started)
+    return hass.data[DATA_PLANT_REGISTRY]
+
+
+@callback
+def _async_evaluate_all_plants(plant_registry: PlantRegistry) -> None:
+    """Re-evaluate the thresholds of all loaded plants at once (vectorized if NumPy is available)."""
+    plants = [plant for plant in plant_registry if plant.hass is not None]
+    for plant in plants:
+        if not plant._threshold_synced:
+            plant._sync_threshold_engine()
+    results = evaluate_engines([plant._threshold_engine for plant in plants])
+    for plant, (statuses, problem) in zip(plants, results):
+        plant.apply_threshold_result(statuses, problem)
+        plant.async_write_ha_state()
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Plant from a config entry."""
@@ -164,10 +267,10 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         
         # Aktualisiere den kWh Preis in allen Plants/Cycles
         kwh_price = entry.data[FLOW_PLANT_INFO].get(ATTR_KWH_PRICE, DEFAULT_KWH_PRICE)
-        for domain_entry_id in hass.data[DOMAIN]:
-            if ATTR_PLANT in hass.data[DOMAIN][domain_entry_id]:
-                plant = hass.data[DOMAIN][domain_entry_id][ATTR_PLANT]
-                plant.update_kwh_price(kwh_price)
+        for plant in _async_get_plant_registry(hass):
+            plant.update_kwh_price(kwh_price)
+            # Der Bildpfad steht in der websocket_info
+            plant.invalidate_websocket_info()
         
         return True
 
@@ -207,6 +310,9 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     )
 
     hass.data[DOMAIN][entry.entry_id][ATTR_PLANT] = plant
+    plant_registry = _async_get_plant_registry(hass)
+    plant_registry.register(entry.entry_id, plant, device.id)
+    plant_registry.set_via_device(device.id, device.via_device_id)
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
@@ -217,6 +323,10 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     # Add all the entities to Hass
     component = EntityComponent(_LOGGER, plant.device_type, hass)
     await component.async_add_entities(plant_entities)
+    # Die Entity Registry kann eine andere entity_id vergeben haben
+    plant_registry.reindex(entry.entry_id, device.id)
+    # Laufende plant/subscribe_info Abos (z.B. nach einem Neuladen) folgen der neuen Pflanze
+    async_plant_added(hass, plant)
 
     # Add the rest of the entities to device registry together with plant
     device_id = plant.device_id
@@ -237,9 +347,18 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     
     # Registriere WebSocket Commands
     websocket_api.async_register_command(hass, ws_get_info)
+    websocket_api.async_register_command(hass, ws_subscribe_info)
+    websocket_api.async_register_command(hass, ws_get_all_info)
+    websocket_api.async_register_command(hass, ws_get_static_info)
     websocket_api.async_register_command(hass, ws_upload_image)
+    # Views lassen sich nicht wieder entfernen, daher nur einmal registrieren
+    if not hass.data.get(DATA_UPLOAD_VIEW):
+        hass.http.register_view(PlantImageUploadView())
+        hass.data[DATA_UPLOAD_VIEW] = True
     websocket_api.async_register_command(hass, ws_delete_image)
     websocket_api.async_register_command(hass, ws_set_main_image)
+    websocket_api.async_register_command(hass, ws_export_subscribe)
+    websocket_api.async_register_command(hass, ws_export_cancel)
     
     plant.async_schedule_update_ha_state(True)
 
@@ -268,12 +387,10 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     # Wenn ein neuer Cycle erstellt wurde, aktualisiere alle Plant Cycle Selects
     if plant.device_type == DEVICE_TYPE_CYCLE:
-        for entry_id in hass.data[DOMAIN]:
-            if ATTR_PLANT in hass.data[DOMAIN][entry_id]:
-                other_plant = hass.data[DOMAIN][entry_id][ATTR_PLANT]
-                if other_plant.device_type == DEVICE_TYPE_PLANT and other_plant.cycle_select:
-                    other_plant.cycle_select._update_cycle_options()
-                    other_plant.cycle_select.async_write_ha_state()
+        for other_plant in plant_registry.plants(DEVICE_TYPE_PLANT):
+            if other_plant.cycle_select:
+                other_plant.cycle_select._update_cycle_options()
+                other_plant.cycle_select.async_write_ha_state()
 
     return True
 
@@ -305,18 +422,20 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         # Entferne zuerst die Daten
         hass.data[DOMAIN].pop(entry.entry_id)
         hass.data[DATA_UTILITY].pop(entry.entry_id)
+        if DATA_PLANT_REGISTRY in hass.data:
+            hass.data[DATA_PLANT_REGISTRY].unregister(entry.entry_id)
         
         # Wenn ein Cycle entfernt wird, aktualisiere alle Plant Cycle Selects
         if FLOW_PLANT_INFO in entry.data and entry.data[FLOW_PLANT_INFO].get("device_type") == DEVICE_TYPE_CYCLE:
             _LOGGER.debug("Unloading cycle entry, updating cycle selects")
             
             async def update_cycle_selects(_now=None):
-                for entry_id in hass.data[DOMAIN]:
-                    if ATTR_PLANT in hass.data[DOMAIN][entry_id]:
-                        plant = hass.data[DOMAIN][entry_id][ATTR_PLANT]
-                        if plant.device_type == DEVICE_TYPE_PLANT and plant.cycle_select:
-                            plant.cycle_select._update_cycle_options()
-                            plant.cycle_select.async_write_ha_state()
+                if DATA_PLANT_REGISTRY not in hass.data:
+                    return
+                for plant in hass.data[DATA_PLANT_REGISTRY].plants(DEVICE_TYPE_PLANT):
+                    if plant.cycle_select:
+                        plant.cycle_select._update_cycle_options()
+                        plant.cycle_select.async_write_ha_state()
             
             # Verzögere die Aktualisierung um 1 Sekunde
             async_call_later(hass, 1, update_cycle_selects)
@@ -330,21 +449,59 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             _LOGGER.info("Removing domain %s", DOMAIN)
             await async_unload_services(hass)
             del hass.data[DOMAIN]
+            plant_registry = hass.data.pop(DATA_PLANT_REGISTRY, None)
+            if plant_registry is not None:
+                for unsub in plant_registry.unsub_listeners:
+                    unsub()
+            window_store = hass.data.pop(DATA_WINDOW_STORE, None)
+            if window_store is not None:
+                for unsub in window_store.unsub_listeners:
+                    unsub()
+                await window_store.async_save()
+            plant_history = hass.data.pop(DATA_PLANT_HISTORY, None)
+            if plant_history is not None:
+                plant_history.async_shutdown()
+            export_jobs = hass.data.pop(DATA_EXPORT_JOBS, None)
+            if export_jobs is not None:
+                export_jobs.async_shutdown()
+            image_uploads = hass.data.pop(DATA_IMAGE_UPLOADS, None)
+            if image_uploads is not None:
+                await image_uploads.async_shutdown()
             
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove the window snapshots of a deleted plant/cycle."""
+    if entry.data.get("is_config", False):
+        return
+    # Nach dem Entladen der letzten Plant gibt es keinen geteilten Store mehr
+    window_store = hass.data.get(DATA_WINDOW_STORE) or PlantWindowStore(hass)
+    await window_store.async_load()
+    window_store.remove(f"{entry.entry_id}-")
+    await window_store.async_save()
+
+
 @websocket_api.websocket_command(
     {
         vol.Required("type"): "plant/get_info",
         vol.Required("entity_id"): str,
+        vol.Optional("if_version"): int,
+        vol.Optional("fields"): [str],
     }
 )
 @callback
 def ws_get_info(
     hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict
 ) -> None:
-    """Handle the websocket command."""
+    """Handle the websocket command.
+
+    With if_version the client passes the version it already has, an
+    unchanged plant then only returns not_modified. fields limits the
+    returned parts (see plant_info.project_info). The version belongs to
+    the full snapshot, not to a projection: if_version only fits a request
+    with the same fields as the one that returned the version.
+    """
     # _LOGGER.debug("Got websocket request: %s", msg)
 
     if DOMAIN not in hass.data:
@@ -353,24 +510,227 @@ def ws_get_info(
         )
         return
 
-    for key in hass.data[DOMAIN]:
-        if not ATTR_PLANT in hass.data[DOMAIN][key]:
-            continue
-        plant_entity = hass.data[DOMAIN][key][ATTR_PLANT]
-        if plant_entity.entity_id == msg["entity_id"]:
-            # _LOGGER.debug("Sending websocket response: %s", plant_entity.websocket_info)
-            try:
+    plant_entity = _async_get_plant_registry(hass).get_by_entity_id(msg["entity_id"])
+    if plant_entity is not None:
+        # _LOGGER.debug("Sending websocket response: %s", plant_entity.websocket_info)
+        try:
+            info = plant_entity.websocket_info
+            version = plant_entity.websocket_info_version
+            if info and msg.get("if_version") == version:
                 connection.send_result(
-                    msg["id"], {"result": plant_entity.websocket_info}
+                    msg["id"], {"not_modified": True, "version": version}
                 )
-            except ValueError as e:
-                _LOGGER.warning(e)
-            return
+                return
+            connection.send_result(
+                msg["id"],
+                {"result": project_info(info, msg.get("fields")), "version": version},
+            )
+        except ValueError as e:
+            _LOGGER.warning(e)
+        return
     connection.send_error(
         msg["id"], "entity_not_found", f"Entity {msg['entity_id']} not found"
     )
     return
 
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "plant/get_all_info",
+        vol.Optional("device_type"): str,
+        vol.Optional("area_id"): str,
+        vol.Optional("cycle"): str,
+        vol.Optional("fields"): [str],
+    }
+)
+@callback
+def ws_get_all_info(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict
+) -> None:
+    """Send the info of all plants and cycles in one message.
+
+    Optionally filtered by device_type, area_id of the device and the
+    entity_id of a cycle (its member plants). fields limits the parts of
+    every info (see plant_info.project_info).
+    """
+    if DOMAIN not in hass.data:
+        connection.send_error(
+            msg["id"], "domain_not_found", f"Domain {DOMAIN} not found"
+        )
+        return
+
+    plant_registry = _async_get_plant_registry(hass)
+    if "cycle" in msg:
+        cycle = plant_registry.get_by_entity_id(msg["cycle"])
+        if cycle is None or cycle.device_type != DEVICE_TYPE_CYCLE:
+            connection.send_error(
+                msg["id"], "entity_not_found", f"Cycle {msg['cycle']} not found"
+            )
+            return
+        plants = plant_registry.get_members(cycle)
+        if "device_type" in msg:
+            plants = [plant for plant in plants if plant.device_type == msg["device_type"]]
+    else:
+        plants = plant_registry.plants(msg.get("device_type"))
+
+    if "area_id" in msg:
+        device_registry = dr.async_get(hass)
+        plants = [
+            plant
+            for plant in plants
+            if (device := device_registry.async_get(plant.device_id)) is not None
+            and device.area_id == msg["area_id"]
+        ]
+
+    result = {}
+    for plant in plants:
+        info = plant.websocket_info
+        if not info:
+            # Noch nicht vollständig eingerichtet
+            continue
+        result[plant.entity_id] = {
+            "version": plant.websocket_info_version,
+            "info": project_info(info, msg.get("fields")),
+        }
+    connection.send_result(msg["id"], {"plants": result})
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "plant/get_static_info",
+        vol.Optional("entity_ids"): [str],
+        vol.Optional("if_versions"): {str: str},
+    }
+)
+@callback
+def ws_get_static_info(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict
+) -> None:
+    """Send the static metadata (names, icons, units, entity_ids) of plants.
+
+    Without entity_ids all plants and cycles are returned. The version is a
+    content hash, with if_versions (entity_id -> version) unchanged plants
+    only return not_modified.
+    """
+    if DOMAIN not in hass.data:
+        connection.send_error(
+            msg["id"], "domain_not_found", f"Domain {DOMAIN} not found"
+        )
+        return
+
+    plant_registry = _async_get_plant_registry(hass)
+    if "entity_ids" in msg:
+        plants = []
+        for entity_id in msg["entity_ids"]:
+            plant_entity = plant_registry.get_by_entity_id(entity_id)
+            if plant_entity is None:
+                connection.send_error(
+                    msg["id"], "entity_not_found", f"Entity {entity_id} not found"
+                )
+                return
+            plants.append(plant_entity)
+    else:
+        plants = plant_registry.plants()
+
+    if_versions = msg.get("if_versions", {})
+    result = {}
+    for plant in plants:
+        static, version = plant.websocket_static_info
+        if not version:
+            continue
+        if if_versions.get(plant.entity_id) == version:
+            result[plant.entity_id] = {"not_modified": True, "version": version}
+        else:
+            result[plant.entity_id] = {"info": static, "version": version}
+    connection.send_result(msg["id"], {"plants": result})
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "plant/subscribe_info",
+        vol.Required("entity_ids"): [str],
+        vol.Optional("fields"): [str],
+    }
+)
+@callback
+def ws_subscribe_info(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict
+) -> None:
+    """Send the info snapshots of plants and then only their changes."""
+    if DOMAIN not in hass.data:
+        connection.send_error(
+            msg["id"], "domain_not_found", f"Domain {DOMAIN} not found"
+        )
+        return
+
+    plant_registry = _async_get_plant_registry(hass)
+    plants = []
+    for entity_id in msg["entity_ids"]:
+        plant_entity = plant_registry.get_by_entity_id(entity_id)
+        if plant_entity is None:
+            connection.send_error(
+                msg["id"], "entity_not_found", f"Entity {entity_id} not found"
+            )
+            return
+        plants.append(plant_entity)
+
+    connection.send_result(msg["id"])
+    subscription = async_subscribe_info(
+        hass, connection, msg["id"], plants, msg.get("fields")
+    )
+    connection.subscriptions[msg["id"]] = subscription.async_stop
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "plant/export_subscribe",
+        vol.Required("job_id"): str,
+    }
+)
+@callback
+def ws_export_subscribe(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict
+) -> None:
+    """Send the progress of a background export until it is finished."""
+    export_jobs = hass.data.get(DATA_EXPORT_JOBS)
+    job = export_jobs.get(msg["job_id"]) if export_jobs is not None else None
+    if job is None:
+        connection.send_error(
+            msg["id"], "job_not_found", f"Export job {msg['job_id']} not found"
+        )
+        return
+
+    @callback
+    def forward_progress(job) -> None:
+        connection.send_message(websocket_api.event_message(msg["id"], job.as_dict()))
+
+    if not job.finished:
+        # Beendete Jobs melden sich nicht mehr, der Stand unten ist der letzte
+        connection.subscriptions[msg["id"]] = job.async_subscribe(forward_progress)
+    connection.send_result(msg["id"])
+    # Aktueller Stand sofort, auch für bereits beendete Jobs
+    forward_progress(job)
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): "plant/export_cancel",
+        vol.Required("job_id"): str,
+    }
+)
+@callback
+def ws_export_cancel(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict
+) -> None:
+    """Cancel a running background export."""
+    export_jobs = hass.data.get(DATA_EXPORT_JOBS)
+    if export_jobs is None or not export_jobs.async_cancel(msg["job_id"]):
+        connection.send_error(
+            msg["id"], "job_not_found", f"No running export job {msg['job_id']}"
+        )
+        return
+    connection.send_result(msg["id"], {"success": True})
+
+
 @websocket_api.websocket_command(
     {
         vol.Required("type"): "plant/upload_image",
@@ -379,164 +739,65 @@ def ws_get_info(
         vol.Required("chunk"): str,
         vol.Required("chunk_index"): int,
         vol.Required("total_chunks"): int,
+        vol.Optional("encoding", default="hex"): vol.In(["hex", "base64"]),
     }
 )
 @websocket_api.async_response
 async def ws_upload_image(
     hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict
 ) -> None:
-    """Handle image upload via websocket in chunks."""
+    """Handle image upload via websocket in chunks (hex or base64 encoded).
+
+    Large images are better sent to PlantImageUploadView as one raw body.
+    """
     entity_id = msg["entity_id"]
-    filename = msg["filename"]
-    chunk = msg["chunk"]
     chunk_index = msg["chunk_index"]
-    total_chunks = msg["total_chunks"]
 
     # Finde die Entity (Plant oder Cycle)
-    target_entity = None
-    target_entry = None
-    for entry_id in hass.data[DOMAIN]:
-        if ATTR_PLANT in hass.data[DOMAIN][entry_id]:
-            entity = hass.data[DOMAIN][entry_id][ATTR_PLANT]
-            if entity.entity_id == entity_id:
-                target_entity = entity
-                target_entry = hass.config_entries.async_get_entry(entry_id)
-                break
-
-    if not target_entity or not target_entry:
+    target = async_get_upload_target(hass, entity_id)
+    if target is None:
         connection.send_error(msg["id"], "entity_not_found", f"Entity {entity_id} not found")
         return
-
-    # Hole den Download-Pfad aus der Konfiguration
-    config_entry = None
-    for entry in hass.config_entries.async_entries(DOMAIN):
-        if entry.data.get("is_config", False):
-            config_entry = entry
-            break
-
-    download_path = config_entry.data[FLOW_PLANT_INFO].get(FLOW_DOWNLOAD_PATH, DEFAULT_IMAGE_PATH) if config_entry else DEFAULT_IMAGE_PATH
+    target_entity, target_entry = target
+
+    uploads = async_get_image_uploads(hass)
+    upload = None
+    if chunk_index != 0:
+        upload = uploads.get(entity_id)
+        if upload is None:
+            connection.send_error(msg["id"], "upload_error", "Upload session not found")
+            return
+        if chunk_index != upload.next_chunk:
+            connection.send_error(
+                msg["id"],
+                "upload_error",
+                f"Expected chunk {upload.next_chunk}, got {chunk_index}",
+            )
+            return
 
     try:
-        # Erstelle den Download-Pfad falls er nicht existiert
-        await hass.async_add_executor_job(lambda: os.makedirs(download_path, exist_ok=True))
-
-        # Generiere Dateinamen nur für den ersten Chunk
-        if chunk_index == 0:
-            # Wenn kein entity_picture existiert, verwende Breeder_Strain Format
-            if not target_entity._attr_entity_picture:
-                breeder = target_entity._plant_info.get(ATTR_BREEDER, "Unknown")
-                strain = target_entity._plant_info.get(ATTR_STRAIN, "Unknown")
-                _, ext = os.path.splitext(filename)
-                final_filename = f"{breeder}_{strain}{ext}".replace(" ", "_")
-                
-                # Hole die aktuelle Bilderliste aus der Config Entry
-                data = dict(target_entry.data)
-                plant_info = dict(data.get(FLOW_PLANT_INFO, {}))
-                
-                target_entity._attr_entity_picture = f"/local/images/plants/{final_filename}"
-                plant_info[ATTR_ENTITY_PICTURE] = f"/local/images/plants/{final_filename}"
-                
-                # Aktualisiere die Config Entry
-                data[FLOW_PLANT_INFO] = plant_info
-                hass.config_entries.async_update_entry(target_entry, data=data)
-            else:
-                # Für alle weiteren Bilder verwende den Timestamp
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                _, ext = os.path.splitext(filename)
-                final_filename = f"{entity_id}_{timestamp}{ext}"
-                
-            filepath = os.path.join(download_path, final_filename)
-            temp_filepath = f"{filepath}.part"
-            
-            # Speichere die Pfade in hass.data für nachfolgende Chunks
-            if DOMAIN not in hass.data:
-                hass.data[DOMAIN] = {}
-            if "uploads" not in hass.data[DOMAIN]:
-                hass.data[DOMAIN]["uploads"] = {}
-            hass.data[DOMAIN]["uploads"][entity_id] = {
-                "filepath": filepath,
-                "temp_filepath": temp_filepath,
-                "final_filename": final_filename
-            }
+        if msg.get("encoding") == "base64":
+            chunk_data = base64.b64decode(msg["chunk"], validate=True)
         else:
-            # Hole die gespeicherten Pfade für nachfolgende Chunks
-            upload_info = hass.data[DOMAIN]["uploads"].get(entity_id)
-            if not upload_info:
-                connection.send_error(msg["id"], "upload_error", "Upload session not found")
-                return
-            filepath = upload_info["filepath"]
-            temp_filepath = upload_info["temp_filepath"]
-            final_filename = upload_info["final_filename"]
+            chunk_data = bytes.fromhex(msg["chunk"])
 
-        # Schreibe den Chunk in einem Executor
-        chunk_data = bytes.fromhex(chunk)
-        mode = "ab" if chunk_index > 0 else "wb"
-        
-        async def write_chunk():
-            def _write():
-                with open(temp_filepath, mode) as f:
-                    f.write(chunk_data)
-            await hass.async_add_executor_job(_write)
-                
-        await write_chunk()
+        # Der erste Chunk startet die Upload-Session, die Datei bleibt bis zum letzten offen
+        if upload is None:
+            upload = await uploads.async_begin(target_entity, target_entry, msg["filename"])
+
+        await uploads.async_write(upload, chunk_data)
 
         # Wenn dies der letzte Chunk ist, benenne die Datei um und aktualisiere die Entity
-        if chunk_index == total_chunks - 1:
-            async def finalize_upload():
-                def _finalize():
-                    if os.path.exists(temp_filepath):
-                        os.rename(temp_filepath, filepath)
-                await hass.async_add_executor_job(_finalize)
-                    
-            await finalize_upload()
-            
-            # Hole die aktuelle Bilderliste aus der Config Entry
-            data = dict(target_entry.data)
-            plant_info = dict(data.get(FLOW_PLANT_INFO, {}))
-            current_images = list(plant_info.get("images", []))
-            
-            # Wenn kein Hauptbild existiert, setze dieses als Hauptbild
-            if not target_entity._attr_entity_picture:
-                breeder = target_entity._plant_info.get(ATTR_BREEDER, "Unknown")
-                target_entity._attr_entity_picture = f"/local/images/plants/{final_filename}"
-                plant_info[ATTR_ENTITY_PICTURE] = f"/local/images/plants/{final_filename}"
-            else:
-                # Füge das Bild zur Bilderliste hinzu, wenn es nicht das Entity Picture ist
-                entity_picture_filename = target_entity._attr_entity_picture.split("/")[-1]
-                if final_filename != entity_picture_filename:
-                    if final_filename not in current_images:
-                        current_images.append(final_filename)
-                        plant_info["images"] = current_images
-            
-            # Aktualisiere die Config Entry
-            data[FLOW_PLANT_INFO] = plant_info
-            hass.config_entries.async_update_entry(target_entry, data=data)
-            
-            # Aktualisiere die Entity
-            target_entity._images = current_images
-            target_entity._plant_info = plant_info
-            target_entity.async_write_ha_state()
-            
-            # Cleanup
-            if entity_id in hass.data[DOMAIN]["uploads"]:
-                del hass.data[DOMAIN]["uploads"][entity_id]
+        if chunk_index == msg["total_chunks"] - 1:
+            await uploads.async_finish(target_entity, target_entry, upload)
 
         connection.send_result(msg["id"], {"success": True, "chunk_index": chunk_index})
 
     except Exception as e:
         _LOGGER.error("Error processing image chunk: %s", e)
-        # Bei einem Fehler lösche die temporäre Datei
-        if "uploads" in hass.data.get(DOMAIN, {}) and entity_id in hass.data[DOMAIN]["uploads"]:
-            temp_filepath = hass.data[DOMAIN]["uploads"][entity_id]["temp_filepath"]
-            async def cleanup():
-                def _cleanup():
-                    if os.path.exists(temp_filepath):
-                        os.unlink(temp_filepath)
-                    if entity_id in hass.data[DOMAIN].get("uploads", {}):
-                        del hass.data[DOMAIN]["uploads"][entity_id]
-                await hass.async_add_executor_job(_cleanup)
-                    
-            await cleanup()
+        # Bei einem Fehler lösche die temporäre Datei dieser Session
+        if upload is not None:
+            await uploads.async_abort_upload(upload)
         connection.send_error(msg["id"], "upload_failed", str(e))
 
 @websocket_api.websocket_command(
@@ -555,15 +816,10 @@ async def ws_delete_image(
     filename = msg["filename"]
 
     # Finde die Entity (Plant oder Cycle)
-    target_entity = None
+    target_entity = _async_get_plant_registry(hass).get_by_entity_id(entity_id)
     target_entry = None
-    for entry_id in hass.data[DOMAIN]:
-        if ATTR_PLANT in hass.data[DOMAIN][entry_id]:
-            entity = hass.data[DOMAIN][entry_id][ATTR_PLANT]
-            if entity.entity_id == entity_id:
-                target_entity = entity
-                target_entry = hass.config_entries.async_get_entry(entry_id)
-                break
+    if target_entity is not None:
+        target_entry = hass.config_entries.async_get_entry(target_entity.unique_id)
 
     if not target_entity or not target_entry:
         connection.send_error(msg["id"], "entity_not_found", f"Entity {entity_id} not found")
@@ -651,15 +907,10 @@ async def ws_set_main_image(
     filename = msg["filename"]
 
     # Finde die Entity (Plant oder Cycle)
-    target_entity = None
+    target_entity = _async_get_plant_registry(hass).get_by_entity_id(entity_id)
     target_entry = None
-    for entry_id in hass.data[DOMAIN]:
-        if ATTR_PLANT in hass.data[DOMAIN][entry_id]:
-            entity = hass.data[DOMAIN][entry_id][ATTR_PLANT]
-            if entity.entity_id == entity_id:
-                target_entity = entity
-                target_entry = hass.config_entries.async_get_entry(entry_id)
-                break
+    if target_entity is not None:
+        target_entry = hass.config_entries.async_get_entry(target_entity.unique_id)
 
     if not target_entity or not target_entry:
         connection.send_error(msg["id"], "entity_not_found", f"Entity {entity_id} not found")
@@ -800,6 +1051,21 @@ class PlantDevice(Entity):
         self.fertilizer_consumption_status = None
         self.power_consumption_status = None
 
+        # Slot-Tabelle für die Grenzwert-Auswertung
+        self._threshold_engine = ThresholdEngine()
+        self._threshold_slots = {}
+        self._threshold_unsub = None
+        self._threshold_synced = False
+        self._threshold_trigger_source = None
+
+        # Zwischengespeicherte websocket_info, verworfen bei Änderung einer beteiligten Entity
+        self._info_snapshot = None
+        self._info_version = 0
+        self._info_tracked = set()
+        self._info_unsub = None
+        self._info_listeners = []
+        self._info_static = None
+
         self.flowering_duration = None
 
         # Neue Attribute hinzufügen
@@ -829,6 +1095,14 @@ class PlantDevice(Entity):
         
         # Median Sensoren (nur für Cycles) 
         self._median_sensors = {}
+        self._median_entities = []
+        self._median_tracked = set()
+        self._median_unsub = None
+        self._median_update_unsub = None
+        self._median_full_update = False
+        # Member-Werte je Sensor-Typ und Zuordnung Sensor entity_id -> (Member, Sensor-Typ)
+        self._median_aggregators = {}
+        self._median_sources = {}
 
         self.cycle_select = None  # Neue Property
 
@@ -1088,11 +1362,83 @@ class PlantDevice(Entity):
 
     @property
     def websocket_info(self) -> dict:
-        """Wesocket response"""
+        """Wesocket response, cached until one of its entities changes"""
         if not self.plant_complete:
             # We are not fully set up, so we just return an empty dict for now
             return {}
+        if self._info_snapshot is None:
+            self._info_snapshot = self._build_websocket_info()
+            self._info_version = next(_INFO_VERSIONS)
+            self._track_websocket_info()
+        return self._info_snapshot
 
+    @property
+    def websocket_info_version(self) -> int:
+        """Version of the current websocket_info snapshot (0 while not set up)"""
+        return self._info_version if self.websocket_info else 0
+
+    @property
+    def websocket_static_info(self) -> tuple[dict, str]:
+        """Static metadata of the websocket_info and its version"""
+        info = self.websocket_info
+        if not info:
+            return {}, ""
+        if self._info_static is None or self._info_static[0] != self._info_version:
+            self._info_static = (self._info_version, *static_info(info))
+        return self._info_static[1], self._info_static[2]
+
+    @callback
+    def invalidate_websocket_info(self, _event=None) -> None:
+        """Drop the cached websocket_info, it is rebuilt on the next request."""
+        self._info_snapshot = None
+        for listener in list(self._info_listeners):
+            listener()
+
+    @callback
+    def async_subscribe_info(self, listener: Callable[..., None]) -> CALLBACK_TYPE:
+        """Call listener whenever the websocket_info is invalidated.
+
+        When the plant is removed the listener is called once more with
+        removed=True and dropped.
+        """
+        self._info_listeners.append(listener)
+
+        @callback
+        def _unsubscribe() -> None:
+            if listener in self._info_listeners:
+                self._info_listeners.remove(listener)
+
+        return _unsubscribe
+
+    def _track_websocket_info(self) -> None:
+        """Follow the state changes of all entities in the snapshot."""
+        if self.hass is None:
+            return
+        tracked = {self.entity_id}
+        tracked.update(
+            entity.entity_id
+            for entity in self.threshold_entities
+            if entity is not None and entity.entity_id
+        )
+        for value in self._info_snapshot.values():
+            if isinstance(value, dict) and value.get(ATTR_SENSOR):
+                tracked.add(value[ATTR_SENSOR])
+        for group in ("diagnostic_sensors", "helpers"):
+            for value in self._info_snapshot[group].values():
+                if value.get("entity_id"):
+                    tracked.add(value["entity_id"])
+        tracked.discard(None)
+        if tracked == self._info_tracked:
+            return
+        if self._info_unsub is not None:
+            self._info_unsub()
+        self._info_unsub = async_track_state_change_event(
+            self._hass, list(tracked), self.invalidate_websocket_info
+        )
+        self._info_tracked = tracked
+
+    def _build_websocket_info(self) -> dict:
+        """Build the websocket_info snapshot."""
         # Hole den Download-Pfad aus der Konfiguration und konvertiere ihn
         config_entry = None
         for entry in self._hass.config_entries.async_entries(DOMAIN):
@@ -1546,326 +1892,123 @@ class PlantDevice(Entity):
         """Füge die Blütedauer Number Entity hinzu."""
         self.flowering_duration = flowering_duration
 
-    def update(self) -> None:
-        """Run on every update of the entities"""
-        new_state = STATE_OK
-        known_state = False
+    def _threshold_entities(self) -> dict:
+        """Return (current sensor, min, max) entities per threshold slot."""
+        return {
+            "temperature": (self.sensor_temperature, self.min_temperature, self.max_temperature),
+            "moisture": (self.sensor_moisture, self.min_moisture, self.max_moisture),
+            "conductivity": (self.sensor_conductivity, self.min_conductivity, self.max_conductivity),
+            "illuminance": (self.sensor_illuminance, self.min_illuminance, self.max_illuminance),
+            "humidity": (self.sensor_humidity, self.min_humidity, self.max_humidity),
+            "CO2": (self.sensor_CO2, self.min_CO2, self.max_CO2),
+            "dli": (self.dli, self.min_dli, self.max_dli),
+            "water_consumption": (
+                self.moisture_consumption,
+                self.min_water_consumption,
+                self.max_water_consumption,
+            ),
+            "fertilizer_consumption": (
+                self.fertilizer_consumption,
+                self.min_fertilizer_consumption,
+                self.max_fertilizer_consumption,
+            ),
+            "power_consumption": (
+                self.sensor_power_consumption,
+                self.min_power_consumption,
+                self.max_power_consumption,
+            ),
+        }
 
-        if self.device_type == DEVICE_TYPE_CYCLE:
-            # Cycle-Update-Logik
-            if self.sensor_temperature is not None:
-                temperature = self._median_sensors.get('temperature')
-                if temperature is not None:
-                    known_state = True
-                    if float(temperature) < float(self.min_temperature.state):
-                        self.temperature_status = STATE_LOW
-                        if self.temperature_trigger:
-                            new_state = STATE_PROBLEM
-                    elif float(temperature) > float(self.max_temperature.state):
-                        self.temperature_status = STATE_HIGH
-                        if self.temperature_trigger:
-                            new_state = STATE_PROBLEM
-                    else:
-                        self.temperature_status = STATE_OK
-
-            if self.sensor_moisture is not None:
-                moisture = self._median_sensors.get('moisture')
-                if moisture is not None:
-                    known_state = True
-                    if float(moisture) < float(self.min_moisture.state):
-                        self.moisture_status = STATE_LOW
-                        if self.moisture_trigger:
-                            new_state = STATE_PROBLEM
-                    elif float(moisture) > float(self.max_moisture.state):
-                        self.moisture_status = STATE_HIGH
-                        if self.moisture_trigger:
-                            new_state = STATE_PROBLEM
-                    else:
-                        self.moisture_status = STATE_OK
-
-            if self.sensor_conductivity is not None:
-                conductivity = self._median_sensors.get('conductivity')
-                if conductivity is not None:
-                    known_state = True
-                    if float(conductivity) < float(self.min_conductivity.state):
-                        self.conductivity_status = STATE_LOW
-                        if self.conductivity_trigger:
-                            new_state = STATE_PROBLEM
-                    elif float(conductivity) > float(self.max_conductivity.state):
-                        self.conductivity_status = STATE_HIGH
-                        if self.conductivity_trigger:
-                            new_state = STATE_PROBLEM
-                    else:
-                        self.conductivity_status = STATE_OK
-
-            if self.sensor_illuminance is not None:
-                illuminance = self._median_sensors.get('illuminance')
-                if illuminance is not None:
-                    known_state = True
-                    if float(illuminance) < float(self.min_illuminance.state):
-                        self.illuminance_status = STATE_LOW
-                        if self.illuminance_trigger:
-                            new_state = STATE_PROBLEM
-                    elif float(illuminance) > float(self.max_illuminance.state):
-                        self.illuminance_status = STATE_HIGH
-                        if self.illuminance_trigger:
-                            new_state = STATE_PROBLEM
-                    else:
-                        self.illuminance_status = STATE_OK
-
-            if self.sensor_humidity is not None:
-                humidity = self._median_sensors.get('humidity')
-                if humidity is not None:
-                    known_state = True
-                    if float(humidity) < float(self.min_humidity.state):
-                        self.humidity_status = STATE_LOW
-                        if self.humidity_trigger:
-                            new_state = STATE_PROBLEM
-                    elif float(humidity) > float(self.max_humidity.state):
-                        self.humidity_status = STATE_HIGH
-                        if self.humidity_trigger:
-                            new_state = STATE_PROBLEM
-                    else:
-                        self.humidity_status = STATE_OK
-
-            if self.sensor_CO2 is not None:
-                CO2 = self._median_sensors.get('CO2')
-                if CO2 is not None:
-                    known_state = True
-                    if float(CO2) < float(self.min_CO2.state):
-                        self.CO2_status = STATE_LOW
-                        if self.CO2_trigger:
-                            new_state = STATE_PROBLEM
-                    elif float(CO2) > float(self.max_CO2.state):
-                        self.CO2_status = STATE_HIGH
-                        if self.CO2_trigger:
-                            new_state = STATE_PROBLEM
-                    else:
-                        self.CO2_status = STATE_OK
-
-            if self.dli is not None:
-                dli = self._median_sensors.get('dli')
-                if dli is not None:
-                    known_state = True
-                    if float(dli) < float(self.min_dli.state):
-                        self.dli_status = STATE_LOW
-                        if self.dli_trigger:
-                            new_state = STATE_PROBLEM
-                    elif float(dli) > float(self.max_dli.state):
-                        self.dli_status = STATE_HIGH
-                        if self.dli_trigger:
-                            new_state = STATE_PROBLEM
-                    else:
-                        self.dli_status = STATE_OK
-
-            # Überprüfe Wasser-Verbrauch
-            if self.moisture_consumption is not None:
-                water_consumption = self.moisture_consumption.state
-                if water_consumption is not None and water_consumption != STATE_UNAVAILABLE and water_consumption != STATE_UNKNOWN:
-                    known_state = True
-                    if float(water_consumption) < float(self.min_water_consumption.state):
-                        self.water_consumption_status = STATE_LOW
-                        if self.water_consumption_trigger:
-                            new_state = STATE_PROBLEM
-                    elif float(water_consumption) > float(self.max_water_consumption.state):
-                        self.water_consumption_status = STATE_HIGH
-                        if self.water_consumption_trigger:
-                            new_state = STATE_PROBLEM
-                    else:
-                        self.water_consumption_status = STATE_OK
-
-            # Überprüfe Dünger-Verbrauch
-            if self.fertilizer_consumption is not None:
-                fertilizer_consumption = self.fertilizer_consumption.state
-                if fertilizer_consumption is not None and fertilizer_consumption != STATE_UNAVAILABLE and fertilizer_consumption != STATE_UNKNOWN:
-                    known_state = True
-                    if float(fertilizer_consumption) < float(self.min_fertilizer_consumption.state):
-                        self.fertilizer_consumption_status = STATE_LOW
-                        if self.fertilizer_consumption_trigger:
-                            new_state = STATE_PROBLEM
-                    elif float(fertilizer_consumption) > float(self.max_fertilizer_consumption.state):
-                        self.fertilizer_consumption_status = STATE_HIGH
-                        if self.fertilizer_consumption_trigger:
-                            new_state = STATE_PROBLEM
-                    else:
-                        self.fertilizer_consumption_status = STATE_OK
-
-            # Überprüfe Power Consumption
-            if self.sensor_power_consumption is not None:
-                power_consumption = self.sensor_power_consumption.state
-                if power_consumption is not None and power_consumption != STATE_UNAVAILABLE and power_consumption != STATE_UNKNOWN:
-                    known_state = True
-                    if float(power_consumption) < float(self.min_power_consumption.state):
-                        self.power_consumption_status = STATE_LOW
-                        if self.power_consumption_trigger:
-                            new_state = STATE_PROBLEM
-                    elif float(power_consumption) > float(self.max_power_consumption.state):
-                        self.power_consumption_status = STATE_HIGH
-                        if self.power_consumption_trigger:
-                            new_state = STATE_PROBLEM
-                    else:
-                        self.power_consumption_status = STATE_OK
+    def _sync_threshold_triggers(self) -> None:
+        """Übernimm die Trigger-Einstellungen, wenn sich die Config Entry geändert hat."""
+        source = (self._config.options, self._config.data)
+        if self._threshold_trigger_source is not None and all(
+            a is b for a, b in zip(source, self._threshold_trigger_source)
+        ):
+            return
+        self._threshold_trigger_source = source
+        engine = self._threshold_engine
+        engine.set_trigger("temperature", self.temperature_trigger)
+        engine.set_trigger("moisture", self.moisture_trigger)
+        engine.set_trigger("conductivity", self.conductivity_trigger)
+        engine.set_trigger("illuminance", self.illuminance_trigger)
+        engine.set_trigger("humidity", self.humidity_trigger)
+        engine.set_trigger("CO2", self.CO2_trigger)
+        engine.set_trigger("dli", self.dli_trigger)
+        engine.set_trigger("water_consumption", self.water_consumption_trigger)
+        engine.set_trigger("fertilizer_consumption", self.fertilizer_consumption_trigger)
+        engine.set_trigger("power_consumption", self.power_consumption_trigger)
+
+    def _sync_threshold_engine(self) -> None:
+        """Fill the whole slot table and (re)subscribe to slot entity changes."""
+        engine = self._threshold_engine
+        slots = {}
+        for key, (sensor, min_entity, max_entity) in self._threshold_entities().items():
+            engine.set_enabled(key, sensor is not None)
+            if sensor is None:
+                continue
+            if self.device_type == DEVICE_TYPE_CYCLE and key in CYCLE_MEDIAN_KEYS:
+                # Cycles nutzen die aggregierten Werte der Member Plants
+                engine.set_current(key, self._median_sensors.get(key))
+            else:
+                engine.set_current(key, sensor.state)
+                slots[sensor.entity_id] = (key, engine.set_current)
+            engine.set_min(key, min_entity.state if min_entity else None)
+            engine.set_max(key, max_entity.state if max_entity else None)
+            if min_entity is not None:
+                slots[min_entity.entity_id] = (key, engine.set_min)
+            if max_entity is not None:
+                slots[max_entity.entity_id] = (key, engine.set_max)
+        self._threshold_trigger_source = None
+        self._sync_threshold_triggers()
+
+        if self.hass is not None and slots.keys() != self._threshold_slots.keys():
+            if self._threshold_unsub is not None:
+                self._threshold_unsub()
+            self._threshold_unsub = async_track_state_change_event(
+                self._hass, list(slots), self._threshold_state_changed
+            )
+        self._threshold_slots = slots
+        self._threshold_synced = True
+
+    @callback
+    def _threshold_state_changed(self, event) -> None:
+        """Update a single slot when a sensor or threshold entity changes."""
+        slot = self._threshold_slots.get(event.data.get("entity_id"))
+        new_state = event.data.get("new_state")
+        if slot is None or new_state is None:
+            return
+        key, setter = slot
+        if not setter(key, new_state.state):
+            return
+        # Nur den geänderten Slot neu bewerten
+        old_state = self._attr_state
+        changed, problem = self._threshold_engine.refresh()
+        self.apply_threshold_result(changed, problem)
+        if changed or self._attr_state != old_state:
+            self.async_write_ha_state()
+
+    def apply_threshold_result(self, statuses: dict, problem: bool) -> None:
+        """Set the changed *_status attributes and the aggregate plant state."""
+        for key, status in statuses.items():
+            setattr(self, f"{key}_status", THRESHOLD_STATUS_STATES[status])
+
+        if not self._threshold_engine.statuses:
+            self._attr_state = STATE_UNKNOWN
+        elif problem:
+            self._attr_state = STATE_PROBLEM
+        else:
+            self._attr_state = STATE_OK
 
+    def update(self) -> None:
+        """Run on every update of the entities"""
+        if not self._threshold_synced:
+            self._sync_threshold_engine()
         else:
-            # Plant-Update-Logik
-            if self.sensor_moisture is not None:
-                moisture = self.sensor_moisture.state
-                if moisture is not None and moisture != STATE_UNAVAILABLE and moisture != STATE_UNKNOWN:
-                    known_state = True
-                    if float(moisture) < float(self.min_moisture.state):
-                        self.moisture_status = STATE_LOW
-                        if self.moisture_trigger:
-                            new_state = STATE_PROBLEM
-                    elif float(moisture) > float(self.max_moisture.state):
-                        self.moisture_status = STATE_HIGH
-                        if self.moisture_trigger:
-                            new_state = STATE_PROBLEM
-                    else:
-                        self.moisture_status = STATE_OK
-
-            if self.sensor_conductivity is not None:
-                conductivity = self.sensor_conductivity.state
-                if conductivity is not None and conductivity != STATE_UNAVAILABLE and conductivity != STATE_UNKNOWN:
-                    known_state = True
-                    if float(conductivity) < float(self.min_conductivity.state):
-                        self.conductivity_status = STATE_LOW
-                        if self.conductivity_trigger:
-                            new_state = STATE_PROBLEM
-                    elif float(conductivity) > float(self.max_conductivity.state):
-                        self.conductivity_status = STATE_HIGH
-                        if self.conductivity_trigger:
-                            new_state = STATE_PROBLEM
-                    else:
-                        self.conductivity_status = STATE_OK
-
-            # Füge die fehlenden Sensor-Prüfungen hinzu
-            if self.sensor_temperature is not None:
-                temperature = self.sensor_temperature.state
-                if temperature is not None and temperature != STATE_UNAVAILABLE and temperature != STATE_UNKNOWN:
-                    known_state = True
-                    if float(temperature) < float(self.min_temperature.state):
-                        self.temperature_status = STATE_LOW
-                        if self.temperature_trigger:
-                            new_state = STATE_PROBLEM
-                    elif float(temperature) > float(self.max_temperature.state):
-                        self.temperature_status = STATE_HIGH
-                        if self.temperature_trigger:
-                            new_state = STATE_PROBLEM
-                    else:
-                        self.temperature_status = STATE_OK
-
-            if self.sensor_illuminance is not None:
-                illuminance = self.sensor_illuminance.state
-                if illuminance is not None and illuminance != STATE_UNAVAILABLE and illuminance != STATE_UNKNOWN:
-                    known_state = True
-                    if float(illuminance) < float(self.min_illuminance.state):
-                        self.illuminance_status = STATE_LOW
-                        if self.illuminance_trigger:
-                            new_state = STATE_PROBLEM
-                    elif float(illuminance) > float(self.max_illuminance.state):
-                        self.illuminance_status = STATE_HIGH
-                        if self.illuminance_trigger:
-                            new_state = STATE_PROBLEM
-                    else:
-                        self.illuminance_status = STATE_OK
-
-            if self.sensor_humidity is not None:
-                humidity = self.sensor_humidity.state
-                if humidity is not None and humidity != STATE_UNAVAILABLE and humidity != STATE_UNKNOWN:
-                    known_state = True
-                    if float(humidity) < float(self.min_humidity.state):
-                        self.humidity_status = STATE_LOW
-                        if self.humidity_trigger:
-                            new_state = STATE_PROBLEM
-                    elif float(humidity) > float(self.max_humidity.state):
-                        self.humidity_status = STATE_HIGH
-                        if self.humidity_trigger:
-                            new_state = STATE_PROBLEM
-                    else:
-                        self.humidity_status = STATE_OK
-
-            if self.sensor_CO2 is not None:
-                CO2 = self.sensor_CO2.state
-                if CO2 is not None and CO2 != STATE_UNAVAILABLE and CO2 != STATE_UNKNOWN:
-                    known_state = True
-                    if float(CO2) < float(self.min_CO2.state):
-                        self.CO2_status = STATE_LOW
-                        if self.CO2_trigger:
-                            new_state = STATE_PROBLEM
-                    elif float(CO2) > float(self.max_CO2.state):
-                        self.CO2_status = STATE_HIGH
-                        if self.CO2_trigger:
-                            new_state = STATE_PROBLEM
-                    else:
-                        self.CO2_status = STATE_OK
-
-            if self.dli is not None:
-                dli = self.dli.state
-                if dli is not None and dli != STATE_UNAVAILABLE and dli != STATE_UNKNOWN:
-                    known_state = True
-                    if float(dli) < float(self.min_dli.state):
-                        self.dli_status = STATE_LOW
-                        if self.dli_trigger:
-                            new_state = STATE_PROBLEM
-                    elif float(dli) > float(self.max_dli.state):
-                        self.dli_status = STATE_HIGH
-                        if self.dli_trigger:
-                            new_state = STATE_PROBLEM
-                    else:
-                        self.dli_status = STATE_OK
-
-            # Überprüfe Wasser-Verbrauch
-            if self.moisture_consumption is not None:
-                water_consumption = self.moisture_consumption.state
-                if water_consumption is not None and water_consumption != STATE_UNAVAILABLE and water_consumption != STATE_UNKNOWN:
-                    known_state = True
-                    if float(water_consumption) < float(self.min_water_consumption.state):
-                        self.water_consumption_status = STATE_LOW
-                        if self.water_consumption_trigger:
-                            new_state = STATE_PROBLEM
-                    elif float(water_consumption) > float(self.max_water_consumption.state):
-                        self.water_consumption_status = STATE_HIGH
-                        if self.water_consumption_trigger:
-                            new_state = STATE_PROBLEM
-                    else:
-                        self.water_consumption_status = STATE_OK
-
-            # Überprüfe Dünger-Verbrauch
-            if self.fertilizer_consumption is not None:
-                fertilizer_consumption = self.fertilizer_consumption.state
-                if fertilizer_consumption is not None and fertilizer_consumption != STATE_UNAVAILABLE and fertilizer_consumption != STATE_UNKNOWN:
-                    known_state = True
-                    if float(fertilizer_consumption) < float(self.min_fertilizer_consumption.state):
-                        self.fertilizer_consumption_status = STATE_LOW
-                        if self.fertilizer_consumption_trigger:
-                            new_state = STATE_PROBLEM
-                    elif float(fertilizer_consumption) > float(self.max_fertilizer_consumption.state):
-                        self.fertilizer_consumption_status = STATE_HIGH
-                        if self.fertilizer_consumption_trigger:
-                            new_state = STATE_PROBLEM
-                    else:
-                        self.fertilizer_consumption_status = STATE_OK
-
-            # Überprüfe Power Consumption
-            if self.sensor_power_consumption is not None:
-                power_consumption = self.sensor_power_consumption.state
-                if power_consumption is not None and power_consumption != STATE_UNAVAILABLE and power_consumption != STATE_UNKNOWN:
-                    known_state = True
-                    if float(power_consumption) < float(self.min_power_consumption.state):
-                        self.power_consumption_status = STATE_LOW
-                        if self.power_consumption_trigger:
-                            new_state = STATE_PROBLEM
-                    elif float(power_consumption) > float(self.max_power_consumption.state):
-                        self.power_consumption_status = STATE_HIGH
-                        if self.power_consumption_trigger:
-                            new_state = STATE_PROBLEM
-                    else:
-                        self.power_consumption_status = STATE_OK
-
-        if not known_state:
-            new_state = STATE_UNKNOWN
-
-        self._attr_state = new_state
+            self._sync_threshold_triggers()
+
+        # Slots werden über Events aktuell gehalten, hier nur noch Offenes nachziehen
+        self.apply_threshold_result(*self._threshold_engine.refresh())
         self.update_registry()
 
     @property
@@ -1886,8 +2029,43 @@ class PlantDevice(Entity):
     async def async_added_to_hass(self) -> None:
         """When entity is added to hass."""
         self.update_registry()
+        self._sync_threshold_engine()
+        # Ein früher gebauter Snapshot kennt noch nicht alle entity_ids
+        self.invalidate_websocket_info()
         # Die Wiederherstellung der Member Plants erfolgt jetzt direkt in der PlantGrowthPhaseSelect Klasse
 
+        # Aggregate des Cycles einmalig berechnen, danach nur noch bei Änderungen
+        if self.device_type == DEVICE_TYPE_CYCLE:
+            self.schedule_median_update()
+        else:
+            cycle = _async_get_plant_registry(self._hass).get_cycle(self)
+            if cycle is not None:
+                cycle.schedule_median_update()
+
+    async def async_will_remove_from_hass(self) -> None:
+        """Stop tracking the threshold slot and member sensor entities."""
+        if self._threshold_unsub is not None:
+            self._threshold_unsub()
+            self._threshold_unsub = None
+        self._threshold_slots = {}
+        self._threshold_synced = False
+        if self._median_update_unsub is not None:
+            self._median_update_unsub()
+            self._median_update_unsub = None
+        if self._median_unsub is not None:
+            self._median_unsub()
+            self._median_unsub = None
+        self._median_tracked = set()
+        if self._info_unsub is not None:
+            self._info_unsub()
+            self._info_unsub = None
+        self._info_tracked = set()
+        self._info_snapshot = None
+        # Abonnenten melden die Pflanze als entfernt, bis sie wieder hinzugefügt wird
+        listeners, self._info_listeners = self._info_listeners, []
+        for listener in listeners:
+            listener(removed=True)
+
     @property
     def icon(self) -> str:
         """Return the icon."""
@@ -1900,7 +2078,7 @@ class PlantDevice(Entity):
         if plant_entity_id not in self._member_plants:
             self._member_plants.append(plant_entity_id)
             self._update_cycle_attributes()
-            self._update_median_sensors()
+            self.schedule_median_update()
             
             # Aktualisiere Growth Phase sofort
             if self.growth_phase_select:
@@ -1943,7 +2121,7 @@ class PlantDevice(Entity):
         if plant_entity_id in self._member_plants:
             self._member_plants.remove(plant_entity_id)
             self._update_cycle_attributes()
-            self._update_median_sensors()
+            self.schedule_median_update()
             
             # Aktualisiere Growth Phase sofort
             if self.growth_phase_select:
@@ -1981,121 +2159,158 @@ class PlantDevice(Entity):
                     self.health_number._update_cycle_health()
                 )
 
+    def add_median_sensors(self, median_sensors) -> None:
+        """Add the aggregate sensors of a cycle, they read from _median_sensors."""
+        self._median_entities = list(median_sensors)
+
+    def _median_source_sensors(self) -> dict:
+        """Return the sensors of this plant that feed the cycle aggregates."""
+        return {
+            'temperature': self.sensor_temperature,
+            'moisture': self.sensor_moisture,
+            'conductivity': self.sensor_conductivity,
+            'illuminance': self.sensor_illuminance,
+            'humidity': self.sensor_humidity,
+            'CO2': self.sensor_CO2,
+            'ppfd': self.ppfd,
+            'dli': self.dli,
+            'total_integral': self.total_integral,
+            'moisture_consumption': self.moisture_consumption,
+            'total_water_consumption': self.total_water_consumption,
+            'fertilizer_consumption': self.fertilizer_consumption,
+            'total_fertilizer_consumption': self.total_fertilizer_consumption,
+            'power_consumption': self.sensor_power_consumption,
+            'total_power_consumption': self.total_power_consumption,
+        }
+
+    def _track_member_sensors(self, entity_ids: set) -> None:
+        """Subscribe to state changes of the member sensors (only if the set changed)."""
+        if entity_ids == self._median_tracked or self.hass is None:
+            return
+        if self._median_unsub is not None:
+            self._median_unsub()
+            self._median_unsub = None
+        self._median_tracked = entity_ids
+        if entity_ids:
+            self._median_unsub = async_track_state_change_event(
+                self._hass, list(entity_ids), self._member_sensor_changed
+            )
+
+    @callback
+    def _member_sensor_changed(self, event) -> None:
+        """Update the aggregator of a single member sensor."""
+        source = self._median_sources.get(event.data.get("entity_id"))
+        if source is None:
+            return
+        member_id, sensor_type = source
+        new_state = event.data.get("new_state")
+        value = parse_value(new_state.state if new_state is not None else None)
+        if self._median_aggregator(sensor_type).update(member_id, value):
+            self.schedule_median_update(full=False)
+
+    @callback
+    def schedule_median_update(self, full: bool = True) -> None:
+        """Recompute the cycle aggregates once, coalescing changes within a short window.
+
+        full=True re-reads all member sensors (e.g. after membership changes),
+        otherwise only the aggregates of the already updated aggregators are read.
+        """
+        if self.device_type != DEVICE_TYPE_CYCLE or self.hass is None:
+            return
+        self._median_full_update = self._median_full_update or full
+        if self._median_update_unsub is not None:
+            return
+        self._median_update_unsub = async_call_later(
+            self._hass, CYCLE_MEDIAN_UPDATE_DELAY, self._async_median_update
+        )
+
+    @callback
+    def _async_median_update(self, _now) -> None:
+        """Recompute the aggregates and write the changed median sensors."""
+        self._median_update_unsub = None
+        old_values = dict(self._median_sensors)
+        if self._median_full_update:
+            self._median_full_update = False
+            self._update_median_sensors()
+        else:
+            self._compute_median_values()
+
+        for median_sensor in self._median_entities:
+            sensor_type = median_sensor._sensor_type
+            if median_sensor.hass is not None and self._median_sensors.get(
+                sensor_type
+            ) != old_values.get(sensor_type):
+                median_sensor.async_write_ha_state()
+
+        if self._threshold_engine.dirty:
+            old_state = self._attr_state
+            changed, problem = self._threshold_engine.refresh()
+            self.apply_threshold_result(changed, problem)
+            if changed or self._attr_state != old_state:
+                self.async_write_ha_state()
+
+    def _median_aggregator(self, sensor_type: str) -> MemberAggregator:
+        """Return the member aggregator of a sensor type."""
+        aggregator = self._median_aggregators.get(sensor_type)
+        if aggregator is None:
+            aggregator = self._median_aggregators[sensor_type] = MemberAggregator()
+        return aggregator
+
     def _update_median_sensors(self) -> None:
-        """Aktualisiere die Median-Werte für alle Sensoren."""
+        """Aktualisiere die Median-Werte für alle Sensoren (alle Member neu einlesen)."""
         if not self._member_plants:
+            self._track_member_sensors(set())
             return
 
-        # Dictionary für die Sensor-Werte
-        sensor_values = {
-            'temperature': [], 
-            'moisture': [],
-            'conductivity': [], 
-            'illuminance': [],
-            'humidity': [],
-            'CO2': [],
-            'ppfd': [],
-            'dli': [],
-            'total_integral': [],
-            'moisture_consumption': [],
-            'total_water_consumption': [],  # Füge Total Water hinzu
-            'fertilizer_consumption': [],
-            'total_fertilizer_consumption': [],  # Füge Total Fertilizer hinzu
-            'power_consumption': [],
-            'total_power_consumption': []  # Füge Total Power hinzu
-        }
-
+        plant_registry = _async_get_plant_registry(self._hass)
+        sources = {}
+        found = []
         for plant_id in self._member_plants:
-            plant = None
-            # Suche die Plant Entity
-            for entry_id in self._hass.data[DOMAIN]:
-                if ATTR_PLANT in self._hass.data[DOMAIN][entry_id]:
-                    if self._hass.data[DOMAIN][entry_id][ATTR_PLANT].entity_id == plant_id:
-                        plant = self._hass.data[DOMAIN][entry_id][ATTR_PLANT]
-                        break
+            plant = plant_registry.get_by_entity_id(plant_id)
 
             if not plant:
                 _LOGGER.warning("Could not find plant %s", plant_id)
                 continue
+            found.append(plant_id)
 
             # Sammle die Sensor-Werte für alle Sensor-Typen
-            sensors_to_check = {
-                'temperature': plant.sensor_temperature,
-                'moisture': plant.sensor_moisture,
-                'conductivity': plant.sensor_conductivity,
-                'illuminance': plant.sensor_illuminance,
-                'humidity': plant.sensor_humidity,
-                'CO2': plant.sensor_CO2,
-                'ppfd': plant.ppfd,
-                'dli': plant.dli,
-                'total_integral': plant.total_integral,
-                'moisture_consumption': plant.moisture_consumption,
-                'total_water_consumption': plant.total_water_consumption,  # Füge Total Water hinzu
-                'fertilizer_consumption': plant.fertilizer_consumption,
-                'total_fertilizer_consumption': plant.total_fertilizer_consumption,  # Füge Total Fertilizer hinzu
-                'power_consumption': plant.sensor_power_consumption,
-                'total_power_consumption': plant.total_power_consumption  # Füge Total Power hinzu
-            }
-
-            for sensor_type, sensor in sensors_to_check.items():
-                if sensor and hasattr(sensor, 'state') and sensor.state not in (STATE_UNKNOWN, STATE_UNAVAILABLE, None):
-                    try:
-                        # Für DLI/PPFD/total_integral/consumption speichern wir auch den Sensor selbst
-                        if sensor_type in ['ppfd', 'dli', 'total_integral', 
-                                         'moisture_consumption', 'total_water_consumption',
-                                         'fertilizer_consumption', 'total_fertilizer_consumption',
-                                         'power_consumption', 'total_power_consumption']:
-                            sensor_values[sensor_type].append((float(sensor.state), sensor))
-                        else:
-                            sensor_values[sensor_type].append(float(sensor.state))
-                    except (TypeError, ValueError) as ex:
-                        _LOGGER.debug("Could not convert %s value %s: %s",
-                                    sensor_type, sensor.state, ex)
-                        continue
-
-        # Berechne Aggregate
-        for sensor_type, values in sensor_values.items():
-            if values:
-                aggregation_method = self._plant_info.get('aggregations', {}).get(
-                    sensor_type, DEFAULT_AGGREGATIONS.get(sensor_type, AGGREGATION_MEDIAN)
+            for sensor_type, sensor in plant._median_source_sensors().items():
+                if getattr(sensor, 'entity_id', None):
+                    sources[sensor.entity_id] = (plant_id, sensor_type)
+                self._median_aggregator(sensor_type).update(
+                    plant_id, parse_value(getattr(sensor, 'state', None))
                 )
 
-                # Spezielle Behandlung für Sensoren mit Original-Berechnung
-                if sensor_type in ['ppfd', 'dli', 'total_integral', 
-                                 'moisture_consumption', 'total_water_consumption',
-                                 'fertilizer_consumption', 'total_fertilizer_consumption',
-                                 'power_consumption', 'total_power_consumption'] and aggregation_method == AGGREGATION_ORIGINAL:
-                    # Bei Original-Berechnung nehmen wir den ersten gültigen Sensor
-                    if values:
-                        self._median_sensors[sensor_type] = values[0] if isinstance(values[0], (int, float)) else values[0][0]
-
-                # Für alle anderen Fälle extrahieren wir nur die Werte
-                if sensor_type in ['ppfd', 'dli', 'total_integral', 
-                                 'moisture_consumption', 'total_water_consumption',
-                                 'fertilizer_consumption', 'total_fertilizer_consumption',
-                                 'power_consumption', 'total_power_consumption']:
-                    values = [v[0] for v in values]  # Extrahiere nur die Werte, nicht die Sensoren
-
-                if aggregation_method == AGGREGATION_MEAN:
-                    value = sum(values) / len(values)
-                elif aggregation_method == AGGREGATION_MIN:
-                    value = min(values)
-                elif aggregation_method == AGGREGATION_MAX:
-                    value = max(values)
-                else:  # AGGREGATION_MEDIAN
-                    sorted_values = sorted(values)
-                    n = len(sorted_values)
-                    if n % 2 == 0:
-                        value = (sorted_values[n//2 - 1] + sorted_values[n//2]) / 2
-                    else:
-                        value = sorted_values[n//2]
-
-                # Runde die Werte entsprechend zentraler Dezimal-Konfiguration
-                try:
-                    decimals = self.decimals_for(sensor_type)
-                except Exception:
-                    decimals = 2
-                self._median_sensors[sensor_type] = round(value, decimals)
+        # Entfernte oder nicht geladene Member aus den Aggregaten nehmen
+        for aggregator in self._median_aggregators.values():
+            aggregator.retain(found)
+
+        self._median_sources = sources
+        self._track_member_sensors(set(sources))
+        self._compute_median_values()
+
+    def _compute_median_values(self) -> None:
+        """Read the aggregates of all sensor types from the member aggregators."""
+        for sensor_type, aggregator in self._median_aggregators.items():
+            # Ohne gültige Werte bleibt der letzte Wert erhalten
+            if not aggregator:
+                continue
+            aggregation_method = self._plant_info.get('aggregations', {}).get(
+                sensor_type, DEFAULT_AGGREGATIONS.get(sensor_type, AGGREGATION_MEDIAN)
+            )
+            # AGGREGATION_ORIGINAL wird wie bisher als Median berechnet
+            value = aggregator.aggregate(aggregation_method)
+
+            # Runde die Werte entsprechend zentraler Dezimal-Konfiguration
+            try:
+                decimals = self.decimals_for(sensor_type)
+            except Exception:
+                decimals = 2
+            self._median_sensors[sensor_type] = round(value, decimals)
+
+        # Slot-Tabelle der Grenzwert-Auswertung nachziehen
+        for sensor_type in CYCLE_MEDIAN_KEYS:
+            self._threshold_engine.set_current(sensor_type, self._median_sensors.get(sensor_type))
 
     def _update_cycle_attributes(self) -> None:
         """Update cycle attributes based on member plants."""
@@ -2130,22 +2345,17 @@ class PlantDevice(Entity):
 
         # Sammle die Attribute aller Member Plants
         member_count = len(self._member_plants)
+        plant_registry = _async_get_plant_registry(self._hass)
         for plant_id in self._member_plants:
-            found = False
-            for entry_id in self._hass.data[DOMAIN]:
-                if ATTR_PLANT in self._hass.data[DOMAIN][entry_id]:
-                    plant = self._hass.data[DOMAIN][entry_id][ATTR_PLANT]
-                    if plant.entity_id == plant_id:
-                        found = True
-                        # Füge die Werte zu den entsprechenden Listen hinzu
-                        attributes["member_count"].append(str(member_count))
-                        for attr in [key for key in attributes.keys() if key != "member_count"]:
-                            value = plant._plant_info.get(attr, "")
-                            attributes[attr].append(str(value) if value else "")
-                        break
-            
-            # Wenn die Plant nicht gefunden wurde, füge leere Strings hinzu
-            if not found:
+            plant = plant_registry.get_by_entity_id(plant_id)
+            if plant is not None:
+                # Füge die Werte zu den entsprechenden Listen hinzu
+                attributes["member_count"].append(str(member_count))
+                for attr in [key for key in attributes.keys() if key != "member_count"]:
+                    value = plant._plant_info.get(attr, "")
+                    attributes[attr].append(str(value) if value else "")
+            else:
+                # Wenn die Plant nicht gefunden wurde, füge leere Strings hinzu
                 attributes["member_count"].append(str(member_count))
                 for attr in [key for key in attributes.keys() if key != "member_count"]:
                     attributes[attr].append("")
@@ -2265,29 +2475,20 @@ async def async_remove_config_entry_device(
         # Finde die Plant Entity
         entity_registry = er.async_get(hass)
         plant_entity_id = None
-        for entity_entry in entity_registry.entities.values():
-            if entity_entry.device_id == device_entry.id and entity_entry.domain == DOMAIN:
+        for entity_entry in er.async_entries_for_device(entity_registry, device_entry.id):
+            if entity_entry.domain == DOMAIN:
                 plant_entity_id = entity_entry.entity_id
                 break
                 
         if plant_entity_id:
-            # Suche das Cycle Device
-            for device in device_registry.devices.values():
-                if device.id == device_entry.via_device_id:
-                    cycle_device = device
-                    # Finde den zugehörigen Cycle
-                    for entry_id in hass.data[DOMAIN]:
-                        if ATTR_PLANT in hass.data[DOMAIN][entry_id]:
-                            cycle = hass.data[DOMAIN][entry_id][ATTR_PLANT]
-                            if (cycle.device_type == DEVICE_TYPE_CYCLE and 
-                                cycle.unique_id == next(iter(cycle_device.identifiers))[1]):
-                                # Entferne die Plant aus dem Cycle
-                                cycle.remove_member_plant(plant_entity_id)
-                                # Aktualisiere Flowering Duration
-                                if cycle.flowering_duration:
-                                    await cycle.flowering_duration._update_cycle_duration()
-                                break
-                    break
+            # Finde den zugehörigen Cycle direkt über die via_device_id
+            cycle = _async_get_plant_registry(hass).get_by_device_id(device_entry.via_device_id)
+            if cycle and cycle.device_type == DEVICE_TYPE_CYCLE:
+                # Entferne die Plant aus dem Cycle
+                cycle.remove_member_plant(plant_entity_id)
+                # Aktualisiere Flowering Duration
+                if cycle.flowering_duration:
+                    await cycle.flowering_duration._update_cycle_duration()
     
     # Entferne das Device
     device_registry.async_remove_device(device_entry.id)
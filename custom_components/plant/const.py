@@ -8,6 +8,32 @@ DOMAIN_PLANTBOOK = "seedfinder"
 CYCLE_DOMAIN = "cycle"
 
 REQUEST_TIMEOUT = 30
+# Sekunden, in denen Änderungen der Member-Sensoren eines Cycles gesammelt werden
+CYCLE_MEDIAN_UPDATE_DELAY = 2
+# Sekunden zwischen zwei Snapshots der 24h-Fenster (DLI, Wasserverbrauch)
+WINDOW_SNAPSHOT_INTERVAL = 900
+# Sekunden, in denen History-Abfragen gesammelt und gemeinsam gelesen werden
+HISTORY_BATCH_DELAY = 0.5
+# Maximale Anzahl Entitäten pro Recorder-Abfrage
+HISTORY_BATCH_SIZE = 100
+# Abfragen, deren Start bis zu so viele Sekunden auseinander liegt, werden zusammengefasst
+HISTORY_BATCH_TOLERANCE = 3600
+# Tage, die für die Feuchte-Normalisierung als Rohdaten gelesen werden, ältere aus den Langzeitstatistiken
+NORMALIZATION_RAW_HISTORY_DAYS = 3
+# Tage pro History-Abfrage beim Export der Sensordaten
+EXPORT_HISTORY_PAGE_DAYS = 7
+# Sekunden zwischen zwei Fortschritts-Events eines Export-Jobs
+EXPORT_PROGRESS_INTERVAL = 1
+# Anzahl abgeschlossener Export-Jobs, deren Status abrufbar bleibt
+EXPORT_JOBS_KEEP = 20
+# Anzahl Pflanzen, die beim Import gleichzeitig eingerichtet werden
+IMPORT_SETUP_CONCURRENCY = 10
+# Maximale Anzahl Update-Runden von plant/subscribe_info pro Sekunde und Verbindung
+INFO_UPDATES_PER_SECOND = 2
+# Sekunden ohne neuen Chunk, nach denen ein Bild-Upload abgebrochen wird
+IMAGE_UPLOAD_TIMEOUT = 300
+# Maximale Größe eines hochgeladenen Bildes in Bytes
+IMAGE_UPLOAD_MAX_SIZE = 20 * 1024 * 1024
 
 # ATTRs are used by machines
 ATTR_BATTERY = "battery"
@@ -108,6 +134,15 @@ DATA_SOURCE_PLANTBOOK = "OpenPlantbook"
 DATA_SOURCE_MANUAL = "Manual"
 DATA_SOURCE_DEFAULT = "Default values"
 DATA_UPDATED = "plant_data_updated"
+DATA_PLANT_REGISTRY = "plant_registry"
+DATA_WINDOW_STORE = "plant_window_store"
+DATA_PLANT_HISTORY = "plant_history"
+DATA_EXPORT_JOBS = "plant_export_jobs"
+DATA_ID_LOCK = "plant_id_lock"
+DATA_INFO_SENDERS = "plant_info_senders"
+DATA_IMAGE_UPLOADS = "plant_image_uploads"
+DATA_UPLOAD_VIEW = "plant_upload_view"
+EVENT_EXPORT_PROGRESS = "plant_export_progress"
 
 UNIT_PPFD = "mol/s⋅m²s"
 UNIT_MICRO_PPFD = "μmol/s⋅m²"
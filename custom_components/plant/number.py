@@ -15,7 +15,6 @@ from homeassistant.helpers.entity import EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.entity import async_generate_entity_id
 from homeassistant.helpers.restore_state import RestoreEntity
-from homeassistant.helpers import device_registry as dr
 from homeassistant.util import dt as dt_util
 
 from .const import (
@@ -38,8 +37,10 @@ from .const import (
     HEALTH_STEP,
     HEALTH_DEFAULT,
     CONF_DEFAULT_HEALTH,
+    DATA_PLANT_REGISTRY,
 )
 
+from .plant_aggregation import MemberAggregator
 from .plant_thresholds import (
     PlantMaxMoisture,
     PlantMinMoisture,
@@ -193,6 +194,24 @@ async def async_setup_entry(
     return True
 
 
+def _flowering_duration_of(plant) -> int | None:
+    """Return the flowering duration of a member plant or None."""
+    if not plant.flowering_duration or plant.flowering_duration.native_value is None:
+        return None
+    try:
+        return int(plant.flowering_duration.native_value)
+    except (ValueError, TypeError):
+        return None
+
+
+def _health_of(plant) -> float | None:
+    """Return the health value of a member plant or None."""
+    if not plant.health_number:
+        return None
+    # Verwende native_value anstelle von state
+    return plant.health_number.native_value
+
+
 class FloweringDurationNumber(NumberEntity, RestoreEntity):
     """Number to track flowering duration."""
 
@@ -213,6 +232,8 @@ class FloweringDurationNumber(NumberEntity, RestoreEntity):
         self._attr_icon = "mdi:flower"
         self._attr_entity_category = None
         self._attr_mode = NumberMode.BOX
+        # Member-Werte (nur für Cycles)
+        self._member_values = None
 
     @property
     def device_info(self) -> dict:
@@ -221,46 +242,32 @@ class FloweringDurationNumber(NumberEntity, RestoreEntity):
             "identifiers": {(DOMAIN, self._plant.unique_id)},
         }
 
-    async def _update_cycle_duration(self) -> None:
-        """Aktualisiert die flowering_duration für Cycles basierend auf den Member Plants."""
+    async def _update_cycle_duration(self, member=None) -> None:
+        """Aktualisiert die flowering_duration für Cycles basierend auf den Member Plants.
+
+        Mit member wird nur der Wert dieser Member Plant im Aggregator nachgezogen.
+        """
         if self._plant.device_type != DEVICE_TYPE_CYCLE or not self._plant._member_plants:
             return
 
-        durations = []
-        for plant_id in self._plant._member_plants:
-            for entry_id in self._hass.data[DOMAIN]:
-                if ATTR_PLANT in self._hass.data[DOMAIN][entry_id]:
-                    plant = self._hass.data[DOMAIN][entry_id][ATTR_PLANT]
-                    if plant.entity_id == plant_id:
-                        if plant.flowering_duration and plant.flowering_duration.native_value is not None:
-                            try:
-                                durations.append(int(plant.flowering_duration.native_value))
-                            except (ValueError, TypeError):
-                                continue
-                        break
-
-        if not durations:
+        if member is not None and self._member_values is not None:
+            self._member_values.update(member.entity_id, _flowering_duration_of(member))
+        else:
+            self._member_values = MemberAggregator()
+            plant_registry = self._hass.data[DATA_PLANT_REGISTRY]
+            for plant_id in self._plant._member_plants:
+                plant = plant_registry.get_by_entity_id(plant_id)
+                if plant:
+                    self._member_values.update(plant_id, _flowering_duration_of(plant))
+
+        if not self._member_values:
             self._attr_native_value = 0
             self.async_write_ha_state()
             return
 
         # Berechne aggregierten Wert
         aggregation_method = self._plant.flowering_duration_aggregation
-        if aggregation_method == AGGREGATION_MEAN:
-            new_duration = round(sum(durations) / len(durations))
-        elif aggregation_method == AGGREGATION_MIN:
-            new_duration = min(durations)
-        elif aggregation_method == AGGREGATION_MAX:
-            new_duration = max(durations)
-        else:  # AGGREGATION_MEDIAN
-            sorted_values = sorted(durations)
-            n = len(sorted_values)
-            if n % 2 == 0:
-                new_duration = round((sorted_values[n//2 - 1] + sorted_values[n//2]) / 2)
-            else:
-                new_duration = sorted_values[n//2]
-
-        self._attr_native_value = new_duration
+        self._attr_native_value = round(self._member_values.aggregate(aggregation_method))
         self.async_write_ha_state()
 
     async def async_set_native_value(self, value: float) -> None:
@@ -270,51 +277,19 @@ class FloweringDurationNumber(NumberEntity, RestoreEntity):
 
         # Wenn ein Cycle seine Blütedauer ändert, aktualisiere alle Member Plants
         if self._plant.device_type == DEVICE_TYPE_CYCLE:
-            device_registry = dr.async_get(self._hass)
-            
-            # Finde das Cycle Device
-            cycle_device = device_registry.async_get_device(
-                identifiers={(DOMAIN, self._plant.unique_id)}
-            )
-            
-            if cycle_device:
-                # Finde alle zugehörigen Plant Devices
-                for device_entry in device_registry.devices.values():
-                    if device_entry.via_device_id == cycle_device.id:
-                        # Finde die zugehörige Plant Entity
-                        for entry_id in self._hass.data[DOMAIN]:
-                            if ATTR_PLANT in self._hass.data[DOMAIN][entry_id]:
-                                plant = self._hass.data[DOMAIN][entry_id][ATTR_PLANT]
-                                if (plant.device_type != DEVICE_TYPE_CYCLE and 
-                                    plant.unique_id == next(iter(device_entry.identifiers))[1]):
-                                    # Aktualisiere die Blütedauer der Plant
-                                    if plant.flowering_duration:
-                                        await plant.flowering_duration.async_set_native_value(value)
-                                    break
+            # Alle zugehörigen Member Plants direkt aus dem Index
+            for plant in self._hass.data[DATA_PLANT_REGISTRY].get_members(self._plant):
+                if plant.device_type != DEVICE_TYPE_CYCLE and plant.flowering_duration:
+                    # Aktualisiere die Blütedauer der Plant
+                    await plant.flowering_duration.async_set_native_value(value)
 
         # Bestehende Logik für Plant -> Cycle Update
         elif self._plant.device_type == DEVICE_TYPE_PLANT:
-            device_registry = dr.async_get(self._hass)
-            plant_device = device_registry.async_get_device(
-                identifiers={(DOMAIN, self._plant.unique_id)}
-            )
-            
-            if plant_device and plant_device.via_device_id:
-                # Suche das Cycle Device
-                for device in device_registry.devices.values():
-                    if device.id == plant_device.via_device_id:
-                        cycle_device = device
-                        # Finde den zugehörigen Cycle
-                        for entry_id in self._hass.data[DOMAIN]:
-                            if ATTR_PLANT in self._hass.data[DOMAIN][entry_id]:
-                                cycle = self._hass.data[DOMAIN][entry_id][ATTR_PLANT]
-                                if (cycle.device_type == DEVICE_TYPE_CYCLE and 
-                                    cycle.unique_id == next(iter(cycle_device.identifiers))[1]):
-                                    # Aktualisiere die Blütedauer des Cycles
-                                    if cycle.flowering_duration:
-                                        await cycle.flowering_duration._update_cycle_duration()
-                                    break
-                        break
+            # Finde den zugehörigen Cycle direkt über den Index
+            cycle = self._hass.data[DATA_PLANT_REGISTRY].get_cycle(self._plant)
+            if cycle and cycle.device_type == DEVICE_TYPE_CYCLE and cycle.flowering_duration:
+                # Aktualisiere die Blütedauer des Cycles
+                await cycle.flowering_duration._update_cycle_duration(self._plant)
 
     async def async_added_to_hass(self) -> None:
         """Handle entity which will be added."""
@@ -374,14 +349,11 @@ class PotSizeNumber(NumberEntity, RestoreEntity):
             return
 
         pot_sizes = []
+        plant_registry = self._hass.data[DATA_PLANT_REGISTRY]
         for plant_id in self._plant._member_plants:
-            for entry_id in self._hass.data[DOMAIN]:
-                if ATTR_PLANT in self._hass.data[DOMAIN][entry_id]:
-                    plant = self._hass.data[DOMAIN][entry_id][ATTR_PLANT]
-                    if plant.entity_id == plant_id:
-                        if plant.pot_size and plant.pot_size.native_value is not None:
-                            pot_sizes.append(plant.pot_size.native_value)
-                        break
+            plant = plant_registry.get_by_entity_id(plant_id)
+            if plant and plant.pot_size and plant.pot_size.native_value is not None:
+                pot_sizes.append(plant.pot_size.native_value)
 
         if not pot_sizes:
             self._attr_native_value = 0
@@ -414,51 +386,19 @@ class PotSizeNumber(NumberEntity, RestoreEntity):
 
         # Wenn ein Cycle seine Topfgröße ändert, aktualisiere alle Member Plants
         if self._plant.device_type == DEVICE_TYPE_CYCLE:
-            device_registry = dr.async_get(self._hass)
-            
-            # Finde das Cycle Device
-            cycle_device = device_registry.async_get_device(
-                identifiers={(DOMAIN, self._plant.unique_id)}
-            )
-            
-            if cycle_device:
-                # Finde alle zugehörigen Plant Devices
-                for device_entry in device_registry.devices.values():
-                    if device_entry.via_device_id == cycle_device.id:
-                        # Finde die zugehörige Plant Entity
-                        for entry_id in self._hass.data[DOMAIN]:
-                            if ATTR_PLANT in self._hass.data[DOMAIN][entry_id]:
-                                plant = self._hass.data[DOMAIN][entry_id][ATTR_PLANT]
-                                if (plant.device_type != DEVICE_TYPE_CYCLE and 
-                                    plant.unique_id == next(iter(device_entry.identifiers))[1]):
-                                    # Aktualisiere die Topfgröße der Plant
-                                    if plant.pot_size:
-                                        await plant.pot_size.async_set_native_value(value)
-                                    break
+            # Alle zugehörigen Member Plants direkt aus dem Index
+            for plant in self._hass.data[DATA_PLANT_REGISTRY].get_members(self._plant):
+                if plant.device_type != DEVICE_TYPE_CYCLE and plant.pot_size:
+                    # Aktualisiere die Topfgröße der Plant
+                    await plant.pot_size.async_set_native_value(value)
 
         # Bestehende Logik für Plant -> Cycle Update
         elif self._plant.device_type == DEVICE_TYPE_PLANT:
-            device_registry = dr.async_get(self._hass)
-            plant_device = device_registry.async_get_device(
-                identifiers={(DOMAIN, self._plant.unique_id)}
-            )
-            
-            if plant_device and plant_device.via_device_id:
-                # Suche das Cycle Device
-                for device in device_registry.devices.values():
-                    if device.id == plant_device.via_device_id:
-                        cycle_device = device
-                        # Finde den zugehörigen Cycle
-                        for entry_id in self._hass.data[DOMAIN]:
-                            if ATTR_PLANT in self._hass.data[DOMAIN][entry_id]:
-                                cycle = self._hass.data[DOMAIN][entry_id][ATTR_PLANT]
-                                if (cycle.device_type == DEVICE_TYPE_CYCLE and 
-                                    cycle.unique_id == next(iter(cycle_device.identifiers))[1]):
-                                    # Aktualisiere die Topfgröße des Cycles
-                                    if cycle.pot_size:
-                                        await cycle.pot_size._update_cycle_pot_size()
-                                    break
-                        break
+            # Finde den zugehörigen Cycle direkt über den Index
+            cycle = self._hass.data[DATA_PLANT_REGISTRY].get_cycle(self._plant)
+            if cycle and cycle.device_type == DEVICE_TYPE_CYCLE and cycle.pot_size:
+                # Aktualisiere die Topfgröße des Cycles
+                await cycle.pot_size._update_cycle_pot_size()
 
     async def async_added_to_hass(self) -> None:
         """Handle entity which will be added."""
@@ -515,14 +455,11 @@ class WaterCapacityNumber(NumberEntity, RestoreEntity):
             return
 
         capacities = []
+        plant_registry = self._hass.data[DATA_PLANT_REGISTRY]
         for plant_id in self._plant._member_plants:
-            for entry_id in self._hass.data[DOMAIN]:
-                if ATTR_PLANT in self._hass.data[DOMAIN][entry_id]:
-                    plant = self._hass.data[DOMAIN][entry_id][ATTR_PLANT]
-                    if plant.entity_id == plant_id:
-                        if plant.water_capacity and plant.water_capacity.native_value is not None:
-                            capacities.append(plant.water_capacity.native_value)
-                        break
+            plant = plant_registry.get_by_entity_id(plant_id)
+            if plant and plant.water_capacity and plant.water_capacity.native_value is not None:
+                capacities.append(plant.water_capacity.native_value)
 
         if not capacities:
             self._attr_native_value = DEFAULT_WATER_CAPACITY
@@ -555,51 +492,19 @@ class WaterCapacityNumber(NumberEntity, RestoreEntity):
 
         # Wenn ein Cycle seine Wasserkapazität ändert, aktualisiere alle Member Plants
         if self._plant.device_type == DEVICE_TYPE_CYCLE:
-            device_registry = dr.async_get(self._hass)
-            
-            # Finde das Cycle Device
-            cycle_device = device_registry.async_get_device(
-                identifiers={(DOMAIN, self._plant.unique_id)}
-            )
-            
-            if cycle_device:
-                # Finde alle zugehörigen Plant Devices
-                for device_entry in device_registry.devices.values():
-                    if device_entry.via_device_id == cycle_device.id:
-                        # Finde die zugehörige Plant Entity
-                        for entry_id in self._hass.data[DOMAIN]:
-                            if ATTR_PLANT in self._hass.data[DOMAIN][entry_id]:
-                                plant = self._hass.data[DOMAIN][entry_id][ATTR_PLANT]
-                                if (plant.device_type != DEVICE_TYPE_CYCLE and 
-                                    plant.unique_id == next(iter(device_entry.identifiers))[1]):
-                                    # Aktualisiere die Wasserkapazität der Plant
-                                    if plant.water_capacity:
-                                        await plant.water_capacity.async_set_native_value(value)
-                                    break
+            # Alle zugehörigen Member Plants direkt aus dem Index
+            for plant in self._hass.data[DATA_PLANT_REGISTRY].get_members(self._plant):
+                if plant.device_type != DEVICE_TYPE_CYCLE and plant.water_capacity:
+                    # Aktualisiere die Wasserkapazität der Plant
+                    await plant.water_capacity.async_set_native_value(value)
 
         # Bestehende Logik für Plant -> Cycle Update
         elif self._plant.device_type == DEVICE_TYPE_PLANT:
-            device_registry = dr.async_get(self._hass)
-            plant_device = device_registry.async_get_device(
-                identifiers={(DOMAIN, self._plant.unique_id)}
-            )
-            
-            if plant_device and plant_device.via_device_id:
-                # Suche das Cycle Device
-                for device in device_registry.devices.values():
-                    if device.id == plant_device.via_device_id:
-                        cycle_device = device
-                        # Finde den zugehörigen Cycle
-                        for entry_id in self._hass.data[DOMAIN]:
-                            if ATTR_PLANT in self._hass.data[DOMAIN][entry_id]:
-                                cycle = self._hass.data[DOMAIN][entry_id][ATTR_PLANT]
-                                if (cycle.device_type == DEVICE_TYPE_CYCLE and 
-                                    cycle.unique_id == next(iter(cycle_device.identifiers))[1]):
-                                    # Aktualisiere die Wasserkapazität des Cycles
-                                    if cycle.water_capacity:
-                                        await cycle.water_capacity._update_cycle_water_capacity()
-                                    break
-                        break
+            # Finde den zugehörigen Cycle direkt über den Index
+            cycle = self._hass.data[DATA_PLANT_REGISTRY].get_cycle(self._plant)
+            if cycle and cycle.device_type == DEVICE_TYPE_CYCLE and cycle.water_capacity:
+                # Aktualisiere die Wasserkapazität des Cycles
+                await cycle.water_capacity._update_cycle_water_capacity()
 
     async def async_added_to_hass(self) -> None:
         """Handle entity which will be added."""
@@ -650,6 +555,8 @@ class PlantHealthNumber(RestoreNumber):
             "friendly_name": self._attr_name,
             "health_history": []
         }
+        # Member-Werte (nur für Cycles)
+        self._member_values = None
 
     @property
     def device_info(self) -> dict:
@@ -658,49 +565,30 @@ class PlantHealthNumber(RestoreNumber):
             "identifiers": {(DOMAIN, self._plant.unique_id)},
         }
 
-    async def _update_cycle_health(self) -> None:
-        """Aktualisiere den Health-Wert im Cycle basierend auf den Member Plants."""
+    async def _update_cycle_health(self, member=None) -> None:
+        """Aktualisiere den Health-Wert im Cycle basierend auf den Member Plants.
+
+        Mit member wird nur der Wert dieser Member Plant im Aggregator nachgezogen.
+        """
         if self._plant.device_type != DEVICE_TYPE_CYCLE:
             return
 
-        # Sammle Health-Werte von allen Member Plants
-        health_values = []
-        for plant_id in self._plant._member_plants:
-            plant = None
-            # Suche die Plant Entity
-            for entry_id in self._hass.data[DOMAIN]:
-                if ATTR_PLANT in self._hass.data[DOMAIN][entry_id]:
-                    if self._hass.data[DOMAIN][entry_id][ATTR_PLANT].entity_id == plant_id:
-                        plant = self._hass.data[DOMAIN][entry_id][ATTR_PLANT]
-                        break
-
-            if not plant or not plant.health_number:
-                continue
-
-            # Verwende native_value anstelle von state
-            if plant.health_number.native_value is not None:
-                health_values.append(plant.health_number.native_value)
-
-        if not health_values:
+        if member is not None and self._member_values is not None:
+            self._member_values.update(member.entity_id, _health_of(member))
+        else:
+            # Sammle Health-Werte von allen Member Plants
+            self._member_values = MemberAggregator()
+            plant_registry = self._hass.data[DATA_PLANT_REGISTRY]
+            for plant_id in self._plant._member_plants:
+                plant = plant_registry.get_by_entity_id(plant_id)
+                if plant:
+                    self._member_values.update(plant_id, _health_of(plant))
+
+        if not self._member_values:
             return
 
-        # Bestimme die Aggregationsmethode
-        aggregation_method = self._plant.health_aggregation
-
         # Berechne den aggregierten Wert
-        if aggregation_method == AGGREGATION_MEAN:
-            value = sum(health_values) / len(health_values)
-        elif aggregation_method == AGGREGATION_MIN:
-            value = min(health_values)
-        elif aggregation_method == AGGREGATION_MAX:
-            value = max(health_values)
-        else:  # AGGREGATION_MEDIAN
-            sorted_values = sorted(health_values)
-            n = len(sorted_values)
-            if n % 2 == 0:
-                value = (sorted_values[n//2 - 1] + sorted_values[n//2]) / 2
-            else:
-                value = sorted_values[n//2]
+        value = self._member_values.aggregate(self._plant.health_aggregation)
 
         # Runde auf erlaubte Schritte
         value = round(value / self._attr_native_step) * self._attr_native_step
@@ -750,50 +638,18 @@ class PlantHealthNumber(RestoreNumber):
 
         # Wenn ein Cycle seinen Health-Wert ändert, aktualisiere alle Member Plants
         if self._plant.device_type == DEVICE_TYPE_CYCLE:
-            device_registry = dr.async_get(self._hass)
-            
-            # Finde das Cycle Device
-            cycle_device = device_registry.async_get_device(
-                identifiers={(DOMAIN, self._plant.unique_id)}
-            )
-            
-            if cycle_device:
-                # Finde alle zugehörigen Plant Devices
-                for device_entry in device_registry.devices.values():
-                    if device_entry.via_device_id == cycle_device.id:
-                        # Finde die zugehörige Plant Entity
-                        for entry_id in self._hass.data[DOMAIN]:
-                            if ATTR_PLANT in self._hass.data[DOMAIN][entry_id]:
-                                plant = self._hass.data[DOMAIN][entry_id][ATTR_PLANT]
-                                if (plant.device_type != DEVICE_TYPE_CYCLE and 
-                                    plant.unique_id == next(iter(device_entry.identifiers))[1]):
-                                    # Aktualisiere den Health-Wert der Plant
-                                    if plant.health_number:
-                                        await plant.health_number.async_set_native_value(value)
-                                    break
+            # Alle zugehörigen Member Plants direkt aus dem Index
+            for plant in self._hass.data[DATA_PLANT_REGISTRY].get_members(self._plant):
+                if plant.device_type != DEVICE_TYPE_CYCLE and plant.health_number:
+                    # Aktualisiere den Health-Wert der Plant
+                    await plant.health_number.async_set_native_value(value)
 
         # Bestehende Logik für Plant -> Cycle Update
         elif self._plant.device_type == DEVICE_TYPE_PLANT:
-            device_registry = dr.async_get(self._hass)
-            plant_device = device_registry.async_get_device(
-                identifiers={(DOMAIN, self._plant.unique_id)}
-            )
-            
-            if plant_device and plant_device.via_device_id:
-                # Suche das Cycle Device
-                for device in device_registry.devices.values():
-                    if device.id == plant_device.via_device_id:
-                        cycle_device = device
-                        # Finde den zugehörigen Cycle
-                        for entry_id in self._hass.data[DOMAIN]:
-                            if ATTR_PLANT in self._hass.data[DOMAIN][entry_id]:
-                                cycle = self._hass.data[DOMAIN][entry_id][ATTR_PLANT]
-                                if (cycle.device_type == DEVICE_TYPE_CYCLE and 
-                                    cycle.unique_id == next(iter(cycle_device.identifiers))[1]):
-                                    # Aktualisiere den Health-Wert des Cycles
-                                    if cycle.health_number:
-                                        await cycle.health_number._update_cycle_health()
-                                    break
-                        break
+            # Finde den zugehörigen Cycle direkt über den Index
+            cycle = self._hass.data[DATA_PLANT_REGISTRY].get_cycle(self._plant)
+            if cycle and cycle.device_type == DEVICE_TYPE_CYCLE and cycle.health_number:
+                # Aktualisiere den Health-Wert des Cycles
+                await cycle.health_number._update_cycle_health(self._plant)
 
 
@@ -0,0 +1,119 @@
+"""Streaming aggregation of member plant values for cycles.
+
+A cycle aggregates one value per member plant (mean, median, min or max).
+Instead of collecting and sorting all member values on every change, the
+values are kept in a sorted list keyed by member, so every aggregate is read
+in constant time. A single member update finds its position by binary search
+(O(log n)), the insert/remove itself shifts the tail of the list and is O(n).
+For the few hundred members of a cycle that shift is a short memmove and
+cheaper than a heap or tree kept in Python objects, which would also have to
+support min, max and deletion of arbitrary members.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left, insort
+import math
+from typing import Dict, Iterable, List
+
+from .const import AGGREGATION_MAX, AGGREGATION_MEAN, AGGREGATION_MIN
+
+
+class MemberAggregator:
+    """Sorted member values with running sum for mean/median/min/max."""
+
+    __slots__ = ("_values", "_sorted", "_sum")
+
+    def __init__(self) -> None:
+        """Initialize an empty aggregator."""
+        self._values: Dict[str, float] = {}
+        self._sorted: List[float] = []
+        self._sum = 0.0
+
+    def update(self, member: str, value: float | None) -> bool:
+        """Set the value of a member, None/NaN removes it. Returns True if it changed."""
+        if value is None or value != value:
+            return self.remove(member)
+        old = self._values.get(member)
+        if old == value:
+            return False
+        if old is not None:
+            self._discard(old)
+        self._values[member] = value
+        insort(self._sorted, value)
+        self._sum += value
+        return True
+
+    def remove(self, member: str) -> bool:
+        """Remove a member. Returns True if it was known."""
+        old = self._values.pop(member, None)
+        if old is None:
+            return False
+        self._discard(old)
+        return True
+
+    def retain(self, members: Iterable[str]) -> None:
+        """Remove all members that are not in the given collection."""
+        keep = set(members)
+        for member in [member for member in self._values if member not in keep]:
+            self.remove(member)
+
+    def clear(self) -> None:
+        """Remove all members."""
+        self._values.clear()
+        self._sorted.clear()
+        self._sum = 0.0
+
+    def __len__(self) -> int:
+        return len(self._sorted)
+
+    def __contains__(self, member: object) -> bool:
+        return member in self._values
+
+    @property
+    def mean(self) -> float | None:
+        """Return the arithmetic mean."""
+        if not self._sorted:
+            return None
+        return self._sum / len(self._sorted)
+
+    @property
+    def median(self) -> float | None:
+        """Return the median (mean of the two middle values for an even count)."""
+        n = len(self._sorted)
+        if not n:
+            return None
+        if n % 2 == 0:
+            return (self._sorted[n // 2 - 1] + self._sorted[n // 2]) / 2
+        return self._sorted[n // 2]
+
+    @property
+    def min(self) -> float | None:
+        """Return the smallest value."""
+        return self._sorted[0] if self._sorted else None
+
+    @property
+    def max(self) -> float | None:
+        """Return the largest value."""
+        return self._sorted[-1] if self._sorted else None
+
+    def aggregate(self, method: str) -> float | None:
+        """Return the aggregate for an aggregation method, median is the default."""
+        if method == AGGREGATION_MEAN:
+            return self.mean
+        if method == AGGREGATION_MIN:
+            return self.min
+        if method == AGGREGATION_MAX:
+            return self.max
+        return self.median
+
+    def _discard(self, value: float) -> None:
+        index = bisect_left(self._sorted, value)
+        del self._sorted[index]
+        if self._sorted:
+            self._sum -= value
+        else:
+            # Rundungsfehler der laufenden Summe nicht mitschleppen
+            self._sum = 0.0
+        if not math.isfinite(self._sum):
+            self._sum = math.fsum(self._sorted)
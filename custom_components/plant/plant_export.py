@@ -0,0 +1,432 @@
+"""Streaming writer (and reader) for the sensor history of export_plants.
+
+The history is fetched in pages (a group of entities over a time slice) and
+every page is formatted in the executor. The rows of each sensor are spooled
+to a temporary file (in memory up to a small size, then on disk) and copied
+into its ZIP entry once all pages of the group are written, so memory stays
+bounded by one page instead of the whole export.
+
+Two formats are supported:
+
+- CSV (``timestamp,state,unit`` with ISO timestamps), one row per state.
+- Columnar (``.bin``): a small header with the unit, then the timestamps as
+  little-endian int64 milliseconds (first value absolute, then deltas) and
+  the values as little-endian float32. Only numeric states are stored. The
+  delta encoded timestamps compress very well in the ZIP archive.
+
+read_history_file() loads both formats back, e.g. for offline analysis.
+validate_import() checks the plants of an archive before an import creates
+anything.
+
+For incremental exports, config_fingerprint() and the content hashes of
+the images describe what was exported last time, so only changes have to
+be written.
+
+Images are stored content addressed: every distinct file is written once as
+``images/<sha256><ext>`` and the plants reference it by their own filename
+(``image_refs``). ImageExtractor writes them back and skips files that are
+already on disk byte-identical.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from array import array
+import csv
+from datetime import datetime, timezone
+import hashlib
+import io
+import json
+import math
+import os
+import re
+import shutil
+import struct
+import sys
+import tempfile
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+import zipfile
+
+CSV_HEADER = ("timestamp", "state", "unit")
+
+SENSOR_DATA_FORMAT_CSV = "csv"
+SENSOR_DATA_FORMAT_COLUMNAR = "columnar"
+SENSOR_DATA_SUFFIXES = {
+    SENSOR_DATA_FORMAT_CSV: ".csv",
+    SENSOR_DATA_FORMAT_COLUMNAR: ".bin",
+}
+
+# Magic, Version, Anzahl Werte, Länge der Einheit (UTF-8), danach Einheit und Spalten
+_COLUMNAR_HEADER = struct.Struct("<4sBIH")
+_COLUMNAR_MAGIC = b"BRKH"
+_COLUMNAR_VERSION = 1
+
+# Ab dieser Größe werden die Zeilen eines Sensors auf die Platte ausgelagert
+_SPOOL_MAX_SIZE = 1024 * 1024
+
+_SKIPPED_STATES = ("unknown", "unavailable")
+
+IMAGE_DIR = "images/"
+# Schlüssel des Namens in plant_info (ATTR_NAME)
+_PLANT_NAME = "name"
+_DIGEST_RE = re.compile(r"[0-9a-f]{64}")
+_READ_SIZE = 64 * 1024
+
+
+def export_unit(unit: str | None) -> str:
+    """Return the unit as written to the CSV files."""
+    # Fix encoding issues with degree symbol
+    return unit.replace("°", "deg") if unit else ""
+
+
+class HistoryColumns(NamedTuple):
+    """Numeric history of one sensor."""
+
+    timestamps: array  # int64 epoch milliseconds
+    values: array  # float32 (CSV: float64)
+    unit: str
+
+
+class _Spool(ABC):
+    """Rows of one sensor until they are copied into the archive."""
+
+    def __init__(self, filename: str) -> None:
+        self.filename = filename
+        self.rows = 0
+        # Zeitstempel der letzten geschriebenen Zeile (Seitengrenzen)
+        self.last: float | None = None
+
+    @abstractmethod
+    def write(self, when: datetime, state: Any, unit: str) -> None:
+        """Add one row."""
+
+    def flush(self) -> None:
+        """Write buffered rows of the current page."""
+
+    @abstractmethod
+    def copy_to(self, zipf: zipfile.ZipFile) -> None:
+        """Copy the rows into the archive."""
+
+    @abstractmethod
+    def close(self) -> None:
+        """Close the spool files."""
+
+
+class _CsvSpool(_Spool):
+    def __init__(self, filename: str) -> None:
+        super().__init__(filename)
+        self.file = tempfile.SpooledTemporaryFile(
+            max_size=_SPOOL_MAX_SIZE, mode="w+", encoding="utf-8", newline=""
+        )
+        self.writer = csv.writer(self.file, lineterminator="\n")
+        self.writer.writerow(CSV_HEADER)
+
+    def write(self, when: datetime, state: Any, unit: str) -> None:
+        self.writer.writerow((when.isoformat(), state, unit))
+        self.rows += 1
+
+    def copy_to(self, zipf: zipfile.ZipFile) -> None:
+        self.file.seek(0)
+        with zipf.open(self.filename, "w") as entry, io.TextIOWrapper(
+            entry, encoding="utf-8", newline=""
+        ) as text:
+            shutil.copyfileobj(self.file, text)
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class _ColumnarSpool(_Spool):
+    def __init__(self, filename: str) -> None:
+        super().__init__(filename)
+        self.times = tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_SIZE)
+        self.values = tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_SIZE)
+        self.unit = ""
+        self._page_times = array("q")
+        self._page_values = array("f")
+        self._last_ms = 0
+
+    def write(self, when: datetime, state: Any, unit: str) -> None:
+        try:
+            value = float(state)
+        except (TypeError, ValueError):
+            # Nur numerische Zustände im Spaltenformat
+            return
+        if not math.isfinite(value):
+            return
+        ms = round(when.timestamp() * 1000)
+        self._page_times.append(ms - self._last_ms)
+        self._page_values.append(value)
+        self._last_ms = ms
+        if unit:
+            self.unit = unit
+        self.rows += 1
+
+    def flush(self) -> None:
+        if not self._page_times:
+            return
+        if sys.byteorder != "little":
+            self._page_times.byteswap()
+            self._page_values.byteswap()
+        self.times.write(self._page_times.tobytes())
+        self.values.write(self._page_values.tobytes())
+        self._page_times = array("q")
+        self._page_values = array("f")
+
+    def copy_to(self, zipf: zipfile.ZipFile) -> None:
+        self.flush()
+        unit = self.unit.encode("utf-8")
+        with zipf.open(self.filename, "w") as entry:
+            entry.write(
+                _COLUMNAR_HEADER.pack(_COLUMNAR_MAGIC, _COLUMNAR_VERSION, self.rows, len(unit))
+            )
+            entry.write(unit)
+            for column in (self.times, self.values):
+                column.seek(0)
+                shutil.copyfileobj(column, entry)
+
+    def close(self) -> None:
+        self.times.close()
+        self.values.close()
+
+
+class HistoryArchiveWriter:
+    """Writes the sensor history files of one export into a ZipFile.
+
+    All methods do blocking I/O and are meant to run in the executor, one
+    at a time.
+    """
+
+    def __init__(
+        self, zipf: zipfile.ZipFile, data_format: str = SENSOR_DATA_FORMAT_CSV
+    ) -> None:
+        """Initialize for an open, writable archive."""
+        self._zipf = zipf
+        self._spool_class = (
+            _ColumnarSpool if data_format == SENSOR_DATA_FORMAT_COLUMNAR else _CsvSpool
+        )
+        self._spools: Dict[str, _Spool] = {}
+
+    def begin(self, filenames: Dict[str, str], since: float | None = None) -> None:
+        """Start a group of sensors, filenames maps entity_id to the file path.
+
+        With since (epoch seconds) only rows after it are written, e.g. for an
+        incremental export.
+        """
+        self.discard()
+        self._spools = {
+            entity_id: self._spool_class(filename)
+            for entity_id, filename in filenames.items()
+        }
+        for spool in self._spools.values():
+            spool.last = since
+
+    def write_statistics(
+        self, entity_id: str, rows: Iterable[Tuple[float, float]], unit: str | None
+    ) -> None:
+        """Write hourly means (start timestamp, mean) with a fixed unit."""
+        spool = self._spools[entity_id]
+        unit = export_unit(unit)
+        for start, value in rows:
+            spool.write(datetime.fromtimestamp(start, timezone.utc), value, unit)
+            spool.last = start
+        spool.flush()
+
+    def write_states(self, entity_id: str, states: Iterable[Any]) -> None:
+        """Write a page of states, skipping rows already written by the previous page.
+
+        Rows are keyed by last_changed, so updates of the attributes only do
+        not repeat the state.
+        """
+        spool = self._spools[entity_id]
+        last = spool.last
+        for state in states:
+            timestamp = state.last_changed.timestamp()
+            if last is not None and timestamp <= last:
+                continue
+            last = timestamp
+            if state.state in _SKIPPED_STATES:
+                continue
+            spool.write(
+                state.last_changed,
+                state.state,
+                export_unit(state.attributes.get("unit_of_measurement")),
+            )
+        spool.last = last
+        spool.flush()
+
+    def write_page(self, states: Dict[str, Iterable[Any]]) -> None:
+        """Write the states of a page for several sensors (entity_id -> states)."""
+        for entity_id, entity_states in states.items():
+            self.write_states(entity_id, entity_states)
+
+    def finish(self) -> Dict[str, int]:
+        """Copy the sensors with rows into the archive and return the row counts."""
+        counts = {}
+        try:
+            for entity_id, spool in self._spools.items():
+                counts[entity_id] = spool.rows
+                if spool.rows:
+                    spool.copy_to(self._zipf)
+        finally:
+            self.discard()
+        return counts
+
+    def discard(self) -> None:
+        """Drop the spooled rows of the current group."""
+        for spool in self._spools.values():
+            spool.close()
+        self._spools = {}
+
+
+def config_fingerprint(plant_info: Dict[str, Any], options: Dict[str, Any]) -> str:
+    """Return a hash of the exported configuration of a plant."""
+    payload = json.dumps(
+        {"plant_info": plant_info, "options": options}, sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def file_digest(fileobj: Any) -> str:
+    """Return the sha256 of an open binary file (read to its end)."""
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: fileobj.read(_READ_SIZE), b""):
+        digest.update(chunk)
+    return digest.hexdigest()
+
+
+def content_names(image_files: Iterable[Tuple[str, str]]) -> Dict[str, str]:
+    """Map the filenames of (path, filename) pairs to their content addressed name."""
+    names: Dict[str, str] = {}
+    for path, filename in image_files:
+        if filename in names:
+            continue
+        with open(path, "rb") as image:
+            digest = file_digest(image)
+        names[filename] = digest + os.path.splitext(filename)[1].lower()
+    return names
+
+
+class ImageExtractor:
+    """Extracts the images of an archive into a directory.
+
+    Files that already exist with the same content are skipped. A member
+    referenced under several filenames is read once, the other files are
+    hard links (or copies) of the first one.
+
+    Blocking, meant to run in the executor.
+    """
+
+    def __init__(self, zipf: zipfile.ZipFile, directory: str) -> None:
+        """Initialize for an open archive and the image directory."""
+        self._zipf = zipf
+        self._directory = directory
+        self._written: Dict[str, str] = {}
+        self._digests: Dict[str, str] = {}
+
+    def extract(self, member: str, filename: str) -> bool:
+        """Write member as filename, returns False if it was already there."""
+        target = os.path.join(self._directory, os.path.basename(filename))
+        if os.path.exists(target):
+            with open(target, "rb") as existing:
+                if file_digest(existing) == self._digest(member):
+                    return False
+        source = self._written.get(member)
+        if source is not None and os.path.exists(source):
+            try:
+                os.link(source, target + ".part")
+            except OSError:
+                shutil.copyfile(source, target + ".part")
+        else:
+            with self._zipf.open(member) as data, open(target + ".part", "wb") as out:
+                shutil.copyfileobj(data, out)
+        os.replace(target + ".part", target)
+        self._written[member] = target
+        return True
+
+    def _digest(self, member: str) -> str:
+        if member not in self._digests:
+            stem = os.path.splitext(os.path.basename(member))[0]
+            if _DIGEST_RE.fullmatch(stem):
+                self._digests[member] = stem
+            else:
+                # Ältere Archive speichern Bilder unter ihrem Dateinamen
+                with self._zipf.open(member) as data:
+                    self._digests[member] = file_digest(data)
+        return self._digests[member]
+
+
+def read_columnar(data: bytes) -> HistoryColumns:
+    """Load a columnar history file."""
+    if len(data) < _COLUMNAR_HEADER.size:
+        raise ValueError("Columnar history file is truncated")
+    magic, version, count, unit_size = _COLUMNAR_HEADER.unpack_from(data)
+    offset = _COLUMNAR_HEADER.size + unit_size
+    if (
+        magic != _COLUMNAR_MAGIC
+        or version != _COLUMNAR_VERSION
+        or len(data) != offset + count * 12
+    ):
+        raise ValueError("Not a columnar history file of this version")
+    unit = data[_COLUMNAR_HEADER.size : offset].decode("utf-8")
+    timestamps = array("q")
+    timestamps.frombytes(data[offset : offset + count * 8])
+    values = array("f")
+    values.frombytes(data[offset + count * 8 :])
+    if sys.byteorder != "little":
+        timestamps.byteswap()
+        values.byteswap()
+    # Deltas aufsummieren
+    total = 0
+    for index, delta in enumerate(timestamps):
+        total += delta
+        timestamps[index] = total
+    return HistoryColumns(timestamps, values, unit)
+
+
+def read_csv(text: str) -> HistoryColumns:
+    """Load the numeric rows of a CSV history file."""
+    timestamps = array("q")
+    values = array("d")
+    unit = ""
+    reader = csv.reader(io.StringIO(text))
+    next(reader, None)
+    for row in reader:
+        if len(row) < 2:
+            continue
+        try:
+            value = float(row[1])
+            ms = round(datetime.fromisoformat(row[0]).timestamp() * 1000)
+        except ValueError:
+            continue
+        timestamps.append(ms)
+        values.append(value)
+        if len(row) > 2 and row[2]:
+            unit = row[2]
+    return HistoryColumns(timestamps, values, unit)
+
+
+def read_history_file(filename: str, data: bytes) -> HistoryColumns:
+    """Load a sensor history file of an export archive (CSV or columnar)."""
+    if filename.endswith(SENSOR_DATA_SUFFIXES[SENSOR_DATA_FORMAT_COLUMNAR]):
+        return read_columnar(data)
+    return read_csv(data.decode("utf-8"))
+
+
+def validate_import(plants: List[Any], new_plant_name: Optional[str] = None) -> List[str]:
+    """Return the problems of the plants of an archive (empty if it can be imported)."""
+    invalid: List[str] = []
+    target_names = set()
+    for index, plant_data in enumerate(plants):
+        if isinstance(plant_data, dict) and plant_data.get("config_changed") is False:
+            # Delta-Export: unveränderte Pflanze ohne Konfiguration
+            continue
+        plant_info = plant_data.get("plant_info") if isinstance(plant_data, dict) else None
+        if not isinstance(plant_info, dict) or not plant_info.get(_PLANT_NAME):
+            invalid.append(f"plant {index + 1}: missing plant_info or name")
+            continue
+        target_name = new_plant_name if new_plant_name else plant_info[_PLANT_NAME]
+        if target_name in target_names:
+            invalid.append(f"{target_name}: plant name used more than once")
+        target_names.add(target_name)
+    return invalid
@@ -0,0 +1,225 @@
+"""Background jobs for export_plants.
+
+A background export runs as a task and returns a job id right away. The
+progress (done/total steps) is fired as EVENT_EXPORT_PROGRESS on the bus,
+at most every EXPORT_PROGRESS_INTERVAL seconds and always when the job
+finishes, and can be followed per job via the plant/export_subscribe
+websocket command. A running job can be cancelled, the partial archive is
+removed then (and when the job fails).
+
+Steps in the executor are run with async_run_executor_job(): a cancelled
+job waits until the worker thread returned, so the archive is never closed
+while a thread is still writing to it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, List
+import uuid
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+
+from .const import (
+    DATA_EXPORT_JOBS,
+    EVENT_EXPORT_PROGRESS,
+    EXPORT_JOBS_KEEP,
+    EXPORT_PROGRESS_INTERVAL,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+EXPORT_STATUS_RUNNING = "running"
+EXPORT_STATUS_DONE = "done"
+EXPORT_STATUS_FAILED = "failed"
+EXPORT_STATUS_CANCELLED = "cancelled"
+
+
+class ExportJob:
+    """State of one background export."""
+
+    def __init__(self, hass: HomeAssistant, file_path: str) -> None:
+        """Initialize a running job without progress."""
+        self._hass = hass
+        self.job_id = uuid.uuid4().hex
+        self.file_path = file_path
+        self.status = EXPORT_STATUS_RUNNING
+        self.done = 0
+        self.total = 0
+        self.result: Dict[str, Any] | None = None
+        self.error: str | None = None
+        self.task: asyncio.Task | None = None
+        # Erst ab hier gehört die Datei unter file_path dem Job
+        self.archive_started = False
+        self._listeners: List[Callable[[ExportJob], None]] = []
+        self._last_notify = 0.0
+
+    @property
+    def finished(self) -> bool:
+        """Return True if the job is no longer running."""
+        return self.status != EXPORT_STATUS_RUNNING
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Return the job state as sent to clients and on the bus."""
+        return {
+            "job_id": self.job_id,
+            "file_path": self.file_path,
+            "status": self.status,
+            "done": self.done,
+            "total": self.total,
+            "result": self.result,
+            "error": self.error,
+        }
+
+    @callback
+    def async_add_total(self, steps: int) -> None:
+        """Announce additional steps of the job."""
+        self.total += steps
+        self._async_notify()
+
+    @callback
+    def async_advance(self, steps: int = 1) -> None:
+        """Mark steps of the job as done."""
+        self.done = min(self.done + steps, self.total)
+        self._async_notify()
+
+    @callback
+    def async_subscribe(self, listener: Callable[[ExportJob], None]) -> CALLBACK_TYPE:
+        """Call listener on every progress update, returns the unsubscribe callback."""
+        self._listeners.append(listener)
+
+        @callback
+        def _unsubscribe() -> None:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+        return _unsubscribe
+
+    @callback
+    def async_finish(
+        self, status: str, result: Dict[str, Any] | None = None, error: str | None = None
+    ) -> None:
+        """Set the final state and notify the listeners a last time."""
+        self.status = status
+        self.result = result
+        self.error = error
+        if status == EXPORT_STATUS_DONE:
+            self.done = self.total
+        self._async_notify()
+        self._listeners.clear()
+
+    @callback
+    def _async_notify(self) -> None:
+        now = self._hass.loop.time()
+        if not self.finished and now - self._last_notify < EXPORT_PROGRESS_INTERVAL:
+            return
+        self._last_notify = now
+        self._hass.bus.async_fire(EVENT_EXPORT_PROGRESS, self.as_dict())
+        for listener in list(self._listeners):
+            listener(self)
+
+
+class PlantExportJobs:
+    """Running and recently finished export jobs."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize without jobs."""
+        self._hass = hass
+        self._jobs: Dict[str, ExportJob] = {}
+
+    def get(self, job_id: str) -> ExportJob | None:
+        """Return a job by id."""
+        return self._jobs.get(job_id)
+
+    @callback
+    def async_start(
+        self,
+        file_path: str,
+        run: Callable[[ExportJob], Awaitable[Dict[str, Any]]],
+    ) -> ExportJob:
+        """Start run(job) as a background task and return its job."""
+        job = ExportJob(self._hass, file_path)
+        self._forget_finished()
+        self._jobs[job.job_id] = job
+        job.task = self._hass.async_create_background_task(
+            self._async_run(job, run), f"{DATA_EXPORT_JOBS}_{job.job_id}"
+        )
+        return job
+
+    @callback
+    def async_cancel(self, job_id: str) -> bool:
+        """Cancel a running job. Returns False if it is unknown or finished."""
+        job = self._jobs.get(job_id)
+        if job is None or job.finished or job.task is None:
+            return False
+        job.task.cancel()
+        return True
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Cancel all running jobs."""
+        for job in self._jobs.values():
+            if not job.finished and job.task is not None:
+                job.task.cancel()
+
+    async def _async_run(
+        self, job: ExportJob, run: Callable[[ExportJob], Awaitable[Dict[str, Any]]]
+    ) -> None:
+        try:
+            result = await run(job)
+        except asyncio.CancelledError:
+            _LOGGER.info("Export %s cancelled", job.job_id)
+            await self._async_remove_partial(job)
+            job.async_finish(EXPORT_STATUS_CANCELLED)
+            return
+        except Exception as ex:  # pylint: disable=broad-except
+            _LOGGER.error("Error exporting plants: %s", ex)
+            await self._async_remove_partial(job)
+            job.async_finish(EXPORT_STATUS_FAILED, error=str(ex))
+            return
+        job.async_finish(EXPORT_STATUS_DONE, result=result)
+
+    async def _async_remove_partial(self, job: ExportJob) -> None:
+        # Eine vorhandene Datei, die der Job nie geöffnet hat, bleibt erhalten
+        if job.archive_started:
+            await self._hass.async_add_executor_job(_remove_file, job.file_path)
+
+    def _forget_finished(self) -> None:
+        finished = [job_id for job_id, job in self._jobs.items() if job.finished]
+        for job_id in finished[: max(len(finished) - EXPORT_JOBS_KEEP + 1, 0)]:
+            del self._jobs[job_id]
+
+
+def _remove_file(file_path: str) -> None:
+    """Remove a partial archive."""
+    try:
+        os.remove(file_path)
+    except OSError:
+        pass
+
+
+async def async_run_executor_job(
+    hass: HomeAssistant, func: Callable[..., Any], *args: Any
+) -> Any:
+    """Run func in the executor, a cancellation waits until it has returned."""
+    future = asyncio.ensure_future(hass.async_add_executor_job(func, *args))
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        # Der Worker-Thread läuft weiter, erst danach darf aufgeräumt werden
+        while not future.done():
+            try:
+                await asyncio.wait([future])
+            except asyncio.CancelledError:
+                continue
+        raise
+
+
+@callback
+def async_get_export_jobs(hass: HomeAssistant) -> PlantExportJobs:
+    """Return the shared export job registry, create it on first use."""
+    if DATA_EXPORT_JOBS not in hass.data:
+        hass.data[DATA_EXPORT_JOBS] = PlantExportJobs(hass)
+    return hass.data[DATA_EXPORT_JOBS]
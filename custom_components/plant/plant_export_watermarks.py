@@ -0,0 +1,45 @@
+"""Watermarks of incremental plant exports.
+
+For every exported plant (keyed by config entry id) the last incremental
+export stores a hash of the configuration, the content hashes of the
+exported images and the timestamp up to which the sensor history was
+written. The next incremental export only writes what changed since then.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+STORAGE_KEY = f"{DOMAIN}_export_watermarks"
+STORAGE_VERSION = 1
+
+
+class ExportWatermarks:
+    """Per plant watermarks of the last incremental export."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the store, nothing is read until async_load()."""
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._plants: Dict[str, Dict[str, Any]] = {}
+
+    async def async_load(self) -> None:
+        """Read the stored watermarks."""
+        data = await self._store.async_load() or {}
+        self._plants = dict(data.get("plants", {}))
+
+    def get(self, entry_id: str) -> Dict[str, Any]:
+        """Return the watermark of a plant, empty if it was never exported."""
+        return self._plants.get(entry_id, {})
+
+    def update(self, entry_id: str, **watermark: Any) -> None:
+        """Merge new values into the watermark of a plant."""
+        self._plants[entry_id] = {**self._plants.get(entry_id, {}), **watermark}
+
+    async def async_save(self) -> None:
+        """Write the watermarks."""
+        await self._store.async_save({"plants": self._plants})
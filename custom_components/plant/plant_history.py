@@ -0,0 +1,375 @@
+"""Batched access to the recorder history of many entities.
+
+Normalization and export used to query the recorder once per entity, each
+in its own executor job. Requests are now collected for a short moment and
+combined: requests with similar start times are read with a single
+get_significant_states call for all their entity_ids and the result is
+sliced back to the window of every request. A restart of many plants thus
+issues a handful of recorder queries instead of one per sensor.
+
+For long windows the older part can be read from the long-term statistics
+(hourly means) instead of the raw states, which reads one row per hour
+instead of every single reading.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from functools import partial
+import logging
+from typing import Any, Dict, Iterable, List, Tuple
+
+from homeassistant.components.recorder import get_instance, history, statistics
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, State, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import (
+    DATA_PLANT_HISTORY,
+    HISTORY_BATCH_DELAY,
+    HISTORY_BATCH_SIZE,
+    HISTORY_BATCH_TOLERANCE,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Art der Abfrage, nur gleiche Arten werden zusammengefasst
+_KIND_STATES = "states"
+_KIND_STATES_ATTRIBUTES = "states_attributes"
+_KIND_STATISTICS = "statistics"
+
+_HOUR = 3600
+# Obergrenze für die Gewichtung einer Stunde aus den Statistiken
+_MAX_SAMPLES_PER_HOUR = 60
+
+
+class _HistoryRequest:
+    """One caller waiting for the history of some entities."""
+
+    __slots__ = ("entity_ids", "start_time", "end_time", "kind", "future")
+
+    def __init__(
+        self,
+        entity_ids: List[str],
+        start_time: datetime,
+        end_time: datetime,
+        kind: str,
+        future: asyncio.Future,
+    ) -> None:
+        self.entity_ids = entity_ids
+        self.start_time = start_time
+        self.end_time = end_time
+        self.kind = kind
+        self.future = future
+
+
+class PlantHistory:
+    """Collects history requests and runs them as batched recorder queries."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize without pending requests."""
+        self._hass = hass
+        self._pending: List[_HistoryRequest] = []
+        self._unsub_flush: CALLBACK_TYPE | None = None
+
+    async def async_get_states(
+        self,
+        entity_ids: Iterable[str],
+        start_time: datetime,
+        end_time: datetime,
+        attributes: bool = True,
+    ) -> Dict[str, List[State]]:
+        """Return the state changes of the entities between start and end time.
+
+        Like state_changes_during_period, the state at start_time is included.
+        Pass attributes=False if only the states are needed, the recorder then
+        skips loading the attributes.
+        """
+        return await self._async_request(
+            entity_ids,
+            start_time,
+            end_time,
+            _KIND_STATES_ATTRIBUTES if attributes else _KIND_STATES,
+        )
+
+    async def async_get_statistics(
+        self, entity_ids: Iterable[str], start_time: datetime, end_time: datetime
+    ) -> Dict[str, List[Tuple[float, float]]]:
+        """Return the hourly means (start timestamp, mean) from the long-term statistics.
+
+        Entities without statistics (no state_class) are missing in the result.
+        """
+        return await self._async_request(
+            entity_ids, start_time, end_time, _KIND_STATISTICS
+        )
+
+    async def async_get_samples(
+        self,
+        entity_ids: Iterable[str],
+        start_time: datetime,
+        end_time: datetime,
+        raw_seconds: float,
+    ) -> Dict[str, List[Tuple[float, float]]]:
+        """Return numeric (timestamp, value) samples of the entities in time order.
+
+        Only the last raw_seconds (from the full hour) are read from the raw
+        states, the part before comes from the hourly statistics. A single
+        mean per hour would carry less weight than the readings of the raw
+        part, so every hour is repeated as often as the raw states changed
+        per hour. Entities without statistics fall back to the raw states for
+        the whole window.
+        """
+        entity_ids = list(dict.fromkeys(entity_ids))
+        split = end_time.timestamp() - raw_seconds
+        split_time = datetime.fromtimestamp(
+            max(start_time.timestamp(), split - split % _HOUR), end_time.tzinfo
+        )
+        means: Dict[str, List[Tuple[float, float]]] = {}
+        if split_time.timestamp() > start_time.timestamp():
+            means = await self.async_get_statistics(entity_ids, start_time, split_time)
+
+        raw_ids = [entity_id for entity_id in entity_ids if entity_id in means]
+        full_ids = [entity_id for entity_id in entity_ids if entity_id not in means]
+        requests = []
+        if raw_ids:
+            requests.append(
+                self.async_get_states(raw_ids, split_time, end_time, attributes=False)
+            )
+        if full_ids:
+            requests.append(
+                self.async_get_states(full_ids, start_time, end_time, attributes=False)
+            )
+
+        split = split_time.timestamp()
+        raw: Dict[str, List[Tuple[float, float]]] = {}
+        for states in await asyncio.gather(*requests):
+            for entity_id, entity_states in states.items():
+                entity_samples = raw.setdefault(entity_id, [])
+                # Der bei Beginn gültige Zustand zählt ab dem Beginn der Rohdaten
+                begin = split if entity_id in raw_ids else start_time.timestamp()
+                for state in entity_states:
+                    try:
+                        value = float(state.state)
+                    except (ValueError, TypeError):
+                        continue
+                    entity_samples.append(
+                        (max(state.last_updated.timestamp(), begin), value)
+                    )
+
+        samples: Dict[str, List[Tuple[float, float]]] = {}
+        for entity_id in entity_ids:
+            entity_samples = []
+            if entity_id in means:
+                # Stundenmittel gleichmäßig über die Stunde verteilt wiederholen
+                repeat = _changes_per_hour(raw.get(entity_id, []), end_time.timestamp() - split)
+                for hour_start, mean in means[entity_id]:
+                    entity_samples.extend(
+                        (hour_start + _HOUR * index / repeat, mean) for index in range(repeat)
+                    )
+            entity_samples.extend(raw.get(entity_id, []))
+            if entity_samples:
+                samples[entity_id] = entity_samples
+        return samples
+
+    async def _async_request(
+        self,
+        entity_ids: Iterable[str],
+        start_time: datetime,
+        end_time: datetime,
+        kind: str,
+    ) -> Dict[str, List[Any]]:
+        request = _HistoryRequest(
+            list(dict.fromkeys(entity_ids)),
+            start_time,
+            end_time,
+            kind,
+            self._hass.loop.create_future(),
+        )
+        if not request.entity_ids:
+            return {}
+        self._pending.append(request)
+        if self._unsub_flush is None:
+            self._unsub_flush = async_call_later(
+                self._hass, HISTORY_BATCH_DELAY, self._async_flush
+            )
+        return await request.future
+
+    @callback
+    def async_shutdown(self) -> None:
+        """Cancel the pending requests."""
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+        pending, self._pending = self._pending, []
+        for request in pending:
+            request.future.cancel()
+
+    async def _async_flush(self, _now=None) -> None:
+        self._unsub_flush = None
+        pending, self._pending = self._pending, []
+        await asyncio.gather(
+            *(self._async_run_batch(batch) for batch in _group_requests(pending))
+        )
+
+    async def _async_run_batch(self, batch: List[_HistoryRequest]) -> None:
+        entity_ids = list(
+            dict.fromkeys(entity_id for request in batch for entity_id in request.entity_ids)
+        )
+        start_time = min(batch, key=lambda request: request.start_time.timestamp()).start_time
+        end_time = max(batch, key=lambda request: request.end_time.timestamp()).end_time
+        kind = batch[0].kind
+        recorder = get_instance(self._hass)
+        states: Dict[str, List[Any]] = {}
+        try:
+            for index in range(0, len(entity_ids), HISTORY_BATCH_SIZE):
+                chunk = entity_ids[index : index + HISTORY_BATCH_SIZE]
+                if kind == _KIND_STATISTICS:
+                    job = partial(
+                        _statistics_during_period, self._hass, start_time, end_time, chunk
+                    )
+                else:
+                    job = partial(
+                        history.get_significant_states,
+                        self._hass,
+                        start_time,
+                        end_time,
+                        chunk,
+                        include_start_time_state=True,
+                        significant_changes_only=False,
+                        no_attributes=kind == _KIND_STATES,
+                    )
+                states.update(await recorder.async_add_executor_job(job))
+        except Exception as ex:  # pylint: disable=broad-except
+            _LOGGER.warning("Could not read history of %s entities: %s", len(entity_ids), ex)
+            for request in batch:
+                if not request.future.done():
+                    request.future.set_exception(ex)
+            return
+
+        _LOGGER.debug(
+            "Read history of %s entities for %s requests", len(entity_ids), len(batch)
+        )
+        if kind == _KIND_STATISTICS:
+            timestamps = {
+                entity_id: [row[0] for row in rows] for entity_id, rows in states.items()
+            }
+        else:
+            states = {
+                entity_id: _drop_attribute_updates(entity_states)
+                for entity_id, entity_states in states.items()
+            }
+            timestamps = {
+                entity_id: [state.last_updated.timestamp() for state in entity_states]
+                for entity_id, entity_states in states.items()
+            }
+        # Statistiken beschreiben Intervalle, ein Zustand gilt dagegen ab seinem Zeitstempel
+        include_start = kind != _KIND_STATISTICS
+        for request in batch:
+            if request.future.done():
+                # Aufrufer wurde inzwischen abgebrochen
+                continue
+            request.future.set_result(
+                {
+                    entity_id: _slice(
+                        states[entity_id],
+                        timestamps[entity_id],
+                        request.start_time.timestamp(),
+                        request.end_time.timestamp(),
+                        include_start,
+                    )
+                    for entity_id in request.entity_ids
+                    if states.get(entity_id)
+                }
+            )
+
+
+def _group_requests(requests: List[_HistoryRequest]) -> List[List[_HistoryRequest]]:
+    """Group requests that can share one query (same kind, similar start)."""
+    groups: List[List[_HistoryRequest]] = []
+    for kind in (_KIND_STATES_ATTRIBUTES, _KIND_STATES, _KIND_STATISTICS):
+        group: List[_HistoryRequest] = []
+        group_start = 0.0
+        for request in sorted(
+            (request for request in requests if request.kind == kind),
+            key=lambda request: request.start_time.timestamp(),
+        ):
+            start = request.start_time.timestamp()
+            if not group or start - group_start > HISTORY_BATCH_TOLERANCE:
+                group = []
+                group_start = start
+                groups.append(group)
+            group.append(request)
+    return groups
+
+
+def _drop_attribute_updates(states: List[State]) -> List[State]:
+    """Return only the state changes.
+
+    With significant_changes_only=False the recorder also returns updates of
+    the attributes only, they keep last_changed of the state before. The
+    first state (valid at the start time) is always kept.
+    """
+    changes: List[State] = []
+    for state in states:
+        if changes and state.last_changed == changes[-1].last_changed:
+            continue
+        changes.append(state)
+    return changes
+
+
+def _changes_per_hour(samples: List[Tuple[float, float]], seconds: float) -> int:
+    """Return how often the raw states changed per hour (at least once)."""
+    if seconds <= 0:
+        return 1
+    return min(max(round(len(samples) * _HOUR / seconds), 1), _MAX_SAMPLES_PER_HOUR)
+
+
+def _slice(
+    items: List[Any],
+    timestamps: List[float],
+    start: float,
+    end: float,
+    include_start: bool = True,
+) -> List[Any]:
+    """Return the items of [start, end] with the item valid at start.
+
+    Without include_start the items are intervals and [start, end) is returned.
+    """
+    if include_start:
+        first = max(bisect_right(timestamps, start) - 1, 0)
+        last = bisect_right(timestamps, end)
+    else:
+        first = bisect_left(timestamps, start)
+        last = bisect_left(timestamps, end)
+    return items[first:last]
+
+
+def _statistics_during_period(
+    hass: HomeAssistant, start_time: datetime, end_time: datetime, entity_ids: List[str]
+) -> Dict[str, List[Tuple[float, float]]]:
+    """Read the hourly means of the entities (runs in the recorder executor)."""
+    result = statistics.statistics_during_period(
+        hass, start_time, end_time, set(entity_ids), "hour", None, {"mean"}
+    )
+    rows: Dict[str, List[Tuple[float, float]]] = {}
+    for entity_id, entity_rows in result.items():
+        means = []
+        for row in entity_rows:
+            start, mean = row.get("start"), row.get("mean")
+            if start is None or mean is None:
+                continue
+            if isinstance(start, datetime):
+                start = start.timestamp()
+            means.append((start, mean))
+        if means:
+            rows[entity_id] = means
+    return rows
+
+
+@callback
+def async_get_plant_history(hass: HomeAssistant) -> PlantHistory:
+    """Return the shared history batcher, create it on first use."""
+    if DATA_PLANT_HISTORY not in hass.data:
+        hass.data[DATA_PLANT_HISTORY] = PlantHistory(hass)
+    return hass.data[DATA_PLANT_HISTORY]
@@ -0,0 +1,32 @@
+"""Consecutive ids of plants and cycles.
+
+The counter of every device type is kept in a Store. A bulk import reserves
+all ids it needs with a single store write instead of one per entry.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import List
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DATA_ID_LOCK, DOMAIN
+
+
+async def async_reserve_ids(
+    hass: HomeAssistant, device_type: str, count: int = 1
+) -> List[str]:
+    """Reserve count consecutive ids of a device type."""
+    if count < 1:
+        return []
+    lock = hass.data.setdefault(DATA_ID_LOCK, asyncio.Lock())
+    # Gleichzeitige Setups dürfen keine ID doppelt vergeben
+    async with lock:
+        store = Store(hass, version=1, key=f"{DOMAIN}_{device_type}_counter")
+        data = await store.async_load() or {"counter": 0}
+        first = data["counter"] + 1
+        await store.async_save({"counter": data["counter"] + count})
+    # Formatiert als 4-stellige Nummer mit führenden Nullen
+    return [f"{next_id:04d}" for next_id in range(first, first + count)]
@@ -0,0 +1,132 @@
+"""Helpers for the plant/get_info snapshots.
+
+info_diff() describes the changes between two snapshots as JSON-patch
+style operations (RFC 6902 add/remove/replace with JSON pointer paths).
+Nested dicts are compared key by key, everything else (lists, scalars) is
+replaced as a whole. apply_info_diff() is the counterpart used by clients.
+
+project_info() reduces a snapshot to the parts a client asked for. A
+field is a dotted path, ``*`` matches every key of its level, e.g.
+``["state", "*.current", "*.min", "*.max", "helpers.*.current"]`` only
+returns the current values and thresholds. static_info() returns the
+rarely changing metadata (names, icons, units, entity_ids, helper ranges)
+with a content hash as version, so clients can cache it separately.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Dict, Iterable, List, Tuple
+
+_MISSING = object()
+
+# Metadaten, die sich praktisch nur mit der Konfiguration ändern
+STATIC_FIELDS = (
+    "path",
+    "device_type",
+    "entity_id",
+    "name",
+    "icon",
+    "*.icon",
+    "*.unit_of_measurement",
+    "*.sensor",
+    "*.*.entity_id",
+    "*.*.icon",
+    "*.*.unit_of_measurement",
+    "*.*.min",
+    "*.*.max",
+    "*.*.step",
+    "*.*.options",
+    "*.*.type",
+)
+
+
+def _escape(key: Any) -> str:
+    """Escape a dict key for a JSON pointer."""
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def info_diff(old: Dict[str, Any], new: Dict[str, Any], path: str = "") -> List[Dict[str, Any]]:
+    """Return the operations that turn old into new."""
+    ops: List[Dict[str, Any]] = []
+    for key in old:
+        if key not in new:
+            ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+    for key, value in new.items():
+        old_value = old.get(key, _MISSING)
+        pointer = f"{path}/{_escape(key)}"
+        if old_value is _MISSING:
+            ops.append({"op": "add", "path": pointer, "value": value})
+        elif isinstance(old_value, dict) and isinstance(value, dict):
+            ops.extend(info_diff(old_value, value, pointer))
+        elif old_value != value or type(old_value) is not type(value):
+            ops.append({"op": "replace", "path": pointer, "value": value})
+    return ops
+
+
+def apply_info_diff(info: Dict[str, Any], ops: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Return a copy of info with the operations of info_diff() applied."""
+    result = dict(info)
+    for op in ops:
+        *parents, last = [_unescape(token) for token in op["path"].split("/")[1:]]
+        target = result
+        for key in parents:
+            # Nur die geänderten Ebenen kopieren
+            target[key] = dict(target[key])
+            target = target[key]
+        if op["op"] == "remove":
+            del target[last]
+        else:
+            target[last] = op["value"]
+    return result
+
+
+
+def _select(value: Any, path: List[str]) -> Any:
+    """Return the parts of value matching path, _MISSING if nothing matches."""
+    if not path:
+        return value
+    if not isinstance(value, dict):
+        return _MISSING
+    head, *rest = path
+    keys = value.keys() if head == "*" else [head] if head in value else []
+    selected = {}
+    for key in keys:
+        part = _select(value[key], rest)
+        if part is not _MISSING:
+            selected[key] = part
+    return selected if selected else _MISSING
+
+
+def _merge(target: Dict[str, Any], part: Dict[str, Any]) -> None:
+    for key, value in part.items():
+        if isinstance(target.get(key), dict) and isinstance(value, dict):
+            merged = dict(target[key])
+            _merge(merged, value)
+            target[key] = merged
+        else:
+            target[key] = value
+
+
+def project_info(info: Dict[str, Any], fields: Iterable[str] | None = None) -> Dict[str, Any]:
+    """Return only the requested fields of a snapshot (all without fields)."""
+    if not fields:
+        return info
+    result: Dict[str, Any] = {}
+    for field in fields:
+        part = _select(info, field.split("."))
+        if part is not _MISSING:
+            _merge(result, part)
+    return result
+
+
+def static_info(info: Dict[str, Any]) -> Tuple[Dict[str, Any], str]:
+    """Return the static metadata of a snapshot and its version (content hash)."""
+    static = project_info(info, STATIC_FIELDS)
+    payload = json.dumps(static, sort_keys=True, default=str)
+    return static, hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
@@ -0,0 +1,208 @@
+"""Push updates of the plant/get_info snapshots over the websocket.
+
+A plant/subscribe_info subscription first sends the snapshots of its
+plants and afterwards only the changes (info_diff operations) whenever a
+snapshot was invalidated, optionally limited to the requested fields
+(project_info). Changes of all subscriptions of a connection are
+collected and sent at most INFO_UPDATES_PER_SECOND times per second.
+
+A plant that is removed (e.g. while its config entry is reloaded) is
+reported in "removed"; once it is set up again async_plant_added() makes
+its subscriptions follow the new PlantDevice and they send a new snapshot.
+"""
+
+from __future__ import annotations
+
+from functools import partial
+from typing import Any, Dict, Iterable, List, Set, Tuple
+
+from homeassistant.components import websocket_api
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import DATA_INFO_SENDERS, INFO_UPDATES_PER_SECOND
+from .plant_info import info_diff, project_info
+
+
+class _ConnectionSender:
+    """Rate limits the updates of all subscriptions of one connection."""
+
+    def __init__(self, hass: HomeAssistant, key: int) -> None:
+        self._hass = hass
+        self._key = key
+        self.subscriptions: Set[InfoSubscription] = set()
+        self._last_sent = float("-inf")
+        self._unsub_flush: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_schedule(self) -> None:
+        """Send the pending changes as soon as the rate limit allows."""
+        if self._unsub_flush is not None:
+            return
+        delay = self._last_sent + 1 / INFO_UPDATES_PER_SECOND - self._hass.loop.time()
+        self._unsub_flush = async_call_later(self._hass, max(delay, 0), self._async_flush)
+
+    @callback
+    def async_remove(self, subscription: InfoSubscription) -> None:
+        """Forget a subscription, the sender goes away with the last one."""
+        self.subscriptions.discard(subscription)
+        if self.subscriptions:
+            return
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+        senders = self._hass.data.get(DATA_INFO_SENDERS, {})
+        if senders.get(self._key) is self:
+            del senders[self._key]
+
+    @callback
+    def _async_flush(self, _now=None) -> None:
+        self._unsub_flush = None
+        self._last_sent = self._hass.loop.time()
+        for subscription in list(self.subscriptions):
+            subscription.async_send_changes()
+
+
+class InfoSubscription:
+    """The plants of one plant/subscribe_info command."""
+
+    def __init__(
+        self,
+        sender: _ConnectionSender,
+        connection: websocket_api.ActiveConnection,
+        msg_id: int,
+        plants: List[Any],
+        fields: Iterable[str] | None = None,
+    ) -> None:
+        """Initialize for the given PlantDevices, nothing is sent yet."""
+        self._sender = sender
+        self._connection = connection
+        self._msg_id = msg_id
+        # Entfernte Pflanzen sind None, bis sie wieder hinzugefügt werden
+        self._plants: Dict[str, Any] = {plant.entity_id: plant for plant in plants}
+        self._fields = list(fields) if fields else None
+        # Zuletzt gesendeter Stand je Pflanze: (version, snapshot)
+        self._sent: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        self._dirty: Set[str] = set()
+        # Als entfernt gemeldete Pflanzen, sie bekommen wieder einen ganzen Snapshot
+        self._removed: Set[str] = set()
+        self._unsubs: Dict[str, CALLBACK_TYPE] = {}
+
+    @callback
+    def async_start(self) -> None:
+        """Follow the plants and send their snapshots."""
+        self._sender.subscriptions.add(self)
+        for entity_id, plant in self._plants.items():
+            self._unsubs[entity_id] = plant.async_subscribe_info(
+                partial(self._async_changed, entity_id)
+            )
+        snapshots = {}
+        for entity_id, plant in self._plants.items():
+            info = project_info(plant.websocket_info, self._fields)
+            version = plant.websocket_info_version
+            self._sent[entity_id] = (version, info)
+            snapshots[entity_id] = {"version": version, "info": info}
+        self._connection.send_message(
+            websocket_api.event_message(self._msg_id, {"snapshots": snapshots})
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop following the plants."""
+        for unsub in self._unsubs.values():
+            unsub()
+        self._unsubs = {}
+        self._dirty.clear()
+        self._sender.async_remove(self)
+
+    @callback
+    def async_plant_added(self, plant: Any) -> None:
+        """Follow the new PlantDevice of a subscribed entity_id."""
+        entity_id = plant.entity_id
+        if entity_id not in self._plants or self._plants[entity_id] is plant:
+            return
+        if entity_id in self._unsubs:
+            self._unsubs.pop(entity_id)()
+        self._plants[entity_id] = plant
+        self._unsubs[entity_id] = plant.async_subscribe_info(
+            partial(self._async_changed, entity_id)
+        )
+        self._async_changed(entity_id)
+
+    @callback
+    def _async_changed(self, entity_id: str, removed: bool = False) -> None:
+        if removed:
+            self._plants[entity_id] = None
+            self._unsubs.pop(entity_id, None)
+        self._dirty.add(entity_id)
+        self._sender.async_schedule()
+
+    @callback
+    def async_send_changes(self) -> None:
+        """Send the changes of the plants since the last message."""
+        changes = {}
+        snapshots = {}
+        removed = []
+        for entity_id in self._dirty:
+            plant = self._plants[entity_id]
+            if plant is None:
+                if entity_id not in self._removed:
+                    self._removed.add(entity_id)
+                    self._sent.pop(entity_id, None)
+                    removed.append(entity_id)
+                continue
+            if not plant.websocket_info:
+                # Noch nicht vollständig eingerichtet
+                continue
+            info = project_info(plant.websocket_info, self._fields)
+            version = plant.websocket_info_version
+            if entity_id in self._removed:
+                self._removed.discard(entity_id)
+                self._sent[entity_id] = (version, info)
+                snapshots[entity_id] = {"version": version, "info": info}
+                continue
+            old_version, old_info = self._sent.get(entity_id, (0, {}))
+            if version == old_version:
+                continue
+            self._sent[entity_id] = (version, info)
+            ops = info_diff(old_info, info)
+            if ops:
+                changes[entity_id] = {"version": version, "patch": ops}
+        self._dirty.clear()
+        event = {}
+        if changes:
+            event["changes"] = changes
+        if snapshots:
+            event["snapshots"] = snapshots
+        if removed:
+            event["removed"] = sorted(removed)
+        if event:
+            self._connection.send_message(
+                websocket_api.event_message(self._msg_id, event)
+            )
+
+
+@callback
+def async_subscribe_info(
+    hass: HomeAssistant,
+    connection: websocket_api.ActiveConnection,
+    msg_id: int,
+    plants: List[Any],
+    fields: Iterable[str] | None = None,
+) -> InfoSubscription:
+    """Start a subscription, returns it so it can be stopped."""
+    senders = hass.data.setdefault(DATA_INFO_SENDERS, {})
+    key = id(connection)
+    if key not in senders:
+        senders[key] = _ConnectionSender(hass, key)
+    subscription = InfoSubscription(senders[key], connection, msg_id, plants, fields)
+    subscription.async_start()
+    return subscription
+
+
+@callback
+def async_plant_added(hass: HomeAssistant, plant: Any) -> None:
+    """Hand a (re-)added PlantDevice to the subscriptions of its entity_id."""
+    for sender in hass.data.get(DATA_INFO_SENDERS, {}).values():
+        for subscription in list(sender.subscriptions):
+            subscription.async_plant_added(plant)
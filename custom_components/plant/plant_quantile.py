@@ -0,0 +1,199 @@
+"""Streaming percentile estimation for the moisture normalization.
+
+P2Quantile implements the P² algorithm (Jain & Chlamtac): five markers are
+adjusted on every observation, so a percentile is tracked in O(1) time and
+memory without storing or sorting the readings.
+
+WindowedQuantile approximates the percentile over a sliding window with two
+P² sketches started half a window apart; the older one (covering between half
+and a full window) provides the estimate and is restarted once it covers a
+full window. It also keeps the timestamp of the newest observation as a
+cursor, so history can be fetched incrementally and samples that were
+already added are skipped.
+"""
+
+from __future__ import annotations
+
+import math
+import struct
+from typing import List
+
+_P2_STATE = struct.Struct("<I15d")
+_WINDOWED_HEADER = struct.Struct("<Bddddd")
+_SNAPSHOT_VERSION = 2
+
+
+class P2Quantile:
+    """P² estimate of one quantile p (0..1)."""
+
+    __slots__ = ("p", "count", "_q", "_n", "_np")
+
+    def __init__(self, p: float) -> None:
+        """Initialize an empty estimator."""
+        self.p = min(max(float(p), 0.0), 1.0)
+        self.count = 0
+        # Marker-Höhen (bis 5 Beobachtungen die Beobachtungen selbst)
+        self._q: List[float] = []
+        # Ist- und Soll-Positionen der Marker
+        self._n: List[float] = [0.0, 1.0, 2.0, 3.0, 4.0]
+        p = self.p
+        self._np: List[float] = [0.0, 2 * p, 4 * p, 2 + 2 * p, 4.0]
+
+    def add(self, x: float) -> None:
+        """Add an observation."""
+        self.count += 1
+        q = self._q
+        if self.count <= 5:
+            q.append(x)
+            if self.count == 5:
+                q.sort()
+            return
+
+        n = self._n
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= q[k + 1]:
+                k += 1
+        for i in range(k + 1, 5):
+            n[i] += 1
+        p = self.p
+        np_ = self._np
+        np_[1] += p / 2
+        np_[2] += p
+        np_[3] += (1 + p) / 2
+        np_[4] += 1
+
+        for i in (1, 2, 3):
+            d = np_[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                step = 1 if d > 0 else -1
+                candidate = self._parabolic(i, step)
+                if not q[i - 1] < candidate < q[i + 1]:
+                    candidate = q[i] + step * (q[i + step] - q[i]) / (n[i + step] - n[i])
+                q[i] = candidate
+                n[i] += step
+
+    @property
+    def value(self) -> float | None:
+        """Return the current estimate, exact for up to five observations."""
+        if not self.count:
+            return None
+        if self.count < 5:
+            values = sorted(self._q)
+            return values[min(int(len(values) * self.p), len(values) - 1)]
+        return self._q[2]
+
+    def __len__(self) -> int:
+        return self.count
+
+    def to_bytes(self) -> bytes:
+        """Return the packed state of the estimator."""
+        q = self._q + [0.0] * (5 - len(self._q))
+        return _P2_STATE.pack(self.count, *q, *self._n, *self._np)
+
+    def load_bytes(self, data: bytes) -> None:
+        """Restore a state created by to_bytes()."""
+        values = _P2_STATE.unpack(data)
+        count = values[0]
+        self.count = count
+        self._q = list(values[1 : 1 + min(count, 5)])
+        self._n = list(values[6:11])
+        self._np = list(values[11:16])
+
+    def _parabolic(self, i: int, d: int) -> float:
+        q, n = self._q, self._n
+        return q[i] + d / (n[i + 1] - n[i - 1]) * (
+            (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+            + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+        )
+
+
+class WindowedQuantile:
+    """Quantile over roughly the last `window` seconds from two staggered P² sketches."""
+
+    __slots__ = ("p", "window", "last", "_sketches", "_starts")
+
+    def __init__(self, p: float, window: float, start: float = 0.0) -> None:
+        """Initialize empty sketches, the first one starting at `start`."""
+        self.p = p
+        self.window = float(window)
+        self.reset(start)
+
+    def reset(self, start: float) -> None:
+        """Drop all observations, the older sketch starts at `start`."""
+        self._sketches = [P2Quantile(self.p), P2Quantile(self.p)]
+        self._starts = [start, start + self.window / 2]
+        # Zeitstempel der neuesten Beobachtung (Cursor für die Historie)
+        self.last = -math.inf
+
+    def add(self, timestamp: float, value: float) -> bool:
+        """Add an observation at `timestamp` (epoch seconds, ascending).
+
+        Observations that are not newer than the cursor are ignored, returns
+        whether the observation was added.
+        """
+        if timestamp <= self.last:
+            return False
+        self._rotate(timestamp)
+        self.last = timestamp
+        for sketch, start in zip(self._sketches, self._starts):
+            if timestamp >= start:
+                sketch.add(value)
+        return True
+
+    @property
+    def value(self) -> float | None:
+        """Return the estimate of the sketch covering the longest period."""
+        for sketch in self._sketches:
+            if sketch.count:
+                return sketch.value
+        return None
+
+    def __len__(self) -> int:
+        return self._sketches[0].count + self._sketches[1].count
+
+    def to_bytes(self) -> bytes:
+        """Return the packed state of both sketches."""
+        return b"".join(
+            (
+                _WINDOWED_HEADER.pack(
+                    _SNAPSHOT_VERSION, self.p, self.window, self.last, *self._starts
+                ),
+                self._sketches[0].to_bytes(),
+                self._sketches[1].to_bytes(),
+            )
+        )
+
+    def load_bytes(self, data: bytes) -> None:
+        """Restore a state created by to_bytes() with the same p and window."""
+        if len(data) != _WINDOWED_HEADER.size + 2 * _P2_STATE.size:
+            raise ValueError("Quantile snapshot has an invalid size")
+        version, p, window, last, *starts = _WINDOWED_HEADER.unpack_from(data)
+        if version != _SNAPSHOT_VERSION or p != self.p or window != self.window:
+            raise ValueError("Quantile snapshot does not match this estimator")
+        offset = _WINDOWED_HEADER.size
+        sketches = []
+        for _ in range(2):
+            sketch = P2Quantile(self.p)
+            sketch.load_bytes(data[offset : offset + _P2_STATE.size])
+            sketches.append(sketch)
+            offset += _P2_STATE.size
+        self._sketches = sketches
+        self._starts = starts
+        self.last = last
+
+    def _rotate(self, timestamp: float) -> None:
+        half = self.window / 2
+        if timestamp - self._starts[1] >= self.window:
+            # Lücke länger als das Fenster: neu beginnen
+            self.reset(timestamp)
+            return
+        while timestamp - self._starts[0] >= self.window:
+            self._sketches = [self._sketches[1], P2Quantile(self.p)]
+            self._starts = [self._starts[1], self._starts[1] + half]
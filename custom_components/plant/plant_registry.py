@@ -0,0 +1,200 @@
+"""Lookup index for loaded plant and cycle devices.
+
+Avoids scanning every entry in hass.data[DOMAIN] whenever a plant has to be
+found by entity_id, unique_id, device_id or config entry id, or a current
+sensor (meter) has to be found by its entity_id.
+
+Additionally the cycle membership (via_device_id in the device registry) is
+mirrored in both directions, so a cycle finds its members and a plant finds
+its cycle without iterating over all devices.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+
+class PlantRegistry:
+    """Index of PlantDevice objects keyed by entry, entity, unique and device id."""
+
+    def __init__(self) -> None:
+        """Initialize an empty registry."""
+        self._by_entry_id: Dict[str, Any] = {}
+        self._by_entity_id: Dict[str, Any] = {}
+        self._by_unique_id: Dict[str, Any] = {}
+        self._by_device_id: Dict[str, Any] = {}
+        self._device_by_unique_id: Dict[str, str] = {}
+        # Cycle-Zuordnung auf Device-Ebene: member device -> cycle device und umgekehrt
+        self._via_device: Dict[str, str] = {}
+        self._member_devices: Dict[str, Set[str]] = {}
+        self._sensors_by_entity_id: Dict[str, Any] = {}
+        self._sensors: Dict[str, List[Any]] = {}
+        # entry_id -> entity_ids der indexierten Sensoren
+        self._sensor_keys: Dict[str, List[str]] = {}
+        # entry_id -> (entity_id, unique_id, device_id) die aktuell indexiert sind
+        self._keys: Dict[str, tuple] = {}
+        self.unsub_listeners: List[Any] = []
+
+    def register(self, entry_id: str, plant: Any, device_id: Optional[str] = None) -> None:
+        """Add or re-index a plant for the given config entry."""
+        self._drop_keys(entry_id)
+        if device_id is None:
+            device_id = getattr(plant, "device_id", None)
+        entity_id = getattr(plant, "entity_id", None)
+        unique_id = getattr(plant, "unique_id", None)
+
+        self._by_entry_id[entry_id] = plant
+        if entity_id:
+            self._by_entity_id[entity_id] = plant
+        if unique_id:
+            self._by_unique_id[unique_id] = plant
+        if device_id:
+            self._by_device_id[device_id] = plant
+            if unique_id:
+                self._device_by_unique_id[unique_id] = device_id
+        self._keys[entry_id] = (entity_id, unique_id, device_id)
+
+    def register_sensors(self, entry_id: str, sensors: List[Any]) -> None:
+        """Index the current sensors (meters) of a config entry by entity_id."""
+        self._drop_sensors(entry_id)
+        self._sensors[entry_id] = list(sensors)
+        self._sensor_keys[entry_id] = []
+        for sensor in self._sensors[entry_id]:
+            if getattr(sensor, "entity_id", None):
+                self._sensors_by_entity_id[sensor.entity_id] = sensor
+                self._sensor_keys[entry_id].append(sensor.entity_id)
+
+    def reindex(self, entry_id: str, device_id: Optional[str] = None) -> None:
+        """Refresh the keys of an already registered plant (e.g. after add to hass)."""
+        plant = self._by_entry_id.get(entry_id)
+        if plant is None:
+            return
+        if device_id is None:
+            device_id = getattr(plant, "device_id", None) or self._keys[entry_id][2]
+        self.register(entry_id, plant, device_id)
+        if entry_id in self._sensors:
+            self.register_sensors(entry_id, self._sensors[entry_id])
+
+    def unregister(self, entry_id: str) -> Any | None:
+        """Remove a plant and its sensors from the registry and return the plant."""
+        self._drop_keys(entry_id)
+        self._drop_sensors(entry_id)
+        self._sensors.pop(entry_id, None)
+        return self._by_entry_id.pop(entry_id, None)
+
+    def rename(self, old_entity_id: str, new_entity_id: str) -> bool:
+        """Move a plant or sensor to a new entity_id. Returns False if it is unknown."""
+        sensor = self._sensors_by_entity_id.pop(old_entity_id, None)
+        if sensor is not None:
+            self._sensors_by_entity_id[new_entity_id] = sensor
+            for keys in self._sensor_keys.values():
+                if old_entity_id in keys:
+                    keys[keys.index(old_entity_id)] = new_entity_id
+                    break
+            return True
+        plant = self._by_entity_id.pop(old_entity_id, None)
+        if plant is None:
+            return False
+        self._by_entity_id[new_entity_id] = plant
+        for entry_id, (entity_id, unique_id, device_id) in self._keys.items():
+            if entity_id == old_entity_id:
+                self._keys[entry_id] = (new_entity_id, unique_id, device_id)
+                break
+        return True
+
+    def get_by_entry_id(self, entry_id: str) -> Any | None:
+        """Return the plant for a config entry id."""
+        return self._by_entry_id.get(entry_id)
+
+    def get_by_entity_id(self, entity_id: str) -> Any | None:
+        """Return the plant for an entity_id."""
+        return self._by_entity_id.get(entity_id)
+
+    def get_by_unique_id(self, unique_id: str) -> Any | None:
+        """Return the plant for a unique_id."""
+        return self._by_unique_id.get(unique_id)
+
+    def get_by_device_id(self, device_id: str) -> Any | None:
+        """Return the plant for a device registry id."""
+        return self._by_device_id.get(device_id)
+
+    def set_via_device(self, device_id: str, via_device_id: Optional[str]) -> None:
+        """Mirror the via_device_id of a device (None removes the cycle link)."""
+        old_via = self._via_device.pop(device_id, None)
+        if old_via is not None:
+            members = self._member_devices.get(old_via)
+            if members is not None:
+                members.discard(device_id)
+                if not members:
+                    del self._member_devices[old_via]
+        if via_device_id:
+            self._via_device[device_id] = via_device_id
+            self._member_devices.setdefault(via_device_id, set()).add(device_id)
+
+    def remove_device(self, device_id: str) -> None:
+        """Drop all cycle links of a removed device."""
+        self.set_via_device(device_id, None)
+        for member_id in self._member_devices.pop(device_id, set()):
+            self._via_device.pop(member_id, None)
+
+    def get_cycle(self, plant: Any) -> Any | None:
+        """Return the loaded cycle a plant belongs to."""
+        device_id = self._device_by_unique_id.get(getattr(plant, "unique_id", None))
+        via_device_id = self._via_device.get(device_id)
+        if via_device_id is None:
+            return None
+        return self._by_device_id.get(via_device_id)
+
+    def get_members(self, cycle: Any) -> List[Any]:
+        """Return the loaded member plants of a cycle."""
+        device_id = self._device_by_unique_id.get(getattr(cycle, "unique_id", None))
+        return [
+            self._by_device_id[member_id]
+            for member_id in self._member_devices.get(device_id, ())
+            if member_id in self._by_device_id
+        ]
+
+    def get_sensor(self, entity_id: str) -> Any | None:
+        """Return the current sensor (meter) for an entity_id."""
+        return self._sensors_by_entity_id.get(entity_id)
+
+    def plants(self, device_type: Optional[str] = None) -> List[Any]:
+        """Return all registered plants, optionally filtered by device_type."""
+        if device_type is None:
+            return list(self._by_entry_id.values())
+        return [
+            plant
+            for plant in self._by_entry_id.values()
+            if getattr(plant, "device_type", None) == device_type
+        ]
+
+    def __contains__(self, entry_id: object) -> bool:
+        return entry_id in self._by_entry_id
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(list(self._by_entry_id.values()))
+
+    def __len__(self) -> int:
+        return len(self._by_entry_id)
+
+    def _drop_sensors(self, entry_id: str) -> None:
+        """Remove the sensor index keys of an entry."""
+        for entity_id in self._sensor_keys.pop(entry_id, []):
+            self._sensors_by_entity_id.pop(entity_id, None)
+
+    def _drop_keys(self, entry_id: str) -> None:
+        """Remove the secondary index keys of an entry."""
+        keys = self._keys.pop(entry_id, None)
+        if keys is None:
+            return
+        entity_id, unique_id, device_id = keys
+        plant = self._by_entry_id.get(entry_id)
+        for index, key in (
+            (self._by_entity_id, entity_id),
+            (self._by_unique_id, unique_id),
+            (self._by_device_id, device_id),
+        ):
+            if key and index.get(key) is plant:
+                del index[key]
+        if unique_id and device_id and self._device_by_unique_id.get(unique_id) == device_id:
+            del self._device_by_unique_id[unique_id]
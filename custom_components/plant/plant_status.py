@@ -0,0 +1,221 @@
+"""Threshold engine for the plant/cycle problem state.
+
+Every plant keeps one compact slot table with (current, min, max, trigger)
+per monitored reading. Slots are updated individually when a sensor or
+threshold changes and only these dirty slots are re-evaluated; the aggregate
+problem state is derived from the cached per-slot statuses.
+For a full re-evaluation of many plants (e.g. after a restart) all tables
+can be evaluated at once, vectorized with NumPy when it is available.
+"""
+
+from __future__ import annotations
+
+from array import array
+import math
+from typing import Dict, Iterable, List, Set, Tuple
+
+try:  # NumPy ist optional und nur für die Batch-Auswertung nötig
+    import numpy as np
+except ImportError:  # pragma: no cover - abhängig von der Umgebung
+    np = None
+
+# Reihenfolge der Slots in der Tabelle
+THRESHOLD_KEYS: Tuple[str, ...] = (
+    "temperature",
+    "moisture",
+    "conductivity",
+    "illuminance",
+    "humidity",
+    "CO2",
+    "dli",
+    "water_consumption",
+    "fertilizer_consumption",
+    "power_consumption",
+)
+
+STATUS_LOW = -1
+STATUS_OK = 0
+STATUS_HIGH = 1
+
+_INVALID_STATES = (None, "", "unavailable", "unknown")
+
+NAN = float("nan")
+
+
+def parse_value(value) -> float:
+    """Convert a state value to float, NaN for unknown/unavailable/invalid."""
+    if value in _INVALID_STATES:
+        return NAN
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return NAN
+
+
+class ThresholdEngine:
+    """Slot table of (current, min, max, trigger) for one plant."""
+
+    __slots__ = (
+        "keys",
+        "_index",
+        "current",
+        "minimum",
+        "maximum",
+        "trigger",
+        "enabled",
+        "statuses",
+        "_problem_slots",
+        "_dirty",
+    )
+
+    def __init__(self, keys: Iterable[str] = THRESHOLD_KEYS) -> None:
+        """Initialize all slots as unknown and disabled."""
+        self.keys: Tuple[str, ...] = tuple(keys)
+        self._index: Dict[str, int] = {key: i for i, key in enumerate(self.keys)}
+        size = len(self.keys)
+        self.current = array("d", [NAN] * size)
+        self.minimum = array("d", [NAN] * size)
+        self.maximum = array("d", [NAN] * size)
+        self.trigger = bytearray(size)
+        # Slot wird nur ausgewertet wenn die Plant einen passenden Sensor hat
+        self.enabled = bytearray(size)
+        # Zwischengespeicherte Auswertung: Status je bekanntem Slot und die
+        # Slots, die aktuell ein Problem auslösen
+        self.statuses: Dict[str, int] = {}
+        self._problem_slots: Set[int] = set()
+        self._dirty: Set[int] = set()
+
+    def set_current(self, key: str, value) -> bool:
+        """Set the current reading of a slot. Returns True if it changed."""
+        return self._set(self.current, key, parse_value(value))
+
+    def set_min(self, key: str, value) -> bool:
+        """Set the lower threshold of a slot. Returns True if it changed."""
+        return self._set(self.minimum, key, parse_value(value))
+
+    def set_max(self, key: str, value) -> bool:
+        """Set the upper threshold of a slot. Returns True if it changed."""
+        return self._set(self.maximum, key, parse_value(value))
+
+    def set_trigger(self, key: str, trigger: bool) -> bool:
+        """Set whether the slot may switch the plant to problem."""
+        return self._set_flag(self.trigger, key, trigger)
+
+    def set_enabled(self, key: str, enabled: bool) -> bool:
+        """Enable or disable a slot."""
+        return self._set_flag(self.enabled, key, enabled)
+
+    @property
+    def dirty(self) -> bool:
+        """Return True if a slot changed since the last evaluation."""
+        return bool(self._dirty)
+
+    @property
+    def problem(self) -> bool:
+        """Return True if any triggered slot is out of range."""
+        return bool(self._problem_slots)
+
+    def refresh(self) -> Tuple[Dict[str, int], bool]:
+        """Re-evaluate only the dirty slots.
+
+        Returns the slots whose status changed (STATUS_LOW/OK/HIGH) and the
+        aggregate problem state. Slots without a current value are dropped
+        from the cached statuses, so the caller keeps their previous status.
+        """
+        changed: Dict[str, int] = {}
+        statuses, problem_slots = self.statuses, self._problem_slots
+        for i in self._dirty:
+            key = self.keys[i]
+            status = self._evaluate_slot(i)
+            if status is None:
+                statuses.pop(key, None)
+                problem_slots.discard(i)
+                continue
+            if statuses.get(key) != status:
+                statuses[key] = status
+                changed[key] = status
+            if status != STATUS_OK and self.trigger[i]:
+                problem_slots.add(i)
+            else:
+                problem_slots.discard(i)
+        self._dirty.clear()
+        return changed, bool(problem_slots)
+
+    def evaluate(self) -> Tuple[Dict[str, int], bool]:
+        """Evaluate all slots in one pass.
+
+        Returns the status per known slot (STATUS_LOW/OK/HIGH) and whether any
+        triggered slot is out of range.
+        """
+        self._dirty.update(range(len(self.keys)))
+        _changed, problem = self.refresh()
+        return dict(self.statuses), problem
+
+    def _evaluate_slot(self, i: int) -> int | None:
+        if not self.enabled[i]:
+            return None
+        value = self.current[i]
+        if value != value:  # NaN: unbekannt
+            return None
+        if value < self.minimum[i]:
+            return STATUS_LOW
+        if value > self.maximum[i]:
+            return STATUS_HIGH
+        return STATUS_OK
+
+    def _set(self, column: array, key: str, value: float) -> bool:
+        i = self._index[key]
+        old = column[i]
+        if old == value or (math.isnan(old) and math.isnan(value)):
+            return False
+        column[i] = value
+        self._dirty.add(i)
+        return True
+
+    def _set_flag(self, column: bytearray, key: str, flag: bool) -> bool:
+        i = self._index[key]
+        flag = 1 if flag else 0
+        if column[i] == flag:
+            return False
+        column[i] = flag
+        self._dirty.add(i)
+        return True
+
+
+def evaluate_engines(
+    engines: List[ThresholdEngine],
+) -> List[Tuple[Dict[str, int], bool]]:
+    """Evaluate many slot tables at once.
+
+    Uses one vectorized NumPy pass if NumPy is installed and all tables share
+    the same slot layout, otherwise falls back to evaluating each table.
+    """
+    if not engines:
+        return []
+    keys = engines[0].keys
+    if np is None or any(engine.keys != keys for engine in engines):
+        return [engine.evaluate() for engine in engines]
+
+    current = np.array([engine.current for engine in engines], dtype=np.float64)
+    minimum = np.array([engine.minimum for engine in engines], dtype=np.float64)
+    maximum = np.array([engine.maximum for engine in engines], dtype=np.float64)
+    trigger = np.array([list(engine.trigger) for engine in engines], dtype=bool)
+    enabled = np.array([list(engine.enabled) for engine in engines], dtype=bool)
+
+    known = enabled & ~np.isnan(current)
+    status = np.where(current < minimum, STATUS_LOW, np.where(current > maximum, STATUS_HIGH, STATUS_OK))
+    out_of_range = known & trigger & (status != STATUS_OK)
+    problem = out_of_range.any(axis=1)
+
+    results: List[Tuple[Dict[str, int], bool]] = []
+    for row, engine in enumerate(engines):
+        statuses = {
+            keys[col]: int(status[row, col]) for col in np.flatnonzero(known[row])
+        }
+        # Zwischenspeicher der Engine mit dem Ergebnis abgleichen
+        engine.statuses = dict(statuses)
+        engine._problem_slots = {int(col) for col in np.flatnonzero(out_of_range[row])}
+        engine._dirty.clear()
+        results.append((statuses, bool(problem[row])))
+    return results
+
@@ -0,0 +1,300 @@
+"""Image uploads for plants and cycles.
+
+An upload session keeps its .part file open until the last chunk, so the
+chunks are appended through a single file handle instead of reopening the
+file for every chunk. Images can be sent as chunks over the websocket
+(plant/upload_image, hex or base64 encoded) or as the raw body of a POST to
+PlantImageUploadView, which is streamed into the file.
+
+Sessions that receive no chunk for IMAGE_UPLOAD_TIMEOUT seconds or grow
+beyond IMAGE_UPLOAD_MAX_SIZE bytes are aborted and their partial file is
+removed.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime
+from http import HTTPStatus
+import logging
+import os
+from typing import Any, Dict
+
+from homeassistant.components.http import HomeAssistantView
+from homeassistant.const import ATTR_ENTITY_PICTURE
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers.event import async_call_later
+
+from .const import (
+    ATTR_BREEDER,
+    ATTR_STRAIN,
+    DATA_IMAGE_UPLOADS,
+    DATA_PLANT_REGISTRY,
+    DEFAULT_IMAGE_PATH,
+    DOMAIN,
+    FLOW_DOWNLOAD_PATH,
+    FLOW_PLANT_INFO,
+    IMAGE_UPLOAD_MAX_SIZE,
+    IMAGE_UPLOAD_TIMEOUT,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Größe der Blöcke, in denen der Body eines HTTP-Uploads geschrieben wird
+_HTTP_READ_SIZE = 256 * 1024
+
+
+class ImageTooLarge(HomeAssistantError):
+    """The upload exceeds IMAGE_UPLOAD_MAX_SIZE."""
+
+
+class ImageUpload:
+    """One upload, written through a single open .part file.
+
+    open(), write(), finish() and abort() do blocking I/O and run in the
+    executor.
+    """
+
+    def __init__(self, entity_id: str, filepath: str, final_filename: str) -> None:
+        """Initialize, the file is created by open()."""
+        self.entity_id = entity_id
+        self.filepath = filepath
+        self.temp_filepath = f"{filepath}.part"
+        self.final_filename = final_filename
+        self.next_chunk = 0
+        self.size = 0
+        self.unsub_timeout: CALLBACK_TYPE | None = None
+        self._file = None
+
+    def open(self) -> None:
+        """Create the download directory and the .part file."""
+        os.makedirs(os.path.dirname(self.filepath), exist_ok=True)
+        self._file = open(self.temp_filepath, "wb")
+
+    def write(self, data: bytes) -> None:
+        """Append data to the .part file."""
+        self._file.write(data)
+        self.size += len(data)
+
+    def finish(self) -> None:
+        """Close the file and move it to its final name."""
+        self._file.close()
+        self._file = None
+        os.replace(self.temp_filepath, self.filepath)
+
+    def abort(self) -> None:
+        """Close and remove the partial file."""
+        if self._file is None:
+            # Schon abgeschlossen oder abgebrochen, die .part-Datei kann einer neuen Session gehören
+            return
+        self._file.close()
+        self._file = None
+        try:
+            os.unlink(self.temp_filepath)
+        except OSError:
+            pass
+
+
+class PlantImageUploads:
+    """Running image uploads, at most one per plant."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize without uploads."""
+        self._hass = hass
+        self._uploads: Dict[str, ImageUpload] = {}
+
+    def get(self, entity_id: str) -> ImageUpload | None:
+        """Return the running upload of a plant."""
+        return self._uploads.get(entity_id)
+
+    async def async_begin(self, target_entity: Any, target_entry: Any, filename: str) -> ImageUpload:
+        """Start a new upload for a plant, a running one is aborted."""
+        await self.async_abort(target_entity.entity_id)
+        entity_id = target_entity.entity_id
+        _, ext = os.path.splitext(filename)
+
+        # Wenn kein entity_picture existiert, verwende Breeder_Strain Format
+        if not target_entity._attr_entity_picture:
+            breeder = target_entity._plant_info.get(ATTR_BREEDER, "Unknown")
+            strain = target_entity._plant_info.get(ATTR_STRAIN, "Unknown")
+            final_filename = f"{breeder}_{strain}{ext}".replace(" ", "_")
+
+            # Hole die aktuelle Bilderliste aus der Config Entry
+            data = dict(target_entry.data)
+            plant_info = dict(data.get(FLOW_PLANT_INFO, {}))
+
+            target_entity._attr_entity_picture = f"/local/images/plants/{final_filename}"
+            plant_info[ATTR_ENTITY_PICTURE] = f"/local/images/plants/{final_filename}"
+
+            # Aktualisiere die Config Entry
+            data[FLOW_PLANT_INFO] = plant_info
+            self._hass.config_entries.async_update_entry(target_entry, data=data)
+        else:
+            # Für alle weiteren Bilder verwende den Timestamp
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            final_filename = f"{entity_id}_{timestamp}{ext}"
+
+        upload = ImageUpload(
+            entity_id,
+            os.path.join(_download_path(self._hass), final_filename),
+            final_filename,
+        )
+        await self._hass.async_add_executor_job(upload.open)
+        self._uploads[entity_id] = upload
+        self._async_touch(upload)
+        return upload
+
+    async def async_write(self, upload: ImageUpload, data: bytes) -> None:
+        """Append a chunk to an upload, raises ImageTooLarge above the size limit."""
+        if upload.size + len(data) > IMAGE_UPLOAD_MAX_SIZE:
+            raise ImageTooLarge(
+                f"Image exceeds the maximum size of {IMAGE_UPLOAD_MAX_SIZE} bytes"
+            )
+        await self._hass.async_add_executor_job(upload.write, data)
+        upload.next_chunk += 1
+        self._async_touch(upload)
+
+    async def async_finish(self, target_entity: Any, target_entry: Any, upload: ImageUpload) -> None:
+        """Complete an upload and add the image to the plant."""
+        self._async_forget(upload)
+        await self._hass.async_add_executor_job(upload.finish)
+        final_filename = upload.final_filename
+
+        # Hole die aktuelle Bilderliste aus der Config Entry
+        data = dict(target_entry.data)
+        plant_info = dict(data.get(FLOW_PLANT_INFO, {}))
+        current_images = list(plant_info.get("images", []))
+
+        # Wenn kein Hauptbild existiert, setze dieses als Hauptbild
+        if not target_entity._attr_entity_picture:
+            target_entity._attr_entity_picture = f"/local/images/plants/{final_filename}"
+            plant_info[ATTR_ENTITY_PICTURE] = f"/local/images/plants/{final_filename}"
+        else:
+            # Füge das Bild zur Bilderliste hinzu, wenn es nicht das Entity Picture ist
+            entity_picture_filename = target_entity._attr_entity_picture.split("/")[-1]
+            if final_filename != entity_picture_filename:
+                if final_filename not in current_images:
+                    current_images.append(final_filename)
+                    plant_info["images"] = current_images
+
+        # Aktualisiere die Config Entry
+        data[FLOW_PLANT_INFO] = plant_info
+        self._hass.config_entries.async_update_entry(target_entry, data=data)
+
+        # Aktualisiere die Entity
+        target_entity._images = current_images
+        target_entity._plant_info = plant_info
+        target_entity.async_write_ha_state()
+
+    async def async_abort(self, entity_id: str) -> None:
+        """Abort the running upload of a plant, if any."""
+        upload = self._uploads.get(entity_id)
+        if upload is not None:
+            await self.async_abort_upload(upload)
+
+    async def async_abort_upload(self, upload: ImageUpload) -> None:
+        """Abort one upload, a newer upload of the same plant keeps running."""
+        self._async_forget(upload)
+        await self._hass.async_add_executor_job(upload.abort)
+
+    async def async_shutdown(self) -> None:
+        """Abort all running uploads."""
+        for entity_id in list(self._uploads):
+            await self.async_abort(entity_id)
+
+    @callback
+    def _async_touch(self, upload: ImageUpload) -> None:
+        """Restart the idle timeout of an upload."""
+        if upload.unsub_timeout is not None:
+            upload.unsub_timeout()
+
+        async def _async_expired(_now=None) -> None:
+            upload.unsub_timeout = None
+            if self._uploads.get(upload.entity_id) is upload:
+                _LOGGER.warning("Image upload for %s timed out", upload.entity_id)
+                await self.async_abort_upload(upload)
+
+        upload.unsub_timeout = async_call_later(
+            self._hass, IMAGE_UPLOAD_TIMEOUT, _async_expired
+        )
+
+    @callback
+    def _async_forget(self, upload: ImageUpload) -> None:
+        if upload.unsub_timeout is not None:
+            upload.unsub_timeout()
+            upload.unsub_timeout = None
+        if self._uploads.get(upload.entity_id) is upload:
+            del self._uploads[upload.entity_id]
+
+
+class PlantImageUploadView(HomeAssistantView):
+    """Upload an image as the raw request body.
+
+    POST /api/plant/upload_image/{entity_id}?filename=photo.jpg
+    """
+
+    url = "/api/plant/upload_image/{entity_id}"
+    name = "api:plant:upload_image"
+
+    async def post(self, request, entity_id: str):
+        """Stream the body into a new image of the plant."""
+        hass: HomeAssistant = request.app["hass"]
+        filename = request.query.get("filename")
+        if not filename:
+            return self.json_message("Missing filename", HTTPStatus.BAD_REQUEST)
+
+        target = async_get_upload_target(hass, entity_id)
+        if target is None:
+            return self.json_message(f"Entity {entity_id} not found", HTTPStatus.NOT_FOUND)
+        target_entity, target_entry = target
+        if (request.content_length or 0) > IMAGE_UPLOAD_MAX_SIZE:
+            return self.json_message(
+                f"Image exceeds the maximum size of {IMAGE_UPLOAD_MAX_SIZE} bytes",
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE,
+            )
+
+        uploads = async_get_image_uploads(hass)
+        upload = await uploads.async_begin(target_entity, target_entry, filename)
+        try:
+            async for data in request.content.iter_chunked(_HTTP_READ_SIZE):
+                await uploads.async_write(upload, data)
+            await uploads.async_finish(target_entity, target_entry, upload)
+        except ImageTooLarge as e:
+            await uploads.async_abort_upload(upload)
+            return self.json_message(str(e), HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+        except Exception as e:  # pylint: disable=broad-except
+            _LOGGER.error("Error uploading image: %s", e)
+            await uploads.async_abort_upload(upload)
+            return self.json_message(str(e), HTTPStatus.INTERNAL_SERVER_ERROR)
+        return self.json(
+            {"success": True, "filename": upload.final_filename, "size": upload.size}
+        )
+
+
+def _download_path(hass: HomeAssistant) -> str:
+    """Return the image directory from the config node."""
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        if entry.data.get("is_config", False):
+            return entry.data[FLOW_PLANT_INFO].get(FLOW_DOWNLOAD_PATH, DEFAULT_IMAGE_PATH)
+    return DEFAULT_IMAGE_PATH
+
+
+@callback
+def async_get_upload_target(hass: HomeAssistant, entity_id: str) -> tuple[Any, Any] | None:
+    """Return the plant or cycle and its config entry."""
+    plant_registry = hass.data.get(DATA_PLANT_REGISTRY)
+    target_entity = plant_registry.get_by_entity_id(entity_id) if plant_registry else None
+    if target_entity is None:
+        return None
+    target_entry = hass.config_entries.async_get_entry(target_entity.unique_id)
+    if target_entry is None:
+        return None
+    return target_entity, target_entry
+
+
+@callback
+def async_get_image_uploads(hass: HomeAssistant) -> PlantImageUploads:
+    """Return the shared upload registry, create it on first use."""
+    if DATA_IMAGE_UPLOADS not in hass.data:
+        hass.data[DATA_IMAGE_UPLOADS] = PlantImageUploads(hass)
+    return hass.data[DATA_IMAGE_UPLOADS]
@@ -0,0 +1,128 @@
+"""Persistence of the sliding window buffers across restarts.
+
+The 24h windows of the DLI and moisture consumption sensors and the
+percentile sketches of the moisture normalization are kept in memory only.
+To have correct values right after a restart, all of them are snapshotted as
+packed float64 data (base64 in one helpers.storage file) periodically and on
+shutdown. The file is loaded lazily by the first sensor that restores its
+window.
+
+A window is any object with to_bytes(), load_bytes() and len().
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import binascii
+from datetime import timedelta
+import logging
+from typing import Any, Dict
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+from homeassistant.helpers.storage import Store
+
+from .const import DATA_WINDOW_STORE, DOMAIN, WINDOW_SNAPSHOT_INTERVAL
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_KEY = f"{DOMAIN}_windows"
+STORAGE_VERSION = 1
+
+
+class PlantWindowStore:
+    """Snapshots of all registered windows, keyed by sensor unique_id."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the store, nothing is read until the first restore."""
+        self._hass = hass
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        # Snapshots von Fenstern, die (noch) nicht geladen sind
+        self._snapshots: Dict[str, str] = {}
+        self._windows: Dict[str, Any] = {}
+        self._load_task: asyncio.Task | None = None
+        self.unsub_listeners: list = []
+
+    async def async_load(self) -> None:
+        """Load the snapshot file once."""
+        if self._load_task is None:
+            self._load_task = self._hass.async_create_task(self._async_load())
+        await self._load_task
+
+    async def _async_load(self) -> None:
+        data = await self._store.async_load() or {}
+        # Bereits freigegebene Fenster haben einen neueren Stand als die Datei
+        self._snapshots = dict(data.get("windows", {})) | self._snapshots
+
+    async def async_restore(self, key: str, window: Any) -> bool:
+        """Register a window for snapshots and fill it from the last snapshot."""
+        await self.async_load()
+        self._windows[key] = window
+        snapshot = self._snapshots.pop(key, None)
+        if snapshot is None:
+            return False
+        try:
+            window.load_bytes(base64.b64decode(snapshot))
+        except (binascii.Error, ValueError) as ex:
+            _LOGGER.warning("Could not restore window %s: %s", key, ex)
+            return False
+        return True
+
+    @callback
+    def release(self, key: str) -> None:
+        """Unregister a window (e.g. on reload) and keep its last snapshot."""
+        window = self._windows.pop(key, None)
+        if window is not None and len(window):
+            self._snapshots[key] = _encode(window)
+
+    @callback
+    def remove(self, prefix: str) -> None:
+        """Drop all windows and snapshots whose key starts with prefix."""
+        for keys in (self._windows, self._snapshots):
+            for key in [key for key in keys if key.startswith(prefix)]:
+                del keys[key]
+
+    async def async_save(self) -> None:
+        """Write a snapshot of all windows."""
+        if self._load_task is None:
+            # Nie geladen: nichts zu speichern, die Datei nicht überschreiben
+            return
+        await self._load_task
+        await self._store.async_save(self._data_to_save())
+
+    @callback
+    def _data_to_save(self) -> Dict[str, Any]:
+        windows = dict(self._snapshots)
+        for key, window in self._windows.items():
+            if len(window):
+                windows[key] = _encode(window)
+        return {"windows": windows}
+
+
+def _encode(window: Any) -> str:
+    return base64.b64encode(window.to_bytes()).decode("ascii")
+
+
+@callback
+def async_get_window_store(hass: HomeAssistant) -> PlantWindowStore:
+    """Return the shared window store, create it on first use."""
+    if DATA_WINDOW_STORE not in hass.data:
+        window_store = PlantWindowStore(hass)
+
+        async def _async_snapshot(_now) -> None:
+            await window_store.async_save()
+
+        async def _async_stop(_event) -> None:
+            if hass.data.get(DATA_WINDOW_STORE) is window_store:
+                await window_store.async_save()
+
+        window_store.unsub_listeners.append(
+            async_track_time_interval(
+                hass, _async_snapshot, timedelta(seconds=WINDOW_SNAPSHOT_INTERVAL)
+            )
+        )
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_stop)
+        hass.data[DATA_WINDOW_STORE] = window_store
+    return hass.data[DATA_WINDOW_STORE]
@@ -0,0 +1,230 @@
+"""Sliding time windows and accumulators for the calculated plant sensors.
+
+Samples are stored as float epoch seconds and float values in two
+array('d') columns (16 bytes per sample). New samples are appended at the
+end and old samples are evicted by advancing a head index; the consumed
+prefix is only dropped once it makes up half of the buffer, so eviction is
+amortized O(1) instead of rebuilding the whole window on every sample.
+
+Totals that grow over the lifetime of a plant use an accumulator instead
+of a history, so each reading is constant time and memory.
+
+Windows can be snapshotted to packed float64 bytes and restored from them,
+so they survive a restart.
+"""
+
+from __future__ import annotations
+
+from array import array
+import math
+import struct
+import sys
+from typing import Sequence, Tuple
+
+# Ab dieser Größe wird der verbrauchte Anfang der Puffer entfernt
+_COMPACT_MIN = 64
+
+# Snapshot: Version, Anzahl Spalten, Anzahl Samples, danach die float64 Spalten (little endian)
+_SNAPSHOT_HEADER = struct.Struct("<BBI")
+_SNAPSHOT_VERSION = 1
+
+
+class TimeWindow:
+    """Samples of the last `duration` seconds in two array('d') buffers."""
+
+    __slots__ = ("duration", "times", "values", "_head")
+
+    def __init__(self, duration: float) -> None:
+        """Initialize an empty window of `duration` seconds."""
+        self.duration = float(duration)
+        self.times = array("d")
+        self.values = array("d")
+        self._head = 0
+
+    def append(self, timestamp: float, value: float) -> None:
+        """Add a sample and evict all samples older than the window."""
+        self.times.append(timestamp)
+        self.values.append(value)
+        self.evict(timestamp - self.duration)
+
+    def evict(self, cutoff: float) -> int:
+        """Drop all samples with a timestamp before `cutoff`. Returns their number."""
+        times = self.times
+        head = start = self._head
+        end = len(times)
+        while head < end and times[head] < cutoff:
+            head += 1
+        if head != start:
+            self._evicted(start, head)
+        self._head = head
+        if head >= _COMPACT_MIN and head * 2 >= end:
+            self._compact()
+        return head - start
+
+    def clear(self) -> None:
+        """Remove all samples."""
+        self.times = array("d")
+        self.values = array("d")
+        self._head = 0
+
+    def first(self) -> Tuple[float, float]:
+        """Return the oldest (timestamp, value) in the window."""
+        if not len(self):
+            raise IndexError("window is empty")
+        return self.times[self._head], self.values[self._head]
+
+    def last(self) -> Tuple[float, float]:
+        """Return the newest (timestamp, value) in the window."""
+        if not len(self):
+            raise IndexError("window is empty")
+        return self.times[-1], self.values[-1]
+
+    def __len__(self) -> int:
+        return len(self.times) - self._head
+
+    def to_bytes(self) -> bytes:
+        """Return a compact snapshot of the samples (packed float64 columns)."""
+        columns = self._columns()
+        parts = [_SNAPSHOT_HEADER.pack(_SNAPSHOT_VERSION, len(columns), len(self))]
+        for column in columns:
+            part = column[self._head :]
+            if sys.byteorder != "little":
+                part.byteswap()
+            parts.append(part.tobytes())
+        return b"".join(parts)
+
+    def load_bytes(self, data: bytes) -> None:
+        """Replace all samples with a snapshot created by to_bytes()."""
+        if len(data) < _SNAPSHOT_HEADER.size:
+            raise ValueError("Window snapshot is truncated")
+        version, column_count, count = _SNAPSHOT_HEADER.unpack_from(data)
+        size = count * 8
+        if (
+            version != _SNAPSHOT_VERSION
+            or column_count != len(self._columns())
+            or len(data) != _SNAPSHOT_HEADER.size + column_count * size
+        ):
+            raise ValueError("Window snapshot does not match this window")
+        columns = []
+        offset = _SNAPSHOT_HEADER.size
+        for _ in range(column_count):
+            column = array("d")
+            column.frombytes(data[offset : offset + size])
+            if sys.byteorder != "little":
+                column.byteswap()
+            columns.append(column)
+            offset += size
+        self._set_columns(columns)
+
+    def _columns(self) -> Tuple[array, ...]:
+        return self.times, self.values
+
+    def _set_columns(self, columns: Sequence[array]) -> None:
+        self.times, self.values = columns[0], columns[1]
+        self._head = 0
+
+    def _evicted(self, start: int, head: int) -> None:
+        """Hook for subclasses, called before samples [start, head) are evicted."""
+
+    def _compact(self) -> None:
+        head = self._head
+        del self.times[:head]
+        del self.values[:head]
+        self._head = 0
+
+
+class DropWindow(TimeWindow):
+    """TimeWindow that keeps the sum of the drops between consecutive samples.
+
+    drops[i] is the decrease from sample i-1 to sample i. The sum only
+    contains pairs where both samples are inside the window, so a drop is
+    added when a sample arrives and subtracted when its predecessor is
+    evicted.
+    """
+
+    __slots__ = ("drops", "total")
+
+    def __init__(self, duration: float) -> None:
+        """Initialize an empty window of `duration` seconds."""
+        super().__init__(duration)
+        self.drops = array("d")
+        self.total = 0.0
+
+    def append(self, timestamp: float, value: float) -> None:
+        """Add a sample, add its drop and evict all samples older than the window."""
+        drop = 0.0
+        if len(self):
+            drop = self.values[-1] - value
+            if drop > 0:
+                self.total += drop
+            else:
+                drop = 0.0
+        self.drops.append(drop)
+        super().append(timestamp, value)
+
+    def clear(self) -> None:
+        """Remove all samples."""
+        super().clear()
+        self.drops = array("d")
+        self.total = 0.0
+
+    def _evicted(self, start: int, head: int) -> None:
+        end = len(self.times)
+        if head >= end:
+            self.total = 0.0
+            return
+        # Die Drops bis einschließlich des neuen ersten Samples verlieren ihren Vorgänger
+        for i in range(start + 1, head + 1):
+            self.total -= self.drops[i]
+        if self.total < 0:
+            self.total = 0.0
+
+    def _columns(self) -> Tuple[array, ...]:
+        return self.times, self.values, self.drops
+
+    def _set_columns(self, columns: Sequence[array]) -> None:
+        super()._set_columns(columns)
+        self.drops = columns[2]
+        # Der Drop des ersten Samples gehört zu einem Vorgänger außerhalb des Fensters
+        self.total = math.fsum(self.drops[1:])
+
+    def _compact(self) -> None:
+        del self.drops[: self._head]
+        super()._compact()
+        # Rundungsfehler der laufenden Summe beim Kompaktieren verwerfen
+        self.total = math.fsum(self.drops[1:])
+
+
+class DropAccumulator:
+    """Running sum of the decreases (or increases) between consecutive values.
+
+    Replaces keeping every reading and re-summing all drops: only the last
+    value and the cumulative change are stored.
+    """
+
+    __slots__ = ("last_value", "total", "samples", "_rising")
+
+    def __init__(self, rising: bool = False) -> None:
+        """Initialize; rising=True sums increases instead of decreases."""
+        self._rising = rising
+        self.last_value: float | None = None
+        self.total = 0.0
+        self.samples = 0
+
+    def add(self, value: float) -> float:
+        """Add a reading and return the change that was accumulated (>= 0)."""
+        last, self.last_value = self.last_value, value
+        self.samples += 1
+        if last is None:
+            return 0.0
+        change = value - last if self._rising else last - value
+        if change <= 0:
+            return 0.0
+        self.total += change
+        return change
+
+    def reset(self) -> None:
+        """Forget the last value and the accumulated total."""
+        self.last_value = None
+        self.total = 0.0
+        self.samples = 0
@@ -38,6 +38,7 @@ from .const import (
     GROWTH_PHASE_SEEDS,
     TREATMENT_OPTIONS,
     TREATMENT_NONE,
+    DATA_PLANT_REGISTRY,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -186,18 +187,15 @@ class PlantGrowthPhaseSelect(SelectEntity, RestoreEntity):
 
         # Sammle die Phasen aller Member Plants
         member_phases = []
+        plant_registry = self._hass.data[DATA_PLANT_REGISTRY]
         for plant_id in self._plant._member_plants:
             # Suche die Plant Entity
-            for entry_id in self._hass.data[DOMAIN]:
-                if ATTR_PLANT in self._hass.data[DOMAIN][entry_id]:
-                    plant = self._hass.data[DOMAIN][entry_id][ATTR_PLANT]
-                    if plant.entity_id == plant_id:
-                        if plant.growth_phase_select:
-                            phase = plant.growth_phase_select.current_option
-                            if phase != GROWTH_PHASE_REMOVED:  # Ignoriere "Entfernt"
-                                member_phases.append(phase)
-                                _LOGGER.debug("Added phase %s from plant %s", phase, plant_id)
-                        break
+            plant = plant_registry.get_by_entity_id(plant_id)
+            if plant and plant.growth_phase_select:
+                phase = plant.growth_phase_select.current_option
+                if phase != GROWTH_PHASE_REMOVED:  # Ignoriere "Entfernt"
+                    member_phases.append(phase)
+                    _LOGGER.debug("Added phase %s from plant %s", phase, plant_id)
 
         if not member_phases:
             _LOGGER.debug("No valid phases found for cycle %s", self._plant.entity_id)
@@ -328,76 +326,28 @@ class PlantGrowthPhaseSelect(SelectEntity, RestoreEntity):
 
         # Wenn ein Cycle seine Phase ändert, aktualisiere alle Member Plants
         if self._plant.device_type == DEVICE_TYPE_CYCLE:
-            device_registry = dr.async_get(self._hass)
-            
-            # Finde das Cycle Device
-            cycle_device = device_registry.async_get_device(
-                identifiers={(DOMAIN, self._plant.unique_id)}
-            )
-            
-            if cycle_device:
-                # Finde alle zugehörigen Plant Devices
-                for device_entry in device_registry.devices.values():
-                    if device_entry.via_device_id == cycle_device.id:
-                        # Finde die zugehörige Plant Entity
-                        for entry_id in self._hass.data[DOMAIN]:
-                            if ATTR_PLANT in self._hass.data[DOMAIN][entry_id]:
-                                plant = self._hass.data[DOMAIN][entry_id][ATTR_PLANT]
-                                if (plant.device_type != DEVICE_TYPE_CYCLE and 
-                                    plant.unique_id == next(iter(device_entry.identifiers))[1]):
-                                    # Aktualisiere die Growth Phase der Plant
-                                    if plant.growth_phase_select:
-                                        await plant.growth_phase_select.async_select_option(option)
-                                    break
+            # Alle zugehörigen Member Plants direkt aus dem Index
+            for plant in self._hass.data[DATA_PLANT_REGISTRY].get_members(self._plant):
+                if plant.device_type != DEVICE_TYPE_CYCLE and plant.growth_phase_select:
+                    # Aktualisiere die Growth Phase der Plant
+                    await plant.growth_phase_select.async_select_option(option)
 
         # Wenn eine Plant ihre Phase ändert, aktualisiere den zugehörigen Cycle
         elif self._plant.device_type == DEVICE_TYPE_PLANT:
-            device_registry = dr.async_get(self._hass)
-            plant_device = device_registry.async_get_device(
-                identifiers={(DOMAIN, self._plant.unique_id)}
-            )
-            
+            # Finde den Cycle direkt über den Index
+            cycle = self._hass.data[DATA_PLANT_REGISTRY].get_cycle(self._plant)
             _LOGGER.debug(
-                "%s: Plant device: %s, via_device_id: %s",
+                "%s: Cycle: %s",
                 self._plant.entity_id,
-                plant_device,
-                plant_device.via_device_id if plant_device else None
+                cycle.entity_id if cycle else None
             )
-            
-            if plant_device and plant_device.via_device_id:
-                # Finde das Cycle Device direkt über die ID
-                for device in device_registry.devices.values():
-                    if device.id == plant_device.via_device_id:
-                        cycle_device = device
-                        _LOGGER.debug(
-                            "%s: Found cycle device: %s",
-                            self._plant.entity_id,
-                            cycle_device
-                        )
-                        
-                        # Finde den Cycle und aktualisiere seine Phase
-                        for entry_id in self._hass.data[DOMAIN]:
-                            if ATTR_PLANT in self._hass.data[DOMAIN][entry_id]:
-                                cycle = self._hass.data[DOMAIN][entry_id][ATTR_PLANT]
-                                _LOGGER.debug(
-                                    "%s: Checking cycle %s (type: %s, unique_id: %s vs %s)",
-                                    self._plant.entity_id,
-                                    cycle.entity_id,
-                                    cycle.device_type,
-                                    cycle.unique_id,
-                                    next(iter(cycle_device.identifiers))[1]
-                                )
-                                
-                                if (cycle.device_type == DEVICE_TYPE_CYCLE and 
-                                    cycle.unique_id == next(iter(cycle_device.identifiers))[1]):
-                                    if cycle.growth_phase_select:
-                                        _LOGGER.debug(
-                                            "%s: Found matching cycle, updating phase",
-                                            self._plant.entity_id
-                                        )
-                                        await cycle.growth_phase_select._update_cycle_phase()
-                                    break
-                        break
+
+            if cycle and cycle.device_type == DEVICE_TYPE_CYCLE and cycle.growth_phase_select:
+                _LOGGER.debug(
+                    "%s: Found matching cycle, updating phase",
+                    self._plant.entity_id
+                )
+                await cycle.growth_phase_select._update_cycle_phase()
 
 class PlantCycleSelect(SelectEntity, RestoreEntity):
     """Select entity to assign a plant to a cycle."""
@@ -452,14 +402,13 @@ class PlantCycleSelect(SelectEntity, RestoreEntity):
         )
         
         if plant_device and plant_device.via_device_id:
-            # Suche das Cycle Device über alle Devices
-            for device in device_registry.devices.values():
-                if device.id == plant_device.via_device_id:
-                    # Finde den Cycle Namen anhand der Seriennummer
-                    for option in self._attr_options:
-                        if option.endswith(f"({device.serial_number})"):
-                            return option
-                    break
+            # Hole das Cycle Device direkt über die ID
+            device = device_registry.async_get(plant_device.via_device_id)
+            if device:
+                # Finde den Cycle Namen anhand der Seriennummer
+                for option in self._attr_options:
+                    if option.endswith(f"({device.serial_number})"):
+                        return option
         return None
 
     def _update_cycle_options(self) -> None:
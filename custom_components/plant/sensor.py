@@ -44,7 +44,6 @@ from homeassistant.helpers.entity import (
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.event import async_track_state_change_event, async_call_later
 from homeassistant.util import dt as dt_util
-from homeassistant.components.recorder import history, get_instance
 
 from . import SETUP_DUMMY_SENSORS
 from .const import (
@@ -108,7 +107,14 @@ from .const import (
     READING_ENERGY_COST,
     ICON_ENERGY_COST,
     DEVICE_CLASS_PH,  # Importiere unsere eigene Device Class
+    DATA_PLANT_REGISTRY,
+    DATA_WINDOW_STORE,
+    NORMALIZATION_RAW_HISTORY_DAYS,
 )
+from .plant_history import async_get_plant_history
+from .plant_quantile import WindowedQuantile
+from .plant_window_store import async_get_window_store
+from .plant_windows import DropAccumulator, DropWindow, TimeWindow
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -143,6 +149,7 @@ async def async_setup_entry(
         # Erst die Entities zu HA hinzufügen
         async_add_entities(plant_sensors)
         hass.data[DOMAIN][entry.entry_id][ATTR_SENSORS] = plant_sensors
+        hass.data[DATA_PLANT_REGISTRY].register_sensors(entry.entry_id, plant_sensors)
 
         # Dann die Sensoren der Plant hinzufügen
         plant.add_sensors(
@@ -298,6 +305,7 @@ async def async_setup_entry(
 
         # Füge alle Sensoren zu Home Assistant hinzu
         async_add_entities(cycle_sensors.values())
+        plant.add_median_sensors(cycle_sensors.values())
 
         # Füge die Sensoren der Plant hinzu
         plant.add_sensors(
@@ -681,6 +689,13 @@ class PlantCurrentMoisture(PlantCurrentStatus):
         )
         self._max_moisture = None
         self._last_normalize_update = None
+        # Laufendes Perzentil der Rohwerte über das Normalisierungsfenster
+        self._quantile = WindowedQuantile(
+            self._normalize_percentile / 100, self._normalize_window * 86400
+        )
+        # Historie wird einmal ab dem Cursor des Perzentils nachgeladen
+        self._history_synced = False
+        self._pending_samples: list | None = None
 
     async def async_added_to_hass(self) -> None:
         """When entity is added to hass."""
@@ -688,68 +703,107 @@ class PlantCurrentMoisture(PlantCurrentStatus):
 
         # Initialisiere Normalisierung beim Start
         if self._normalize:
-            self._last_normalize_update = None  # Force update
+            # Perzentil aus dem letzten Snapshot, die Historie danach nur ab dessen Cursor
+            await async_get_window_store(self._hass).async_restore(
+                self._quantile_key, self._quantile
+            )
             await self._update_normalization()
 
-            # Wenn es eine Neuerstellung ist, aktualisiere sofort
-            if self._config.data[FLOW_PLANT_INFO].get(ATTR_IS_NEW_PLANT, False):
-                _LOGGER.debug("New plant created, updating normalization immediately")
-                await self._update_normalization()
+    async def async_will_remove_from_hass(self) -> None:
+        """Keep a snapshot of the percentile sketch."""
+        _release_window(self._hass, self._quantile_key)
 
-    async def _update_normalization(self) -> None:
-        """Update the normalization max value"""
-        if not self._normalize or not self._external_sensor:
-            return
+    @property
+    def _quantile_key(self) -> str:
+        return f"{self.unique_id}-normalization"
 
-        now = dt_util.utcnow()
+    def replace_external_sensor(self, new_sensor: str | None) -> None:
+        """Modify the external sensor, the percentile starts over for a new sensor."""
+        if new_sensor != self._external_sensor:
+            self._quantile.reset(dt_util.utcnow().timestamp())
+            self._history_synced = False
+        super().replace_external_sensor(new_sensor)
 
-        # Aktualisiere nur alle 5 Minuten, außer bei None (Erststart/Neuerstellung)
+    @callback
+    def state_changed(self, entity_id, new_state):
+        """Feed every reading of the external sensor into the percentile sketch."""
+        super().state_changed(entity_id, new_state)
         if (
-            self._last_normalize_update is not None
-            and now - self._last_normalize_update < timedelta(minutes=5)
+            self._normalize
+            and new_state is not None
+            and entity_id == self.external_sensor
         ):
+            if new_state.last_changed != new_state.last_updated:
+                # Nur Attribute geändert, zählt wie in der Historie nicht
+                return
+            try:
+                sample = (new_state.last_updated.timestamp(), float(new_state.state))
+            except (ValueError, TypeError):
+                return
+            if self._pending_samples is not None:
+                # Historie wird gerade geladen, danach in zeitlicher Reihenfolge übernehmen
+                self._pending_samples.append(sample)
+            else:
+                self._quantile.add(*sample)
+
+    async def _update_normalization(self) -> None:
+        """Update the normalization max value from the streaming percentile"""
+        if not self._normalize or not self._external_sensor:
             return
 
+        if not self._history_synced and self._pending_samples is None:
+            self._pending_samples = []
+            try:
+                await self._sync_normalization_history()
+                self._history_synced = True
+            finally:
+                for sample in self._pending_samples:
+                    self._quantile.add(*sample)
+                self._pending_samples = None
+
+        max_moisture = self._quantile.value
+        if not max_moisture:
+            return
+        if max_moisture != self._max_moisture:
+            _LOGGER.debug(
+                "Updated moisture normalization: max=%s, factor=%s (from %s values)",
+                max_moisture,
+                round(100 / max_moisture, 2),  # Gerundeter Wert nur für Log
+                len(self._quantile),
+            )
+        self._max_moisture = max_moisture
+        self._normalize_factor = 100 / max_moisture  # Exakter Wert für Berechnungen
+        self._last_normalize_update = dt_util.utcnow()
+
+    async def _sync_normalization_history(self) -> None:
+        """Add the recorder history since the cursor of the percentile sketch.
+
+        Without a usable cursor (new sketch or older than the window) the
+        whole window is read once, otherwise only the readings since the last
+        added sample. Days older than NORMALIZATION_RAW_HISTORY_DAYS are read
+        as hourly means from the long-term statistics, weighted like the raw
+        readings.
+        """
+        now = dt_util.utcnow()
+
         # Hole historische Daten
         start_time = now - timedelta(days=self._normalize_window)
+        if self._quantile.last > start_time.timestamp():
+            start_time = dt_util.utc_from_timestamp(self._quantile.last)
+        else:
+            self._quantile.reset(start_time.timestamp())
 
-        # Korrigierter Aufruf der history API mit dem richtigen Executor
-        recorder = get_instance(self._hass)
-        history_list = await recorder.async_add_executor_job(
-            history.state_changes_during_period,
-            self._hass,
+        # Gemeinsame Abfrage mit den anderen Pflanzen, ältere Tage aus den Langzeitstatistiken
+        samples = await async_get_plant_history(self._hass).async_get_samples(
+            [self._external_sensor],
             start_time,
             now,
-            self._external_sensor,
+            NORMALIZATION_RAW_HISTORY_DAYS * 86400,
         )
 
-        if not history_list or self._external_sensor not in history_list:
-            return
-
-        # Extrahiere numerische Werte
-        values = []
-        for state in history_list[self._external_sensor]:
-            try:
-                if state.state not in (STATE_UNKNOWN, STATE_UNAVAILABLE):
-                    values.append(float(state.state))
-            except (ValueError, TypeError):
-                continue
-
-        if values:
-            # Berechne das Perzentil
-            percentile_index = int(len(values) * self._normalize_percentile / 100)
-            sorted_values = sorted(values)
-            self._max_moisture = sorted_values[percentile_index]
-            self._normalize_factor = (
-                100 / self._max_moisture
-            )  # Exakter Wert für Berechnungen
-            self._last_normalize_update = now
-            _LOGGER.debug(
-                "Updated moisture normalization: max=%s, factor=%s (from %s values)",
-                self._max_moisture,
-                round(self._normalize_factor, 2),  # Gerundeter Wert nur für Log
-                len(values),
-            )
+        # Werte in zeitlicher Reihenfolge übernehmen, bekannte überspringt der Cursor
+        for timestamp, value in samples.get(self._external_sensor, []):
+            self._quantile.add(timestamp, value)
 
     @property
     def extra_state_attributes(self) -> dict:
@@ -1034,6 +1088,21 @@ class PlantTotalLightIntegral(IntegrationSensor):
             self._state = 0  # Wichtig für IntegrationSensor
 
 
+async def _async_restore_window(
+    hass: HomeAssistant, key: str, window: TimeWindow
+) -> None:
+    """Register a window for snapshots and restore it, dropping expired samples."""
+    if await async_get_window_store(hass).async_restore(key, window):
+        window.evict(dt_util.utcnow().timestamp() - window.duration)
+
+
+def _release_window(hass: HomeAssistant, key: str) -> None:
+    """Unregister a window from the snapshots and keep its last state."""
+    window_store = hass.data.get(DATA_WINDOW_STORE)
+    if window_store is not None:
+        window_store.release(key)
+
+
 class PlantDailyLightIntegral(RestoreSensor):
     """Entity class to calculate Daily Light Integral from PPDF"""
 
@@ -1053,7 +1122,8 @@ class PlantDailyLightIntegral(RestoreSensor):
         self._attr_native_unit_of_measurement = UNIT_DLI
         self._attr_icon = ICON_DLI
         self._source_entity = illuminance_integration_sensor.entity_id
-        self._history = []
+        # Werte der letzten 24 Stunden (Epoch-Sekunden, Integral)
+        self._history = TimeWindow(24 * 3600)
         self._last_update = None
         self._attr_native_value = 0  # Starte immer bei 0
         self._last_value = None  # Initialisiere _last_value
@@ -1061,7 +1131,7 @@ class PlantDailyLightIntegral(RestoreSensor):
         # Bei Neuerstellung explizit auf 0 setzen
         if config.data[FLOW_PLANT_INFO].get(ATTR_IS_NEW_PLANT, False):
             self._attr_native_value = 0
-            self._history = []
+            self._history.clear()
 
         self.entity_id = async_generate_entity_id(
             f"{DOMAIN_SENSOR}.{{}}", self.name, current_ids={}
@@ -1098,6 +1168,9 @@ class PlantDailyLightIntegral(RestoreSensor):
             except (TypeError, ValueError):
                 self._attr_native_value = 0
 
+        # 24h-Fenster aus dem letzten Snapshot wiederherstellen
+        await _async_restore_window(self._hass, self.unique_id, self._history)
+
         # Track source entity changes
         async_track_state_change_event(
             self._hass,
@@ -1105,6 +1178,10 @@ class PlantDailyLightIntegral(RestoreSensor):
             self._state_changed_event,
         )
 
+    async def async_will_remove_from_hass(self) -> None:
+        """Keep a snapshot of the 24h window."""
+        _release_window(self._hass, self.unique_id)
+
     @callback
     def _state_changed_event(self, event):
         """Handle source entity state changes."""
@@ -1119,19 +1196,16 @@ class PlantDailyLightIntegral(RestoreSensor):
             current_value = float(new_state.state)
             current_time = dt_util.utcnow()
 
-            # Add to history
-            self._history.append((current_time, current_value))
-
-            # Entferne Einträge älter als 24 Stunden
-            cutoff_time = current_time - timedelta(hours=24)
-            self._history = [(t, v) for t, v in self._history if t >= cutoff_time]
+            # Add to history, Einträge älter als 24 Stunden fallen dabei heraus
+            self._history.append(current_time.timestamp(), current_value)
 
             # Berechne DLI aus den letzten 24 Stunden
             if len(self._history) >= 2:
                 # Konvertiere von mol/m²/s zu mol/m²/d (DLI)
-                time_diff = (self._history[-1][0] - self._history[0][0]).total_seconds()
+                first_time, first_value = self._history.first()
+                time_diff = current_time.timestamp() - first_time
                 if time_diff > 0:
-                    dli = (current_value - self._history[0][1]) * (
+                    dli = (current_value - first_value) * (
                         24 * 3600 / time_diff
                     )
                     self._attr_native_value = round(
@@ -1476,14 +1550,10 @@ class CycleMedianSensor(SensorEntity):
             "aggregation_method": aggregation_method,
         }
 
-    async def async_update(self) -> None:
-        """Update the sensor."""
-        self.plant._update_median_sensors()
-
     @property
     def should_poll(self) -> bool:
-        """Return True as we want to poll for updates."""
-        return True
+        """No polling, the cycle pushes updates when member sensors change."""
+        return False
 
     @property
     def state_class(self):
@@ -1507,14 +1577,15 @@ class PlantCurrentMoistureConsumption(RestoreSensor):
         self._attr_unique_id = f"{config.entry_id}-moisture-consumption"
         self._attr_native_unit_of_measurement = UNIT_VOLUME
         self._attr_icon = ICON_WATER_CONSUMPTION
-        self._history = []
+        # Feuchtigkeitswerte der letzten 24 Stunden mit laufender Summe der Abfälle
+        self._history = DropWindow(24 * 3600)
         self._last_update = None
         self._attr_native_value = 0  # Starte immer bei 0
 
         # Bei Neuerstellung explizit auf 0 setzen
         if config.data[FLOW_PLANT_INFO].get(ATTR_IS_NEW_PLANT, False):
             self._attr_native_value = 0
-            self._history = []
+            self._history.clear()
 
     @property
     def device_info(self) -> dict:
@@ -1551,6 +1622,9 @@ class PlantCurrentMoistureConsumption(RestoreSensor):
             except (TypeError, ValueError):
                 self._attr_native_value = 0
 
+        # 24h-Fenster aus dem letzten Snapshot wiederherstellen
+        await _async_restore_window(self._hass, self.unique_id, self._history)
+
         # Track moisture sensor changes
         async_track_state_change_event(
             self._hass,
@@ -1558,6 +1632,10 @@ class PlantCurrentMoistureConsumption(RestoreSensor):
             self._state_changed_event,
         )
 
+    async def async_will_remove_from_hass(self) -> None:
+        """Keep a snapshot of the 24h window."""
+        _release_window(self._hass, self.unique_id)
+
     @callback
     def _state_changed_event(self, event):
         """Handle moisture sensor state changes."""
@@ -1572,24 +1650,13 @@ class PlantCurrentMoistureConsumption(RestoreSensor):
             current_value = float(new_state.state)
             current_time = dt_util.utcnow()
 
-            # Add to history
-            self._history.append((current_time, current_value))
-
-            # Remove entries older than 24 hours
-            cutoff_time = current_time - timedelta(hours=24)
-            self._history = [(t, v) for t, v in self._history if t >= cutoff_time]
+            # Add to history, entries older than 24 hours are evicted and
+            # their drops subtracted from the running sum
+            self._history.append(current_time.timestamp(), current_value)
 
             if len(self._history) >= 2:
-                # Calculate total moisture drop
-                drops = []
-                for i in range(1, len(self._history)):
-                    if (
-                        self._history[i][1] < self._history[i - 1][1]
-                    ):  # Only negative changes
-                        drop = self._history[i - 1][1] - self._history[i][1]
-                        drops.append(drop)
-
-                total_drop = sum(drops)
+                # Total moisture drop (only negative changes) within the window
+                total_drop = self._history.total
 
                 # Convert moisture drop to volume
                 if self._plant.pot_size and self._plant.water_capacity:
@@ -1720,7 +1787,8 @@ class PlantTotalWaterConsumption(RestoreSensor):
         self._attr_entity_category = (
             EntityCategory.DIAGNOSTIC
         )  # Füge Entity-Kategorie hinzu
-        self._history = []
+        # Letzter Feuchtigkeitswert und kumulierter Abfall statt kompletter Historie
+        self._moisture_drops = DropAccumulator()
         self._last_update = None
         self._attr_native_value = 0  # Starte immer bei 0
         self._manual_additions = 0.0
@@ -1729,7 +1797,7 @@ class PlantTotalWaterConsumption(RestoreSensor):
         # Bei Neuerstellung explizit auf 0 setzen
         if config.data[FLOW_PLANT_INFO].get(ATTR_IS_NEW_PLANT, False):
             self._attr_native_value = 0
-            self._history = []
+            self._moisture_drops.reset()
 
     @property
     def entity_category(self) -> str:
@@ -1810,20 +1878,11 @@ class PlantTotalWaterConsumption(RestoreSensor):
             current_value = float(new_state.state)
             current_time = dt_util.utcnow()
 
-            # Add to history
-            self._history.append((current_time, current_value))
-
-            if len(self._history) >= 2:
-                # Calculate total moisture drop
-                drops = []
-                for i in range(1, len(self._history)):
-                    if (
-                        self._history[i][1] < self._history[i - 1][1]
-                    ):  # Only negative changes
-                        drop = self._history[i - 1][1] - self._history[i][1]
-                        drops.append(drop)
+            # Only negative changes are added to the total moisture drop
+            self._moisture_drops.add(current_value)
 
-                total_drop = sum(drops)
+            if self._moisture_drops.samples >= 2:
+                total_drop = self._moisture_drops.total
 
                 # Convert moisture drop to volume
                 if self._plant.pot_size and self._plant.water_capacity:
@@ -1917,15 +1976,15 @@ class PlantTotalFertilizerConsumption(RestoreSensor):
         self._attr_entity_category = (
             EntityCategory.DIAGNOSTIC
         )  # Füge Entity-Kategorie hinzu
-        self._history = []
+        # Letzter Leitfähigkeitswert und kumulierter Anstieg
+        self._conductivity_rises = DropAccumulator(rising=True)
         self._last_update = None
         self._attr_native_value = 0  # Starte immer bei 0
-        self._last_value = None  # Initialisiere _last_value
 
         # Bei Neuerstellung explizit auf 0 setzen
         if config.data[FLOW_PLANT_INFO].get(ATTR_IS_NEW_PLANT, False):
             self._attr_native_value = 0
-            self._history = []
+            self._conductivity_rises.reset()
 
     @property
     def entity_category(self) -> str:
@@ -1979,17 +2038,13 @@ class PlantTotalFertilizerConsumption(RestoreSensor):
         try:
             current_value = float(new_state.state)
 
-            # Berechne nur die Differenz seit dem letzten Wert
-            if self._last_value is not None:
-                if current_value > self._last_value:  # Nur positive Änderungen
-                    increase = current_value - self._last_value
-                    self._attr_native_value += round(
-                        increase,
-                        self._plant.decimals_for("total_fertilizer_consumption"),
-                    )
-
-            # Speichere aktuellen Wert für nächste Berechnung
-            self._last_value = current_value
+            # Berechne nur die Differenz seit dem letzten Wert (nur positive Änderungen)
+            increase = self._conductivity_rises.add(current_value)
+            if increase:
+                self._attr_native_value += round(
+                    increase,
+                    self._plant.decimals_for("total_fertilizer_consumption"),
+                )
             self.async_write_ha_state()
 
         except (TypeError, ValueError):
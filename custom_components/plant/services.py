@@ -3,11 +3,10 @@ import logging
 import voluptuous as vol
 import aiohttp
 import os
-from datetime import datetime
+from datetime import datetime, timezone
 import asyncio
 import json
 import zipfile
-import shutil
 import csv
 import io
 import re
@@ -25,7 +24,6 @@ from homeassistant.helpers.template import Template
 from homeassistant.helpers import area_registry as ar
 from homeassistant.helpers.entity import async_generate_entity_id
 from homeassistant.core import SupportsResponse
-from homeassistant.components.recorder import history, get_instance
 
 from .const import (
     DOMAIN,
@@ -71,9 +69,31 @@ from .const import (
     SERVICE_ADD_WATERING,
     SERVICE_ADD_CONDUCTIVITY,
     SERVICE_ADD_PH,
-
+    DATA_PLANT_REGISTRY,
+    IMPORT_SETUP_CONCURRENCY,
+    EXPORT_HISTORY_PAGE_DAYS,
+    HISTORY_BATCH_SIZE,
+)
+from .plant_export import (
+    IMAGE_DIR,
+    SENSOR_DATA_FORMAT_CSV,
+    SENSOR_DATA_SUFFIXES,
+    HistoryArchiveWriter,
+    ImageExtractor,
+    config_fingerprint,
+    content_names,
+    read_history_file,
+    validate_import,
+)
+from .plant_export_watermarks import ExportWatermarks
+from .plant_export_jobs import (
+    ExportJob,
+    async_get_export_jobs,
+    async_run_executor_job,
 )
 from .plant_helpers import PlantHelper
+from .plant_history import async_get_plant_history
+from .plant_ids import async_reserve_ids
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -137,6 +157,12 @@ EXPORT_PLANTS_SCHEMA = vol.Schema({
     vol.Optional("include_images"): cv.boolean,
     vol.Optional("include_sensor_data"): cv.boolean,
     vol.Optional("sensor_data_days"): vol.All(vol.Coerce(int), vol.Range(min=1, max=365)),
+    vol.Optional("raw_data_days"): vol.All(vol.Coerce(int), vol.Range(min=0, max=365)),
+    vol.Optional("background", default=False): cv.boolean,
+    vol.Optional("incremental", default=False): cv.boolean,
+    vol.Optional("sensor_data_format", default=SENSOR_DATA_FORMAT_CSV): vol.In(
+        list(SENSOR_DATA_SUFFIXES)
+    ),
 })
 
 # Schema für import_plants Service
@@ -145,6 +171,8 @@ IMPORT_PLANTS_SCHEMA = vol.Schema({
     vol.Optional("new_plant_name"): cv.string,
     vol.Optional("overwrite_existing"): cv.boolean,
     vol.Optional("include_images"): cv.boolean,
+    vol.Optional("include_sensor_data"): cv.boolean,
+    vol.Optional("delta_files"): vol.All(cv.ensure_list, [cv.string]),
 })
 
 
@@ -176,14 +204,8 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         """Replace a sensor entity within a plant device"""
         meter_entity = call.data.get("meter_entity")
         new_sensor = call.data.get("new_sensor")
-        found = False
-        for entry_id in hass.data[DOMAIN]:
-            if ATTR_SENSORS in hass.data[DOMAIN][entry_id]:
-                for sensor in hass.data[DOMAIN][entry_id][ATTR_SENSORS]:
-                    if sensor.entity_id == meter_entity:
-                        found = True
-                        break
-        if not found:
+        plant_sensor = hass.data[DATA_PLANT_REGISTRY].get_sensor(meter_entity)
+        if plant_sensor is None:
             _LOGGER.warning(
                 "Refuse to update non-%s entities: %s", DOMAIN, meter_entity
             )
@@ -218,63 +240,31 @@ async def async_setup_services(hass: HomeAssistant) -> None:
             meter_entity,
             new_sensor,
         )
-        for key in hass.data[DOMAIN]:
-            if ATTR_SENSORS in hass.data[DOMAIN][key]:
-                meters = hass.data[DOMAIN][key][ATTR_SENSORS]
-                for meter in meters:
-                    if meter.entity_id == meter_entity:
-                        meter.replace_external_sensor(new_sensor)
+        plant_sensor.replace_external_sensor(new_sensor)
         return
 
     async def remove_plant(call: ServiceCall) -> None:
         """Remove a plant entity and all its associated entities."""
         plant_entity = call.data.get("plant_entity")
 
-        found = False
-        target_entry_id = None
-        target_plant = None
-        for entry_id in hass.data[DOMAIN]:
-            if ATTR_PLANT in hass.data[DOMAIN][entry_id]:
-                plant = hass.data[DOMAIN][entry_id][ATTR_PLANT]
-                if plant.entity_id == plant_entity:
-                    found = True
-                    target_entry_id = entry_id
-                    target_plant = plant
-                    break
-
-        if not found:
+        target_plant = hass.data[DATA_PLANT_REGISTRY].get_by_entity_id(plant_entity)
+        if target_plant is None:
             _LOGGER.warning(
                 "Refuse to remove non-%s entity: %s", DOMAIN, plant_entity
             )
             return False
 
         # Prüfe ob die Plant einem Cycle zugeordnet ist und aktualisiere dessen Phase
-        device_registry = dr.async_get(hass)
-        plant_device = device_registry.async_get_device(
-            identifiers={(DOMAIN, target_plant.unique_id)}
-        )
-        
-        if plant_device and plant_device.via_device_id:
-            # Suche das Cycle Device
-            for device in device_registry.devices.values():
-                if device.id == plant_device.via_device_id:
-                    cycle_device = device
-                    # Finde den zugehörigen Cycle
-                    for entry_id in hass.data[DOMAIN]:
-                        if ATTR_PLANT in hass.data[DOMAIN][entry_id]:
-                            cycle = hass.data[DOMAIN][entry_id][ATTR_PLANT]
-                            if (cycle.device_type == DEVICE_TYPE_CYCLE and 
-                                cycle.unique_id == next(iter(cycle_device.identifiers))[1]):
-                                # Entferne die Plant aus dem Cycle
-                                cycle.remove_member_plant(plant_entity)
-                                # Aktualisiere Flowering Duration
-                                if cycle.flowering_duration:
-                                    await cycle.flowering_duration._update_cycle_duration()
-                                break
-                    break
+        cycle = hass.data[DATA_PLANT_REGISTRY].get_cycle(target_plant)
+        if cycle and cycle.device_type == DEVICE_TYPE_CYCLE:
+            # Entferne die Plant aus dem Cycle
+            cycle.remove_member_plant(plant_entity)
+            # Aktualisiere Flowering Duration
+            if cycle.flowering_duration:
+                await cycle.flowering_duration._update_cycle_duration()
 
         # Entferne die Config Entry
-        await hass.config_entries.async_remove(target_entry_id)
+        await hass.config_entries.async_remove(target_plant.unique_id)
         return True
 
     async def create_plant(call: ServiceCall) -> ServiceResponse:
@@ -518,12 +508,10 @@ async def async_setup_services(hass: HomeAssistant) -> None:
             _LOGGER.debug("Config Entry erstellt mit ID: %s", result["result"].entry_id)
             
             # Aktualisiere alle Plant Cycle Selects
-            for entry_id in hass.data[DOMAIN]:
-                if ATTR_PLANT in hass.data[DOMAIN][entry_id]:
-                    plant = hass.data[DOMAIN][entry_id][ATTR_PLANT]
-                    if plant.device_type == DEVICE_TYPE_PLANT and plant.cycle_select:
-                        plant.cycle_select._update_cycle_options()
-                        plant.cycle_select.async_write_ha_state()
+            for plant in hass.data[DATA_PLANT_REGISTRY].plants(DEVICE_TYPE_PLANT):
+                if plant.cycle_select:
+                    plant.cycle_select._update_cycle_options()
+                    plant.cycle_select.async_write_ha_state()
             
             # Verzögerung für die Entityerstellung
             await asyncio.sleep(2)
@@ -614,11 +602,7 @@ async def async_setup_services(hass: HomeAssistant) -> None:
                 return
             
             # Finde zuerst das Cycle Objekt
-            for entry_id in hass.data[DOMAIN]:
-                if ATTR_PLANT in hass.data[DOMAIN][entry_id]:
-                    if hass.data[DOMAIN][entry_id][ATTR_PLANT].entity_id == cycle_entity_id:
-                        cycle = hass.data[DOMAIN][entry_id][ATTR_PLANT]
-                        break
+            cycle = hass.data[DATA_PLANT_REGISTRY].get_by_entity_id(cycle_entity_id)
 
             if not cycle:
                 _LOGGER.error(f"Cycle object for {cycle_entity_id} not found")
@@ -648,30 +632,22 @@ async def async_setup_services(hass: HomeAssistant) -> None:
 
             # Wenn die Plant bereits einem Cycle zugeordnet ist, entferne sie dort
             if plant_device.via_device_id:
-                # Suche das alte Cycle Device über alle Devices
-                old_cycle_device = None
-                for device in device_registry.devices.values():
-                    if device.id == plant_device.via_device_id:
-                        old_cycle_device = device
-                        break
-
-                if old_cycle_device:
-                    old_cycle = None
-                    for entry_id in hass.data[DOMAIN]:
-                        if ATTR_PLANT in hass.data[DOMAIN][entry_id]:
-                            device = hass.data[DOMAIN][entry_id][ATTR_PLANT]
-                            if device.device_type == DEVICE_TYPE_CYCLE and device.device_id == old_cycle_device.id:
-                                old_cycle = device
-                                break
-                    
-                    if old_cycle:
-                        old_cycle.remove_member_plant(plant_entity_id)
+                # Finde den alten Cycle direkt über die Device ID
+                old_cycle = hass.data[DATA_PLANT_REGISTRY].get_by_device_id(
+                    plant_device.via_device_id
+                )
+                if old_cycle and old_cycle.device_type == DEVICE_TYPE_CYCLE:
+                    old_cycle.remove_member_plant(plant_entity_id)
 
             # Update device registry
             device_registry.async_update_device(
                 plant_device.id,
                 via_device_id=cycle_device.id if cycle_device else None
             )
+            # Index sofort nachziehen, das Registry-Event kommt erst später
+            hass.data[DATA_PLANT_REGISTRY].set_via_device(
+                plant_device.id, cycle_device.id if cycle_device else None
+            )
 
             # Add plant to new cycle
             if cycle:
@@ -693,31 +669,20 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         """Remove a cycle entity and all its associated entities."""
         cycle_entity = call.data.get("cycle_entity")
 
-        found = False
-        target_entry_id = None
-        for entry_id in hass.data[DOMAIN]:
-            if ATTR_PLANT in hass.data[DOMAIN][entry_id]:
-                device = hass.data[DOMAIN][entry_id][ATTR_PLANT]
-                if device.entity_id == cycle_entity and device.device_type == DEVICE_TYPE_CYCLE:
-                    found = True
-                    target_entry_id = entry_id
-                    break
-
-        if not found:
+        target_cycle = hass.data[DATA_PLANT_REGISTRY].get_by_entity_id(cycle_entity)
+        if target_cycle is None or target_cycle.device_type != DEVICE_TYPE_CYCLE:
             _LOGGER.warning(
                 "Refuse to remove non-cycle entity: %s", cycle_entity
             )
             return False
 
-        await hass.config_entries.async_remove(target_entry_id)
+        await hass.config_entries.async_remove(target_cycle.unique_id)
 
         # Aktualisiere alle Plant Cycle Selects
-        for entry_id in hass.data[DOMAIN]:
-            if ATTR_PLANT in hass.data[DOMAIN][entry_id]:
-                plant = hass.data[DOMAIN][entry_id][ATTR_PLANT]
-                if plant.device_type == DEVICE_TYPE_PLANT and plant.cycle_select:
-                    plant.cycle_select._update_cycle_options()
-                    plant.cycle_select.async_write_ha_state()
+        for plant in hass.data[DATA_PLANT_REGISTRY].plants(DEVICE_TYPE_PLANT):
+            if plant.cycle_select:
+                plant.cycle_select._update_cycle_options()
+                plant.cycle_select.async_write_ha_state()
 
         return True
 
@@ -726,13 +691,7 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         source_entity_id = call.data.get("source_entity_id")
         
         # Finde das Quell-Device
-        source_plant = None
-        for entry_id in hass.data[DOMAIN]:
-            if ATTR_PLANT in hass.data[DOMAIN][entry_id]:
-                plant = hass.data[DOMAIN][entry_id][ATTR_PLANT]
-                if plant.entity_id == source_entity_id:
-                    source_plant = plant
-                    break
+        source_plant = hass.data[DATA_PLANT_REGISTRY].get_by_entity_id(source_entity_id)
 
         if not source_plant:
             raise HomeAssistantError(f"Source plant {source_entity_id} not found")
@@ -910,15 +869,10 @@ async def async_setup_services(hass: HomeAssistant) -> None:
             raise HomeAssistantError("No plant entity specified")
             
         # Finde die Plant
-        target_plant = None
+        target_plant = hass.data[DATA_PLANT_REGISTRY].get_by_entity_id(entity_id)
         target_entry = None
-        for entry_id in hass.data[DOMAIN]:
-            if ATTR_PLANT in hass.data[DOMAIN][entry_id]:
-                plant = hass.data[DOMAIN][entry_id][ATTR_PLANT]
-                if plant.entity_id == entity_id:
-                    target_plant = plant
-                    target_entry = hass.config_entries.async_get_entry(entry_id)
-                    break
+        if target_plant is not None:
+            target_entry = hass.config_entries.async_get_entry(target_plant.unique_id)
 
         if not target_plant or not target_entry:
             raise HomeAssistantError(f"Plant {entity_id} not found")
@@ -1054,13 +1008,7 @@ async def async_setup_services(hass: HomeAssistant) -> None:
             return
 
         # Finde die Entity (Plant oder Cycle)
-        target_entity = None
-        for entry_id in hass.data[DOMAIN]:
-            if ATTR_PLANT in hass.data[DOMAIN][entry_id]:
-                entity = hass.data[DOMAIN][entry_id][ATTR_PLANT]
-                if entity.entity_id == entity_id:
-                    target_entity = entity
-                    break
+        target_entity = hass.data[DATA_PLANT_REGISTRY].get_by_entity_id(entity_id)
 
         if not target_entity:
             return
@@ -1131,13 +1079,7 @@ async def async_setup_services(hass: HomeAssistant) -> None:
             raise HomeAssistantError("Keine Pflanzen-Entity angegeben")
             
         # Finde die Plant
-        target_plant = None
-        for entry_id in hass.data[DOMAIN]:
-            if ATTR_PLANT in hass.data[DOMAIN][entry_id]:
-                plant = hass.data[DOMAIN][entry_id][ATTR_PLANT]
-                if plant.entity_id == entity_id:
-                    target_plant = plant
-                    break
+        target_plant = hass.data[DATA_PLANT_REGISTRY].get_by_entity_id(entity_id)
 
         if not target_plant:
             raise HomeAssistantError(f"Pflanze {entity_id} nicht gefunden")
@@ -1161,13 +1103,7 @@ async def async_setup_services(hass: HomeAssistant) -> None:
             return
 
         # Find target plant/cycle
-        target_plant = None
-        for entry_id in hass.data.get(DOMAIN, {}):
-            if ATTR_PLANT in hass.data[DOMAIN][entry_id]:
-                plant = hass.data[DOMAIN][entry_id][ATTR_PLANT]
-                if plant.entity_id == entity_id:
-                    target_plant = plant
-                    break
+        target_plant = hass.data[DATA_PLANT_REGISTRY].get_by_entity_id(entity_id)
 
         if not target_plant:
             _LOGGER.warning("Plant entity %s not found for add_watering", entity_id)
@@ -1219,13 +1155,7 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         if value is None:
             return
         # Find target plant
-        target_plant = None
-        for entry_id in hass.data.get(DOMAIN, {}):
-            if ATTR_PLANT in hass.data[DOMAIN][entry_id]:
-                plant = hass.data[DOMAIN][entry_id][ATTR_PLANT]
-                if plant.entity_id == entity_id:
-                    target_plant = plant
-                    break
+        target_plant = hass.data[DATA_PLANT_REGISTRY].get_by_entity_id(entity_id)
         if not target_plant or not getattr(target_plant, "sensor_conductivity", None):
             _LOGGER.warning("Conductivity sensor not available for %s", entity_id)
             return
@@ -1246,13 +1176,7 @@ async def async_setup_services(hass: HomeAssistant) -> None:
         if value is None:
             return
         # Find target plant
-        target_plant = None
-        for entry_id in hass.data.get(DOMAIN, {}):
-            if ATTR_PLANT in hass.data[DOMAIN][entry_id]:
-                plant = hass.data[DOMAIN][entry_id][ATTR_PLANT]
-                if plant.entity_id == entity_id:
-                    target_plant = plant
-                    break
+        target_plant = hass.data[DATA_PLANT_REGISTRY].get_by_entity_id(entity_id)
         if not target_plant or not getattr(target_plant, "sensor_ph", None):
             # sensor_ph is stored via add_sensors as 'ph'
             sensor = None
@@ -1272,13 +1196,130 @@ async def async_setup_services(hass: HomeAssistant) -> None:
             except Exception:
                 pass
 
+    async def _async_export_history(
+        zipf: zipfile.ZipFile,
+        history_files: dict,
+        start_time: datetime,
+        raw_start_time: datetime,
+        end_time: datetime,
+        job: ExportJob | None = None,
+        data_format: str = SENSOR_DATA_FORMAT_CSV,
+        since: float | None = None,
+    ) -> tuple[int, set]:
+        """Stream the history of the sensors into the archive.
+
+        The sensors are fetched in groups of HISTORY_BATCH_SIZE and pages of
+        EXPORT_HISTORY_PAGE_DAYS. The next page is read from the recorder while
+        the current one is formatted and compressed in the executor. With since
+        (epoch seconds) only rows after it are written.
+
+        Returns the number of files and the entity_ids whose history was
+        written completely (a failed group is missing).
+        """
+        from datetime import timedelta
+
+        plant_history = async_get_plant_history(hass)
+        writer = HistoryArchiveWriter(zipf, data_format)
+        page = timedelta(days=EXPORT_HISTORY_PAGE_DAYS)
+        entity_ids = list(history_files)
+        groups = [
+            entity_ids[index : index + HISTORY_BATCH_SIZE]
+            for index in range(0, len(entity_ids), HISTORY_BATCH_SIZE)
+        ]
+        pages = []
+        page_start = start_time
+        while page_start < end_time:
+            pages.append((page_start, min(page_start + page, end_time)))
+            page_start = pages[-1][1]
+        if job is not None:
+            job.async_add_total(len(groups) * (len(pages) + 1))
+
+        async def _async_fetch_page(group, statistics_data, page_start, page_end):
+            # Sensoren mit Statistiken erst ab dem Beginn der Rohdaten
+            requests = [
+                plant_history.async_get_states(
+                    [e for e in group if e not in statistics_data], page_start, page_end
+                )
+            ]
+            if page_end > raw_start_time:
+                requests.append(
+                    plant_history.async_get_states(
+                        [e for e in group if e in statistics_data],
+                        max(page_start, raw_start_time),
+                        page_end,
+                    )
+                )
+            return await asyncio.gather(*requests)
+
+        exported = 0
+        complete = set()
+        next_page = None
+        try:
+            for group in groups:
+                await async_run_executor_job(
+                    hass,
+                    writer.begin,
+                    {entity_id: history_files[entity_id] for entity_id in group},
+                    since,
+                )
+                statistics_data = {}
+                group_complete = False
+                try:
+                    if raw_start_time > start_time:
+                        statistics_data = await plant_history.async_get_statistics(
+                            group, start_time, raw_start_time
+                        )
+                    for entity_id, rows in statistics_data.items():
+                        # Stundenmittel mit der aktuellen Einheit des Sensors
+                        current = hass.states.get(entity_id)
+                        unit = current.attributes.get("unit_of_measurement") if current else None
+                        await async_run_executor_job(
+                            hass, writer.write_statistics, entity_id, rows, unit
+                        )
+
+                    for index, (page_start, page_end) in enumerate(pages):
+                        if next_page is None:
+                            next_page = asyncio.ensure_future(
+                                _async_fetch_page(group, statistics_data, page_start, page_end)
+                            )
+                        page_states = await next_page
+                        next_page = None
+                        if index + 1 < len(pages):
+                            # Nächste Seite schon lesen, während diese geschrieben wird
+                            next_page = asyncio.ensure_future(
+                                _async_fetch_page(group, statistics_data, *pages[index + 1])
+                            )
+                        for states in page_states:
+                            await async_run_executor_job(hass, writer.write_page, states)
+                        if job is not None:
+                            job.async_advance()
+                    group_complete = True
+                except Exception as e:
+                    _LOGGER.warning(f"Could not export sensor history: {e}")
+                finally:
+                    if next_page is not None:
+                        next_page.cancel()
+                        next_page = None
+
+                counts = await async_run_executor_job(hass, writer.finish)
+                if group_complete:
+                    complete.update(group)
+                if job is not None:
+                    job.async_advance()
+                for entity_id, data_count in counts.items():
+                    if data_count > 0:
+                        exported += 1
+                        _LOGGER.info(f"Exported {data_count} history entries for {entity_id}")
+                    else:
+                        _LOGGER.warning(f"No valid history data found for {entity_id}")
+        finally:
+            await async_run_executor_job(hass, writer.discard)
+        return exported, complete
+
     async def export_plants(call: ServiceCall) -> ServiceResponse:
         """Export selected plant configurations to a ZIP archive."""
         plant_entities = call.data.get("plant_entities", [])
         file_path = call.data.get("file_path", "/config/plants_export.zip")
-        include_images = call.data.get("include_images")
-        include_sensor_data = call.data.get("include_sensor_data")
-        sensor_data_days = call.data.get("sensor_data_days")
         
         # Generate filename based on plant names if default path
         if file_path == "/config/plants_export.zip" and plant_entities:
@@ -1291,118 +1332,212 @@ async def async_setup_services(hass: HomeAssistant) -> None:
             if plant_names:
                 safe_name = "_".join(plant_names).replace(" ", "_").lower()
                 file_path = f"/config/{safe_name}.zip"
-        
-        try:
-            # Collect selected plant configurations
-            plants_data = []
-            all_image_files = []
-            
-            # Get the config entry to find the image download path
-            config_entry = next(
-                (entry for entry in hass.config_entries.async_entries(DOMAIN) 
-                 if entry.data.get("is_config", False)), 
-                None
+
+        if call.data.get("background"):
+            # Als Hintergrund-Job starten, der Fortschritt kommt über Events/Websocket
+            job = async_get_export_jobs(hass).async_start(
+                file_path,
+                lambda job: _async_export_plants(dict(call.data), file_path, job),
             )
-            download_path = config_entry.data[FLOW_PLANT_INFO].get(FLOW_DOWNLOAD_PATH, DEFAULT_IMAGE_PATH) if config_entry else DEFAULT_IMAGE_PATH
+            return job.as_dict()
+
+        try:
+            return await _async_export_plants(call.data, file_path)
+        except Exception as e:
+            _LOGGER.error(f"Error exporting plants: {e}")
+            raise HomeAssistantError(f"Error exporting plants: {e}")
+
+    async def _async_export_plants(
+        data: dict, file_path: str, job: ExportJob | None = None
+    ) -> dict:
+        """Write the export archive, report progress to job if given."""
+        plant_entities = data.get("plant_entities", [])
+        include_images = data.get("include_images")
+        include_sensor_data = data.get("include_sensor_data")
+        sensor_data_days = data.get("sensor_data_days")
+        raw_data_days = data.get("raw_data_days")
+        sensor_data_format = data.get("sensor_data_format", SENSOR_DATA_FORMAT_CSV)
+        incremental = data.get("incremental")
+
+        # Collect selected plant configurations
+        plants_data = []
+        all_image_files = []
+        
+        # Get the config entry to find the image download path
+        config_entry = next(
+            (entry for entry in hass.config_entries.async_entries(DOMAIN) 
+             if entry.data.get("is_config", False)), 
+            None
+        )
+        download_path = config_entry.data[FLOW_PLANT_INFO].get(FLOW_DOWNLOAD_PATH, DEFAULT_IMAGE_PATH) if config_entry else DEFAULT_IMAGE_PATH
+        
+        # Find config entries for selected plant entities
+        for plant_entity_id in plant_entities:
+            # Find the corresponding config entry
+            found_entry = None
+            plant = hass.data[DATA_PLANT_REGISTRY].get_by_entity_id(plant_entity_id)
+            if plant is not None:
+                found_entry = hass.config_entries.async_get_entry(plant.unique_id)
             
-            # Find config entries for selected plant entities
-            for plant_entity_id in plant_entities:
-                # Find the corresponding config entry
-                found_entry = None
-                for entry_id in hass.data[DOMAIN]:
-                    if ATTR_PLANT in hass.data[DOMAIN][entry_id]:
-                        plant = hass.data[DOMAIN][entry_id][ATTR_PLANT]
-                        if plant.entity_id == plant_entity_id:
-                            found_entry = next(
-                                (entry for entry in hass.config_entries.async_entries(DOMAIN) 
-                                 if entry.entry_id == entry_id), None
-                            )
-                            break
+            if found_entry and found_entry.data.get(FLOW_PLANT_INFO):
+                plant_info = found_entry.data[FLOW_PLANT_INFO]
+                device_type = plant_info.get(ATTR_DEVICE_TYPE, DEVICE_TYPE_PLANT)
                 
-                if found_entry and found_entry.data.get(FLOW_PLANT_INFO):
-                    plant_info = found_entry.data[FLOW_PLANT_INFO]
-                    device_type = plant_info.get(ATTR_DEVICE_TYPE, DEVICE_TYPE_PLANT)
+                if device_type == DEVICE_TYPE_PLANT:
+                    # Create a clean export data structure
+                    export_data = {
+                        "entry_id": found_entry.entry_id,
+                        "title": found_entry.title,
+                        "plant_info": dict(plant_info),
+                        "options": dict(found_entry.options),
+                        "export_timestamp": datetime.now().isoformat()
+                    }
                     
-                    if device_type == DEVICE_TYPE_PLANT:
-                        # Create a clean export data structure
-                        export_data = {
-                            "entry_id": found_entry.entry_id,
-                            "title": found_entry.title,
-                            "plant_info": dict(plant_info),
-                            "options": dict(found_entry.options),
-                            "export_timestamp": datetime.now().isoformat()
-                        }
+                    # Add sensor data if requested
+                    if include_sensor_data:
+                        sensors = hass.data[DOMAIN][found_entry.entry_id].get(ATTR_SENSORS, [])
+                        sensor_entities = []
                         
-                        # Add sensor data if requested
-                        if include_sensor_data:
-                            sensors = hass.data[DOMAIN][found_entry.entry_id].get(ATTR_SENSORS, [])
-                            sensor_entities = []
-                            
-                            for sensor in sensors:
-                                if sensor and hasattr(sensor, 'entity_id'):
-                                    sensor_entities.append(sensor.entity_id)
-                            
-                            # Add the plant entity itself
-                            sensor_entities.append(plant_entity_id)
-                            
-                            # Store sensor entity IDs for history export
-                            export_data["sensor_entities"] = sensor_entities
+                        for sensor in sensors:
+                            if sensor and hasattr(sensor, 'entity_id'):
+                                sensor_entities.append(sensor.entity_id)
+                        
+                        # Add the plant entity itself
+                        sensor_entities.append(plant_entity_id)
+                        
+                        # Store sensor entity IDs for history export
+                        export_data["sensor_entities"] = sensor_entities
+                    
+                    # Collect image files if include_images is True
+                    if include_images:
+                        image_files = []
+                        main_image_missing = False
+                        
+                        # 1. Main image from config entry
+                        main_image = plant_info.get(ATTR_ENTITY_PICTURE, "")
+                        if main_image:
+                            if main_image.startswith("/local/images/plants/"):
+                                # Local file - extract filename
+                                filename = main_image.split("/")[-1]
+                                if filename:
+                                    image_files.append(filename)
+                            else:
+                                # Web URL - can't export
+                                main_image_missing = True
+                        
+                        # 2. Additional images from config entry
+                        additional_images = plant_info.get("images", [])
+                        if isinstance(additional_images, list):
+                            image_files.extend(additional_images)
+                        
+                        # Always set main_image_missing flag in export_data
+                        export_data["main_image_missing"] = main_image_missing
                         
-                        # Collect image files if include_images is True
-                        if include_images:
-                            image_files = []
-                            main_image_missing = False
+                        # Check which files actually exist on disk
+                        if image_files:
+                            export_data["image_files"] = image_files
                             
-                            # 1. Main image from config entry
-                            main_image = plant_info.get(ATTR_ENTITY_PICTURE, "")
-                            if main_image:
-                                if main_image.startswith("/local/images/plants/"):
-                                    # Local file - extract filename
-                                    filename = main_image.split("/")[-1]
-                                    if filename:
-                                        image_files.append(filename)
+                            for image_file in image_files:
+                                image_path = os.path.join(download_path, image_file)
+                                if os.path.exists(image_path):
+                                    all_image_files.append((image_path, image_file))
+                                    pass
                                 else:
-                                    # Web URL - can't export
-                                    main_image_missing = True
-                            
-                            # 2. Additional images from config entry
-                            additional_images = plant_info.get("images", [])
-                            if isinstance(additional_images, list):
-                                image_files.extend(additional_images)
-                            
-                            # Always set main_image_missing flag in export_data
-                            export_data["main_image_missing"] = main_image_missing
-                            
-                            # Check which files actually exist on disk
-                            if image_files:
-                                export_data["image_files"] = image_files
-                                
-                                for image_file in image_files:
-                                    image_path = os.path.join(download_path, image_file)
-                                    if os.path.exists(image_path):
-                                        all_image_files.append((image_path, image_file))
-                                        pass
-                                    else:
-                                        _LOGGER.warning(f"Image not found: {image_file} at {image_path}")
-                            
-                            # Add warning if main image is missing
-                            if main_image_missing:
-                                _LOGGER.warning(f"Plant {plant_entity_id}: Main image is web URL, cannot export to ZIP")
+                                    _LOGGER.warning(f"Image not found: {image_file} at {image_path}")
                         
-                        plants_data.append(export_data)
-            
-            # Create export structure
-            export_structure = {
-                "version": "1.0",
-                "export_timestamp": datetime.now().isoformat(),
-                "total_plants": len(plants_data),
-                "include_images": bool(include_images),
-                "include_sensor_data": bool(include_sensor_data),
-                "plants": plants_data
+                        # Add warning if main image is missing
+                        if main_image_missing:
+                            _LOGGER.warning(f"Plant {plant_entity_id}: Main image is web URL, cannot export to ZIP")
+                    
+                    plants_data.append(export_data)
+        
+        # Bilder inhaltsadressiert: jede Datei nur einmal im Archiv, Pflanzen referenzieren sie
+        image_blobs = {}
+        if include_images and all_image_files:
+            image_blobs = await hass.async_add_executor_job(content_names, all_image_files)
+        image_paths = {}
+        for image_path, image_file in all_image_files:
+            if image_file in image_blobs:
+                image_paths.setdefault(image_blobs[image_file], image_path)
+        
+        # Inkrementeller Export: nur Änderungen seit dem letzten Export schreiben
+        watermarks = None
+        if incremental:
+            watermarks = ExportWatermarks(hass)
+            await watermarks.async_load()
+            exported_blobs = set()
+            for plant_data in plants_data:
+                watermark = watermarks.get(plant_data["entry_id"])
+                plant_data["config_changed"] = config_fingerprint(
+                    plant_data["plant_info"], plant_data["options"]
+                ) != watermark.get("config_hash")
+                exported_blobs.update(watermark.get("image_blobs", []))
+            # Bereits exportierte Bildinhalte nicht erneut schreiben
+            image_paths = {
+                image_blob: image_path
+                for image_blob, image_path in image_paths.items()
+                if image_blob not in exported_blobs
             }
-            
-            # Get sensor history data first if requested
-            sensor_csv_data = {}
+        
+        plants_export = []
+        for plant_data in plants_data:
+            image_refs = {
+                image_file: image_blobs[image_file]
+                for image_file in plant_data.get("image_files", [])
+                if image_blobs.get(image_file) in image_paths
+            }
+            if plant_data.get("config_changed") is False:
+                # Unveränderte Pflanze: nur Verweis (und neue Bildinhalte)
+                plant_export = {
+                    "entry_id": plant_data["entry_id"],
+                    "title": plant_data["title"],
+                    "config_changed": False,
+                }
+            else:
+                plant_export = dict(plant_data)
+            if image_refs:
+                plant_export["image_refs"] = image_refs
+            plants_export.append(plant_export)
+        
+        # Create export structure
+        export_structure = {
+            "version": "1.1",
+            "image_store": "sha256",
+            "export_type": "delta" if incremental else "full",
+            "export_timestamp": datetime.now().isoformat(),
+            "total_plants": len(plants_data),
+            "include_images": bool(include_images),
+            "include_sensor_data": bool(include_sensor_data),
+            "sensor_data_format": sensor_data_format,
+            "plants": plants_export
+        }
+        
+        # Create ZIP file with configuration and images
+        def create_zip():
+            zipf = zipfile.ZipFile(file_path, 'w', zipfile.ZIP_DEFLATED)
+            try:
+                # Always include the JSON configuration
+                zipf.writestr("plants_config.json", json.dumps(export_structure, indent=2, ensure_ascii=False))
+                
+                # Add images if requested and found
+                if include_images:
+                    for image_blob, image_path in image_paths.items():
+                        zipf.write(image_path, f"{IMAGE_DIR}{image_blob}")
+            except Exception:
+                zipf.close()
+                raise
+            return zipf
+        
+        if job is not None:
+            job.async_add_total(1)
+            job.archive_started = True
+        zipf = await async_run_executor_job(hass, create_zip)
+        if job is not None:
+            job.async_advance()
+        exported_sensor_files = 0
+        complete_history = set()
+        try:
+            # Sensor history is streamed into the archive page by page
             if include_sensor_data:
                 from datetime import timedelta
                 end_time = datetime.now()
@@ -1412,109 +1547,138 @@ async def async_setup_services(hass: HomeAssistant) -> None:
                 else:
                     # Get all available history (last 365 days max)
                     start_time = end_time - timedelta(days=365)
-                
+                # Ältere Tage optional als Stundenmittel aus den Langzeitstatistiken
+                raw_start_time = start_time
+                if raw_data_days is not None:
+                    raw_start_time = max(start_time, end_time - timedelta(days=raw_data_days))
+
+                # Pflanzen nach dem Stand ihres letzten Exports gruppieren
+                history_files_since = {}
+                suffix = SENSOR_DATA_SUFFIXES[sensor_data_format]
                 for plant_data in plants_data:
-                    if "sensor_entities" in plant_data:
-                        plant_name = plant_data["title"].replace(" ", "_").lower()
-                        
-                        for entity_id in plant_data["sensor_entities"]:
-                            try:
-                                # Get history for this sensor
-                                recorder = get_instance(hass)
-                                history_data = await recorder.async_add_executor_job(
-                                    history.state_changes_during_period,
-                                    hass,
-                                    start_time,
-                                    end_time,
-                                    entity_id
-                                )
-                                
-                                if entity_id in history_data and history_data[entity_id]:
-                                    # Create CSV content
-                                    csv_content = "timestamp,state,unit\n"
-                                    data_count = 0
-                                    
-                                    for state in history_data[entity_id]:
-                                        if state.state not in ("unknown", "unavailable"):
-                                            timestamp = state.last_changed.isoformat()
-                                            unit = state.attributes.get("unit_of_measurement", "")
-                                            # Fix encoding issues with degree symbol
-                                            unit = unit.replace("°", "deg") if unit else ""
-                                            csv_content += f"{timestamp},{state.state},{unit}\n"
-                                            data_count += 1
-                                    
-                                    # Only create file if we have actual data
-                                    if data_count > 0:
-                                        sensor_name = entity_id.replace(".", "_")
-                                        csv_filename = f"sensor_data/{plant_name}_{sensor_name}.csv"
-                                        sensor_csv_data[csv_filename] = csv_content
-                                        _LOGGER.info(f"Exported {data_count} history entries for {entity_id}")
-                                    else:
-                                        _LOGGER.warning(f"No valid history data found for {entity_id}")
-                                else:
-                                    _LOGGER.warning(f"No history data returned for {entity_id}")
-                                    
-                            except Exception as e:
-                                _LOGGER.warning(f"Could not export history for {entity_id}: {e}")
-            
-            # Create ZIP file with everything
-            def create_zip():
-                with zipfile.ZipFile(file_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                    # Always include the JSON configuration
-                    zipf.writestr("plants_config.json", json.dumps(export_structure, indent=2, ensure_ascii=False))
-                    
-                    # Add images if requested and found
-                    if include_images:
-                        for image_path, image_filename in all_image_files:
-                            zipf.write(image_path, f"images/{image_filename}")
-                    
-                    # Add sensor history CSV files
-                    for csv_filename, csv_content in sensor_csv_data.items():
-                        zipf.writestr(csv_filename, csv_content)
-            
-            await hass.async_add_executor_job(create_zip)
-            
-            
-            # Collect response data
-            response_data = {
-                "exported_plants": len(plants_data),
-                "file_path": file_path
-            }
-            
-            # Add image info if requested
-            if include_images:
-                response_data["exported_images"] = len(all_image_files)
-                
-                # Only add missing main images warning if there actually are missing ones
-                missing_main_images = []
-                for plant_data in plants_data:
-                    if plant_data.get("main_image_missing", False):
-                        missing_main_images.append(plant_data.get("title", "Unknown"))
-                
-                if missing_main_images:
-                    response_data["missing_main_images"] = missing_main_images
-            
-            # Add sensor data info if requested
-            if include_sensor_data:
-                response_data["exported_sensor_files"] = len(sensor_csv_data)
-                if sensor_data_days:
-                    response_data["sensor_data_days"] = sensor_data_days
-                else:
-                    response_data["sensor_data_days"] = "all_available"
+                    since = None
+                    if watermarks is not None:
+                        since = watermarks.get(plant_data["entry_id"]).get("history_until")
+                        if since is not None and since <= start_time.timestamp():
+                            since = None
+                    history_files = history_files_since.setdefault(since, {})
+                    plant_name = plant_data["title"].replace(" ", "_").lower()
+                    for entity_id in plant_data.get("sensor_entities", []):
+                        sensor_name = entity_id.replace(".", "_")
+                        history_files[entity_id] = f"sensor_data/{plant_name}_{sensor_name}{suffix}"
+
+                for since, history_files in history_files_since.items():
+                    history_start = start_time if since is None else datetime.fromtimestamp(since)
+                    exported, complete = await _async_export_history(
+                        zipf,
+                        history_files,
+                        history_start,
+                        max(raw_start_time, history_start),
+                        end_time,
+                        job,
+                        sensor_data_format,
+                        since,
+                    )
+                    exported_sensor_files += exported
+                    complete_history.update(complete)
+        finally:
+            await async_run_executor_job(hass, zipf.close)
+
+        if watermarks is not None:
+            for plant_data in plants_data:
+                watermark = {
+                    "config_hash": config_fingerprint(
+                        plant_data["plant_info"], plant_data["options"]
+                    )
+                }
+                if include_images:
+                    # Inhalte statt Dateinamen, ein neues Bild unter altem Namen wird exportiert
+                    watermark["image_blobs"] = sorted(
+                        set(watermarks.get(plant_data["entry_id"]).get("image_blobs", []))
+                        | {
+                            image_blobs[image_file]
+                            for image_file in plant_data.get("image_files", [])
+                            if image_file in image_blobs
+                        }
+                    )
+                if include_sensor_data and complete_history.issuperset(
+                    plant_data.get("sensor_entities", [])
+                ):
+                    # Nach einem Fehler bleibt der alte Stand, der nächste Delta holt ihn nach
+                    watermark["history_until"] = end_time.timestamp()
+                watermarks.update(plant_data["entry_id"], **watermark)
+            await watermarks.async_save()
+        
+        
+        # Collect response data
+        response_data = {
+            "exported_plants": len(plants_data),
+            "file_path": file_path
+        }
+        if incremental:
+            response_data["export_type"] = "delta"
+            response_data["changed_plants"] = sum(
+                1 for plant_data in plants_data if plant_data["config_changed"]
+            )
+        
+        # Add image info if requested
+        if include_images:
+            response_data["exported_images"] = len(image_paths)
             
-            return response_data
+            # Only add missing main images warning if there actually are missing ones
+            missing_main_images = []
+            for plant_data in plants_data:
+                if plant_data.get("main_image_missing", False):
+                    missing_main_images.append(plant_data.get("title", "Unknown"))
             
-        except Exception as e:
-            _LOGGER.error(f"Error exporting plants: {e}")
-            raise HomeAssistantError(f"Error exporting plants: {e}")
+            if missing_main_images:
+                response_data["missing_main_images"] = missing_main_images
+        
+        # Add sensor data info if requested
+        if include_sensor_data:
+            response_data["exported_sensor_files"] = exported_sensor_files
+            if sensor_data_days:
+                response_data["sensor_data_days"] = sensor_data_days
+            else:
+                response_data["sensor_data_days"] = "all_available"
+            if raw_data_days is not None:
+                response_data["raw_data_days"] = raw_data_days
+            response_data["sensor_data_format"] = sensor_data_format
+        
+        return response_data
 
     async def import_plants(call: ServiceCall) -> ServiceResponse:
-        """Import plant configurations from a ZIP archive."""
-        file_path = call.data.get("file_path")
+        """Import plant configurations from a ZIP archive and optional delta archives."""
         new_plant_name = call.data.get("new_plant_name")
-        overwrite_existing = call.data.get("overwrite_existing")
         include_images = call.data.get("include_images")
-        
+        include_sensor_data = call.data.get("include_sensor_data")
+
+        response_data = await _async_import_archive(
+            call.data.get("file_path"),
+            new_plant_name,
+            call.data.get("overwrite_existing"),
+            include_images,
+            include_sensor_data,
+        )
+        delta_files = call.data.get("delta_files", [])
+        if delta_files:
+            # Deltas der Reihe nach anwenden, geänderte Pflanzen werden überschrieben
+            response_data["deltas"] = [
+                await _async_import_archive(
+                    delta_file, new_plant_name, True, include_images, include_sensor_data
+                )
+                for delta_file in delta_files
+            ]
+        return response_data
+
+    async def _async_import_archive(
+        file_path: str,
+        new_plant_name: str | None,
+        overwrite_existing: bool | None,
+        include_images: bool | None,
+        include_sensor_data: bool | None,
+    ) -> dict:
+        """Import one full or delta export archive."""
         try:
             # Handle ZIP file import
             def read_zip_import():
@@ -1528,10 +1692,22 @@ async def async_setup_services(hass: HomeAssistant) -> None:
                     data = json.loads(json_content)
                     
                     # Extract images if requested and they exist in the ZIP
-                    image_files = [f for f in zipf.namelist() if f.startswith("images/")]
+                    names = set(zipf.namelist())
+                    image_members = {}  # filename -> archive member
+                    if "image_store" in data:
+                        for plant_data in data.get("plants", []):
+                            for image_file, image_blob in plant_data.get("image_refs", {}).items():
+                                if f"{IMAGE_DIR}{image_blob}" in names:
+                                    image_members[image_file] = f"{IMAGE_DIR}{image_blob}"
+                    else:
+                        # Archive vor 1.1: Bilder unter ihrem Dateinamen
+                        for name in names:
+                            if name.startswith(IMAGE_DIR) and os.path.basename(name):
+                                image_members[os.path.basename(name)] = name
                     extracted_images = {}  # filename -> new_filename mapping
+                    unchanged_images = 0
                     
-                    if include_images and image_files:
+                    if include_images and image_members:
                         # Get the config entry to find the image download path
                         config_entry = next(
                             (entry for entry in hass.config_entries.async_entries(DOMAIN) 
@@ -1543,35 +1719,64 @@ async def async_setup_services(hass: HomeAssistant) -> None:
                         # Ensure download directory exists
                         os.makedirs(download_path, exist_ok=True)
                         
-                        # Extract all image files
-                        for image_file in image_files:
-                            # Get just the filename without the 'images/' prefix
-                            original_filename = os.path.basename(image_file)
-                            target_path = os.path.join(download_path, original_filename)
-                            
-                            # Extract the image
-                            with zipf.open(image_file) as source, open(target_path, "wb") as target:
-                                shutil.copyfileobj(source, target)
-                            
-                            extracted_images[original_filename] = original_filename
+                        # Extract the images, byte-identical files on disk are kept
+                        extractor = ImageExtractor(zipf, download_path)
+                        for original_filename, member in image_members.items():
+                            if extractor.extract(member, original_filename):
+                                extracted_images[original_filename] = original_filename
+                            else:
+                                unchanged_images += 1
                     
-                    return data, extracted_images
+                    # Load the sensor history files (CSV or columnar) if requested
+                    sensor_data = {}
+                    if include_sensor_data:
+                        for name in zipf.namelist():
+                            if not name.startswith("sensor_data/"):
+                                continue
+                            try:
+                                history = read_history_file(name, zipf.read(name))
+                            except ValueError as e:
+                                _LOGGER.warning(f"Could not read sensor data {name}: {e}")
+                                continue
+                            summary = {"samples": len(history.timestamps), "unit": history.unit}
+                            if history.timestamps:
+                                summary["first"] = datetime.fromtimestamp(history.timestamps[0] / 1000, timezone.utc).isoformat()
+                                summary["last"] = datetime.fromtimestamp(history.timestamps[-1] / 1000, timezone.utc).isoformat()
+                            sensor_data[os.path.basename(name)] = summary
+                    
+                    return data, extracted_images, unchanged_images, sensor_data
             
-            import_data, extracted_images = await hass.async_add_executor_job(read_zip_import)
+            import_data, extracted_images, unchanged_images, sensor_data = await hass.async_add_executor_job(read_zip_import)
             
             if not import_data.get("plants"):
                 raise HomeAssistantError("No plants found in import file")
             
+            # Erst das ganze Archiv prüfen, bevor etwas angelegt wird
+            invalid = validate_import(import_data["plants"], new_plant_name)
+            if invalid:
+                raise HomeAssistantError(f"Invalid import file: {'; '.join(invalid)}")
+            
+            existing_entries = {}
+            for entry in hass.config_entries.async_entries(DOMAIN):
+                entry_info = entry.data.get(FLOW_PLANT_INFO, {})
+                if entry_info.get(ATTR_DEVICE_TYPE, DEVICE_TYPE_PLANT) == DEVICE_TYPE_PLANT:
+                    existing_entries.setdefault(entry_info.get(ATTR_NAME), entry)
+            
             imported_count = 0
             skipped_count = 0
+            unchanged_count = 0
             errors = []
+            pending = []  # (plant_name, existing_entry, plant_info, options)
             
             for plant_data in import_data["plants"]:
+                if plant_data.get("config_changed") is False:
+                    # Delta-Export: Konfiguration seit dem letzten Export unverändert
+                    unchanged_count += 1
+                    continue
+                plant_info = dict(plant_data["plant_info"])
+                original_name = plant_info[ATTR_NAME]
+                plant_name = new_plant_name if new_plant_name else original_name
                 try:
-                    plant_info = plant_data.get("plant_info", {})
-                    original_name = plant_info.get(ATTR_NAME, "Unknown")
-                    plant_name = new_plant_name if new_plant_name else original_name
-                    
                     # Update plant name in plant_info if new name provided
                     if new_plant_name:
                         plant_info = dict(plant_info)  # Create copy
@@ -1591,7 +1796,10 @@ async def async_setup_services(hass: HomeAssistant) -> None:
                             if "images" in plant_info and isinstance(plant_info["images"], list):
                                 new_images = []
                                 for old_image in plant_info["images"]:
-                                    if old_image in extracted_images:
+                                    if old_image in extracted_images and extracted_images[old_image] != old_image:
+                                        # Already renamed for another plant of this archive
+                                        new_images.append(extracted_images[old_image])
+                                    elif old_image in extracted_images:
                                         # Extract plant name from filename (format: plant.plant_name_timestamp.ext)
                                         if old_image.startswith("plant."):
                                             # Remove "plant." prefix
@@ -1629,30 +1837,45 @@ async def async_setup_services(hass: HomeAssistant) -> None:
                                 
                                 plant_info["images"] = new_images
                     
-                    # Check if plant already exists
-                    existing_entry = None
-                    for entry in hass.config_entries.async_entries(DOMAIN):
-                        if (entry.data.get(FLOW_PLANT_INFO, {}).get(ATTR_NAME) == plant_name and 
-                            entry.data.get(FLOW_PLANT_INFO, {}).get(ATTR_DEVICE_TYPE, DEVICE_TYPE_PLANT) == DEVICE_TYPE_PLANT):
-                            existing_entry = entry
-                            break
+                    existing_entry = existing_entries.get(plant_name)
                     
                     if existing_entry and not overwrite_existing:
                         _LOGGER.info(f"Skipping existing plant: {plant_name}")
                         skipped_count += 1
                         continue
                     
-                    # Prepare the import data
+                    pending.append((plant_name, existing_entry, plant_info, plant_data.get("options", {})))
+                    
+                except Exception as e:
+                    error_msg = f"Error importing plant {plant_name}: {e}"
+                    _LOGGER.error(error_msg)
+                    errors.append(error_msg)
+            
+            # IDs aller neuen Pflanzen mit einem Speichervorgang reservieren
+            id_key = f"{DEVICE_TYPE_PLANT}_id"
+            without_id = [
+                plant_info
+                for _, existing_entry, plant_info, _ in pending
+                if existing_entry is None and id_key not in plant_info
+            ]
+            for plant_info, plant_id in zip(
+                without_id, await async_reserve_ids(hass, DEVICE_TYPE_PLANT, len(without_id))
+            ):
+                plant_info[id_key] = plant_id
+            
+            semaphore = asyncio.Semaphore(IMPORT_SETUP_CONCURRENCY)
+            
+            async def _async_apply(plant_name, existing_entry, plant_info, options):
+                async with semaphore:
                     import_config = {
                         FLOW_PLANT_INFO: plant_info
                     }
-                    
-                    if existing_entry and overwrite_existing:
+                    if existing_entry:
                         # Update existing entry
                         hass.config_entries.async_update_entry(
                             existing_entry,
                             data=import_config,
-                            options=plant_data.get("options", {})
+                            options=options
                         )
                         await hass.config_entries.async_reload(existing_entry.entry_id)
                         _LOGGER.info(f"Updated existing plant: {plant_name}")
@@ -1664,13 +1887,25 @@ async def async_setup_services(hass: HomeAssistant) -> None:
                             data=import_config
                         )
                         _LOGGER.info(f"Imported new plant: {plant_name}")
-                    
-                    imported_count += 1
-                    
-                except Exception as e:
-                    error_msg = f"Error importing plant {plant_name}: {e}"
+            
+            # Die Pflanzen werden gleichzeitig angelegt und eingerichtet
+            results = await asyncio.gather(
+                *(_async_apply(*item) for item in pending), return_exceptions=True
+            )
+            for (plant_name, *_), result in zip(pending, results):
+                if isinstance(result, BaseException):
+                    error_msg = f"Error importing plant {plant_name}: {result}"
                     _LOGGER.error(error_msg)
                     errors.append(error_msg)
+                else:
+                    imported_count += 1
+            
+            # Cycle Selects einmal am Ende aktualisieren
+            if imported_count and DATA_PLANT_REGISTRY in hass.data:
+                for plant in hass.data[DATA_PLANT_REGISTRY].plants(DEVICE_TYPE_PLANT):
+                    if plant.cycle_select:
+                        plant.cycle_select._update_cycle_options()
+                        plant.cycle_select.async_write_ha_state()
             
             # Build response data
             response_data = {
@@ -1681,9 +1916,18 @@ async def async_setup_services(hass: HomeAssistant) -> None:
             if skipped_count > 0:
                 response_data["skipped_plants"] = skipped_count
             
+            if unchanged_count > 0:
+                response_data["unchanged_plants"] = unchanged_count
+            
             if include_images and extracted_images:
                 response_data["imported_images"] = len(extracted_images)
             
+            if include_images and unchanged_images:
+                response_data["unchanged_images"] = unchanged_images
+            
+            if include_sensor_data:
+                response_data["sensor_data"] = sensor_data
+            
             if errors:
                 response_data["errors"] = errors
             
@@ -19,6 +19,7 @@ from .const import (
     DOMAIN,
     DEVICE_TYPE_PLANT,
     DEVICE_TYPE_CYCLE,
+    DATA_PLANT_REGISTRY,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -186,13 +187,8 @@ class PlantLocation(TextEntity, RestoreEntity):
         
         # Durchlaufe alle Member-Plants
         for plant_id in self._plant._member_plants:
-            plant = None
             # Suche die Plant Entity
-            for entry_id in self._hass.data[DOMAIN]:
-                if ATTR_PLANT in self._hass.data[DOMAIN][entry_id]:
-                    if self._hass.data[DOMAIN][entry_id][ATTR_PLANT].entity_id == plant_id:
-                        plant = self._hass.data[DOMAIN][entry_id][ATTR_PLANT]
-                        break
+            plant = self._hass.data[DATA_PLANT_REGISTRY].get_by_entity_id(plant_id)
                         
             if not plant:
                 continue
@@ -226,13 +222,8 @@ class PlantLocation(TextEntity, RestoreEntity):
         
         # Durchlaufe alle Member-Plants
         for plant_id in self._plant._member_plants:
-            plant = None
             # Suche die Plant Entity
-            for entry_id in self._hass.data[DOMAIN]:
-                if ATTR_PLANT in self._hass.data[DOMAIN][entry_id]:
-                    if self._hass.data[DOMAIN][entry_id][ATTR_PLANT].entity_id == plant_id:
-                        plant = self._hass.data[DOMAIN][entry_id][ATTR_PLANT]
-                        break
+            plant = self._hass.data[DATA_PLANT_REGISTRY].get_by_entity_id(plant_id)
                         
             if not plant:
                 continue
@@ -327,20 +318,10 @@ class PlantLocation(TextEntity, RestoreEntity):
                     
                     if self._plant.device_type != DEVICE_TYPE_CYCLE:
                         # Prüfe, ob die Pflanze einem Cycle angehört
-                        if device.via_device_id:
-                            # Suche das Cycle-Device
-                            for dev in device_registry.devices.values():
-                                if dev.id == device.via_device_id:
-                                    # Suche die zugehörige Cycle-Entity
-                                    for entry_id in self._hass.data[DOMAIN]:
-                                        if ATTR_PLANT in self._hass.data[DOMAIN][entry_id]:
-                                            cycle = self._hass.data[DOMAIN][entry_id][ATTR_PLANT]
-                                            if (cycle.device_type == DEVICE_TYPE_CYCLE and
-                                                cycle.unique_id == next(iter(dev.identifiers))[1]):
-                                                from_cycle = True
-                                                cycle_id = cycle.entity_id
-                                                break
-                                    break
+                        cycle = self._hass.data[DATA_PLANT_REGISTRY].get_cycle(self._plant)
+                        if cycle and cycle.device_type == DEVICE_TYPE_CYCLE:
+                            from_cycle = True
+                            cycle_id = cycle.entity_id
                     
                     event_data = {
                         "entity_id": self._plant.entity_id,
@@ -365,29 +346,12 @@ class PlantLocation(TextEntity, RestoreEntity):
             
             # Bei Cycle: Prüfe zusätzlich, ob es sich um ein Member-Plant handelt
             elif self._plant.device_type == DEVICE_TYPE_CYCLE:
-                # Hole Member-Plant IDs
-                for plant_id in self._plant._member_plants:
-                    plant = None
-                    # Suche die Plant Entity
-                    for entry_id in self._hass.data[DOMAIN]:
-                        if ATTR_PLANT in self._hass.data[DOMAIN][entry_id]:
-                            if self._hass.data[DOMAIN][entry_id][ATTR_PLANT].entity_id == plant_id:
-                                plant = self._hass.data[DOMAIN][entry_id][ATTR_PLANT]
-                                break
-                    
-                    if not plant:
-                        continue
-                    
-                    # Hole das Device der Pflanze
-                    plant_device = device_registry.async_get_device(
-                        identifiers={(DOMAIN, plant.unique_id)}
-                    )
-                    
-                    # Prüfe ob es das betroffene Member-Device ist
-                    if plant_device and plant_device.id == event.data.get("device_id"):
-                        # Aktualisiere die Member-Areas
-                        self._hass.async_create_task(self._update_member_areas())
-                        break
+                # Prüfe über den Index, ob das betroffene Device ein Member-Plant ist
+                plant_registry = self._hass.data[DATA_PLANT_REGISTRY]
+                plant = plant_registry.get_by_device_id(event.data.get("device_id"))
+                if plant and plant_registry.get_cycle(plant) is self._plant:
+                    # Aktualisiere die Member-Areas
+                    self._hass.async_create_task(self._update_member_areas())
 
     async def async_set_value(self, value: str) -> None:
         """Set new value."""
@@ -0,0 +1,324 @@
+"""Minimal Home Assistant stand-ins for tests of the HA bound plant modules.
+
+install() registers stub modules for the Home Assistant imports of the
+integration. Timers (async_call_later), state change trackers and stores
+are routed to a FakeHass, so tests can fire them on demand.
+"""
+
+import asyncio
+import copy
+import importlib.util
+import sys
+import types
+from pathlib import Path
+from types import SimpleNamespace
+
+PLANT_DIR = Path(__file__).resolve().parent.parent / "custom_components" / "plant"
+
+
+class FakeTimer:
+    """A pending async_call_later action."""
+
+    def __init__(self, hass, delay, action):
+        self.hass = hass
+        self.delay = delay
+        self.action = action
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+        if self in self.hass.timers:
+            self.hass.timers.remove(self)
+
+
+class FakeConfigEntries:
+    def __init__(self):
+        self.entries = {}
+        self.updates = []
+
+    def async_entries(self, domain=None):
+        return list(self.entries.values())
+
+    def async_get_entry(self, entry_id):
+        return self.entries.get(entry_id)
+
+    def async_update_entry(self, entry, data=None, options=None, **kwargs):
+        if data is not None:
+            entry.data = data
+        if options is not None:
+            entry.options = options
+        self.updates.append(entry)
+        return True
+
+
+class FakeServices:
+    def __init__(self):
+        self.handlers = {}
+
+    def async_register(self, domain, service, handler, schema=None, **kwargs):
+        self.handlers[(domain, service)] = handler
+
+    def async_remove(self, domain, service):
+        self.handlers.pop((domain, service), None)
+
+
+class FakeHass:
+    """The parts of HomeAssistant used by the plant modules."""
+
+    def __init__(self):
+        self.data = {}
+        self.timers = []
+        self.trackers = []
+        self.storage = {}
+        self.saves = {}
+        self.executor_jobs = 0
+        self.config_entries = FakeConfigEntries()
+        self.services = FakeServices()
+        self.states = SimpleNamespace(get=lambda entity_id: None)
+        self.config = SimpleNamespace(path=lambda *parts: "/".join(("/config",) + parts))
+        self.bus = SimpleNamespace(
+            async_listen=lambda *a, **k: (lambda: None),
+            async_listen_once=lambda *a, **k: (lambda: None),
+            async_fire=lambda *a, **k: None,
+        )
+
+    @property
+    def loop(self):
+        return asyncio.get_running_loop()
+
+    async def async_add_executor_job(self, func, *args):
+        self.executor_jobs += 1
+        return func(*args)
+
+    def async_create_task(self, coro, *args, **kwargs):
+        return asyncio.get_running_loop().create_task(coro)
+
+    async_create_background_task = async_create_task
+
+    async def async_fire_timers(self):
+        """Run all pending timers (and the ones they schedule) once."""
+        timers, self.timers = self.timers, []
+        for timer in timers:
+            if timer.cancelled:
+                continue
+            result = timer.action(None)
+            if asyncio.iscoroutine(result):
+                await result
+
+    def fire_state_changed(self, entity_id, new_state=None, old_state=None):
+        """Call the state change trackers of the entity."""
+        event = SimpleNamespace(
+            data={"entity_id": entity_id, "new_state": new_state, "old_state": old_state}
+        )
+        for entity_ids, action in list(self.trackers):
+            if entity_id in entity_ids:
+                action(event)
+
+
+def _async_call_later(hass, delay, action):
+    timer = FakeTimer(hass, delay, action)
+    hass.timers.append(timer)
+    return timer.cancel
+
+
+def _async_track_state_change_event(hass, entity_ids, action):
+    if isinstance(entity_ids, str):
+        entity_ids = [entity_ids]
+    tracker = (set(entity_ids), action)
+    hass.trackers.append(tracker)
+
+    def unsub():
+        if tracker in hass.trackers:
+            hass.trackers.remove(tracker)
+
+    return unsub
+
+
+class FakeStore:
+    """Store keeping its data in hass.storage, yields like the real one."""
+
+    def __init__(self, hass, version, key, *args, **kwargs):
+        self.hass = hass
+        self.key = key
+
+    async def async_load(self):
+        await asyncio.sleep(0)
+        return copy.deepcopy(self.hass.storage.get(self.key))
+
+    async def async_save(self, data):
+        await asyncio.sleep(0)
+        self.hass.storage[self.key] = copy.deepcopy(data)
+        self.hass.saves[self.key] = self.hass.saves.get(self.key, 0) + 1
+
+
+class FakeView:
+    def json(self, result, status_code=200):
+        return SimpleNamespace(body=result, status=status_code)
+
+    def json_message(self, message, status_code=200, message_code=None):
+        return SimpleNamespace(body={"message": message}, status=status_code)
+
+
+class HomeAssistantError(Exception):
+    pass
+
+
+def _module(name, **attrs):
+    module = types.ModuleType(name)
+    module.__path__ = []
+    module.__dict__.update(attrs)
+    sys.modules[name] = module
+    return module
+
+
+def install():
+    """Register the stub modules (replaces stubs of other tests)."""
+    _module("homeassistant")
+    _module(
+        "homeassistant.const",
+        ATTR_ICON="icon",
+        ATTR_ENTITY_PICTURE="entity_picture",
+        ATTR_NAME="name",
+        ATTR_UNIT_OF_MEASUREMENT="unit_of_measurement",
+        STATE_OK="ok",
+        STATE_PROBLEM="problem",
+        STATE_UNAVAILABLE="unavailable",
+        STATE_UNKNOWN="unknown",
+        EVENT_HOMEASSISTANT_STARTED="homeassistant_started",
+        EVENT_HOMEASSISTANT_STOP="homeassistant_stop",
+        Platform=SimpleNamespace(NUMBER="number", SENSOR="sensor", SELECT="select", TEXT="text"),
+    )
+    _module(
+        "homeassistant.core",
+        HomeAssistant=object,
+        State=object,
+        ServiceCall=object,
+        ServiceResponse=object,
+        SupportsResponse=SimpleNamespace(OPTIONAL="optional", ONLY="only"),
+        CALLBACK_TYPE=object,
+        callback=lambda func: func,
+    )
+    _module("homeassistant.exceptions", HomeAssistantError=HomeAssistantError)
+    _module("homeassistant.config_entries", SOURCE_IMPORT="import", ConfigEntry=object)
+    _module("homeassistant.data_entry_flow", FlowResultType=SimpleNamespace(CREATE_ENTRY="create_entry"))
+    helpers = _module("homeassistant.helpers")
+    for name, attrs in {
+        "config_validation": {
+            "string": str,
+            "boolean": bool,
+            "entity_id": str,
+            "entity_ids": list,
+            "ensure_list": list,
+            "positive_int": int,
+            "url": str,
+        },
+        "device_registry": {"async_get": lambda hass: hass.device_registry},
+        "entity_registry": {"async_get": lambda hass: hass.entity_registry},
+        "area_registry": {"async_get": lambda hass: None},
+        "selector": {},
+        "template": {"Template": object},
+        "entity": {
+            "Entity": object,
+            "async_generate_entity_id": lambda fmt, name, current_ids=None, hass=None: fmt.format(name),
+        },
+        "entity_component": {"EntityComponent": object},
+        "entity_platform": {"AddEntitiesCallback": object},
+        "dispatcher": {"async_dispatcher_connect": lambda *a, **k: None},
+        "event": {
+            "async_call_later": _async_call_later,
+            "async_track_state_change_event": _async_track_state_change_event,
+            "async_track_time_interval": lambda *a, **k: (lambda: None),
+        },
+        "storage": {"Store": FakeStore},
+    }.items():
+        setattr(helpers, name, _module(f"homeassistant.helpers.{name}", **attrs))
+    components = _module("homeassistant.components")
+    components.websocket_api = _module(
+        "homeassistant.components.websocket_api",
+        websocket_command=lambda *a, **k: (lambda func: func),
+        async_response=lambda func: func,
+        async_register_command=lambda *a, **k: None,
+        event_message=lambda msg_id, event: {"id": msg_id, "type": "event", "event": event},
+        ActiveConnection=object,
+    )
+    _module("homeassistant.components.http", HomeAssistantView=FakeView)
+    recorder = _module(
+        "homeassistant.components.recorder",
+        get_instance=lambda hass: hass,
+        history=_module("homeassistant.components.recorder.history"),
+        statistics=_module("homeassistant.components.recorder.statistics"),
+    )
+    components.recorder = recorder
+    _module("homeassistant.components.utility_meter")
+    _module("homeassistant.components.utility_meter.const", DATA_TARIFF_SENSORS="tariffs", DATA_UTILITY="utility")
+    _module("homeassistant.components.utility_meter.sensor", UtilityMeterSensor=object)
+    _module("homeassistant.components.integration")
+    _module("homeassistant.components.integration.const", METHOD_TRAPEZOIDAL="trapezoidal")
+    _module("homeassistant.components.integration.sensor", IntegrationSensor=object)
+    _module("homeassistant.util")
+    _module("homeassistant.util.dt")
+    if not _is_installed("voluptuous"):
+        _module(
+            "voluptuous",
+            Schema=lambda schema, **k: schema,
+            Required=lambda key, **k: key,
+            Optional=lambda key, **k: key,
+            In=lambda values: values,
+            Coerce=lambda typ: typ,
+            All=lambda *validators: validators[0],
+            Any=lambda *validators: validators[0],
+            Range=lambda **k: None,
+        )
+    if not _is_installed("aiohttp"):
+        _module("aiohttp", ClientSession=object)
+
+
+def _is_installed(name):
+    """Return True if the real package can be imported (not a stub of a test)."""
+    module = sys.modules.get(name)
+    if module is not None and getattr(module, "__file__", None):
+        return True
+    sys.modules.pop(name, None)
+    return importlib.util.find_spec(name) is not None
+
+
+def _forget_plant_modules():
+    for key in [key for key in sys.modules if key.startswith("custom_components.plant")]:
+        del sys.modules[key]
+
+
+def load_plant(name=None):
+    """Load custom_components.plant (name=None) or one of its submodules.
+
+    Submodules are loaded without running the package __init__. All modules
+    of the package are loaded fresh so they bind the current stubs, and are
+    removed from sys.modules again so other tests load their own.
+    """
+    install()
+    _forget_plant_modules()
+    if "custom_components" not in sys.modules:
+        _module("custom_components").__path__ = [str(PLANT_DIR.parent)]
+    if name is None:
+        _module(
+            "custom_components.plant.services",
+            async_setup_services=lambda hass: None,
+            async_unload_services=lambda hass: None,
+        )
+        spec = importlib.util.spec_from_file_location(
+            "custom_components.plant",
+            PLANT_DIR / "__init__.py",
+            submodule_search_locations=[str(PLANT_DIR)],
+        )
+    else:
+        package = _module("custom_components.plant")
+        package.__path__ = [str(PLANT_DIR)]
+        spec = importlib.util.spec_from_file_location(
+            f"custom_components.plant.{name}", PLANT_DIR / f"{name}.py"
+        )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        _forget_plant_modules()
+    return module
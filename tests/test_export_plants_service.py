@@ -0,0 +1,81 @@
+import asyncio
+import sys
+import zipfile
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from ha_stubs import FakeHass, load_plant
+
+
+def _setup(mod):
+    hass = FakeHass()
+    plants = {}
+    hass.data[mod.DOMAIN] = {}
+    for name in ("a", "b"):
+        entry = SimpleNamespace(
+            entry_id=f"entry_{name}",
+            title=f"Plant {name.upper()}",
+            data={mod.FLOW_PLANT_INFO: {mod.ATTR_NAME: f"Plant {name.upper()}"}},
+            options={},
+        )
+        hass.config_entries.entries[entry.entry_id] = entry
+        hass.data[mod.DOMAIN][entry.entry_id] = {
+            mod.ATTR_SENSORS: [SimpleNamespace(entity_id=f"sensor.{name}_moisture")]
+        }
+        plants[f"plant.{name}"] = SimpleNamespace(unique_id=entry.entry_id)
+    hass.data[mod.DATA_PLANT_REGISTRY] = SimpleNamespace(get_by_entity_id=plants.get)
+    return hass
+
+
+def test_failed_history_group_keeps_its_watermark(tmp_path):
+    mod = load_plant("services")
+    # Je Pflanze eine Gruppe (Sensor und Pflanze selbst)
+    mod.HISTORY_BATCH_SIZE = 2
+    hass = _setup(mod)
+    now = datetime.now()
+
+    def get_significant_states(hass_, start, end, entity_ids, **kwargs):
+        if "sensor.b_moisture" in entity_ids:
+            raise RuntimeError("recorder down")
+        state = SimpleNamespace(
+            state="42", last_changed=now - timedelta(hours=1), attributes={}
+        )
+        state.last_updated = state.last_changed
+        return {entity_id: [state] for entity_id in entity_ids}
+
+    sys.modules["homeassistant.components.recorder.history"].get_significant_states = (
+        get_significant_states
+    )
+    file_path = str(tmp_path / "export.zip")
+
+    async def run():
+        await mod.async_setup_services(hass)
+        export_plants = hass.services.handlers[(mod.DOMAIN, mod.SERVICE_EXPORT_PLANTS)]
+        task = asyncio.ensure_future(
+            export_plants(
+                SimpleNamespace(
+                    data={
+                        "plant_entities": ["plant.a", "plant.b"],
+                        "file_path": file_path,
+                        "include_sensor_data": True,
+                        "sensor_data_days": 1,
+                        "incremental": True,
+                    }
+                )
+            )
+        )
+        while not task.done():
+            await asyncio.sleep(0)
+            await hass.async_fire_timers()
+        return task.result()
+
+    result = asyncio.run(run())
+
+    assert result["exported_plants"] == 2
+    with zipfile.ZipFile(file_path) as zipf:
+        assert "sensor_data/plant_a_sensor_a_moisture.csv" in zipf.namelist()
+    watermarks = hass.storage["plant_export_watermarks"]["plants"]
+    assert watermarks["entry_a"]["history_until"] > (now - timedelta(minutes=1)).timestamp()
+    # Der fehlende Zeitraum wird beim nächsten Delta erneut exportiert
+    assert "history_until" not in watermarks["entry_b"]
+    assert "config_hash" in watermarks["entry_b"]
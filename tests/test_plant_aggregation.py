@@ -0,0 +1,189 @@
+import asyncio
+import random
+import statistics
+from types import SimpleNamespace
+
+from ha_stubs import FakeHass, load_plant
+
+
+def _load_plant_aggregation_module():
+    # Relativer Import der Konstanten, daher als Teil des Pakets laden
+    return load_plant("plant_aggregation")
+
+
+def test_empty_aggregator():
+    mod = _load_plant_aggregation_module()
+    aggregator = mod.MemberAggregator()
+
+    assert len(aggregator) == 0
+    assert not aggregator
+    for method in ("mean", "median", "min", "max"):
+        assert aggregator.aggregate(method) is None
+
+
+def test_update_and_remove_by_member():
+    mod = _load_plant_aggregation_module()
+    aggregator = mod.MemberAggregator()
+
+    assert aggregator.update("plant.a", 20.0)
+    assert aggregator.update("plant.b", 24.0)
+    assert aggregator.update("plant.c", 22.0)
+    assert not aggregator.update("plant.c", 22.0)
+    assert aggregator.median == 22.0
+    assert aggregator.mean == 22.0
+
+    # Wert einer Member Plant ändert sich
+    assert aggregator.update("plant.a", 30.0)
+    assert aggregator.min == 22.0
+    assert aggregator.max == 30.0
+    assert aggregator.median == 24.0
+
+    # Gerade Anzahl: Mittelwert der beiden mittleren Werte
+    assert aggregator.remove("plant.b")
+    assert not aggregator.remove("plant.b")
+    assert aggregator.median == 26.0
+
+    # Ungültiger Wert entfernt die Member Plant
+    assert aggregator.update("plant.c", float("nan"))
+    assert aggregator.update("plant.a", None)
+    assert len(aggregator) == 0
+    assert aggregator.mean is None
+
+
+def test_aggregate_methods_and_retain():
+    mod = _load_plant_aggregation_module()
+    aggregator = mod.MemberAggregator()
+    for member, value in (("a", 5), ("b", 1), ("c", 3), ("d", 9)):
+        aggregator.update(member, value)
+
+    assert aggregator.aggregate("mean") == 4.5
+    assert aggregator.aggregate("min") == 1
+    assert aggregator.aggregate("max") == 9
+    assert aggregator.aggregate("median") == 4.0
+    # Unbekannte Methoden (z.B. original) werden als Median berechnet
+    assert aggregator.aggregate("original") == 4.0
+
+    aggregator.retain(["a", "c"])
+    assert "b" not in aggregator
+    assert aggregator.aggregate("median") == 4.0
+    assert aggregator.aggregate("max") == 5
+
+
+def test_matches_sort_based_aggregation():
+    mod = _load_plant_aggregation_module()
+    aggregator = mod.MemberAggregator()
+    values = {}
+    rng = random.Random(42)
+
+    for _ in range(2000):
+        member = f"plant.{rng.randrange(250)}"
+        if rng.random() < 0.1:
+            aggregator.remove(member)
+            values.pop(member, None)
+        else:
+            value = round(rng.uniform(-10, 40), 1)
+            aggregator.update(member, value)
+            values[member] = value
+
+    assert len(aggregator) == len(values)
+    assert aggregator.median == statistics.median(values.values())
+    assert aggregator.min == min(values.values())
+    assert aggregator.max == max(values.values())
+    assert abs(aggregator.mean - statistics.mean(values.values())) < 1e-9
+
+
+def _cycle_setup():
+    init = load_plant()
+    hass = FakeHass()
+    hass.data[init.DOMAIN] = {}
+    registry = init.PlantRegistry()
+    hass.data[init.DATA_PLANT_REGISTRY] = registry
+
+    class Device(init.PlantDevice):
+        growth_phase_select = None
+        _attr_state = None
+        writes = 0
+
+        def async_write_ha_state(self):
+            self.writes += 1
+
+    def add(name, device_type, moisture=None):
+        entry = SimpleNamespace(
+            entry_id=f"entry_{name}",
+            data={init.FLOW_PLANT_INFO: {init.ATTR_NAME: name, init.ATTR_DEVICE_TYPE: device_type}},
+            options={},
+        )
+        device = Device(hass, entry)
+        device.hass = hass
+        device.plant_complete = True
+        if moisture is not None:
+            device.sensor_moisture = SimpleNamespace(
+                entity_id=f"sensor.{name}_moisture", state=moisture
+            )
+        registry.register(entry.entry_id, device)
+        return device
+
+    cycle = add("grow", init.DEVICE_TYPE_CYCLE)
+    members = [add(name, init.DEVICE_TYPE_PLANT, value) for name, value in (("a", "30"), ("b", "50"))]
+    median = SimpleNamespace(_sensor_type="moisture", hass=hass, writes=0)
+    median.async_write_ha_state = lambda: setattr(median, "writes", median.writes + 1)
+    cycle.add_median_sensors([median])
+    return init, hass, cycle, members, median
+
+
+def test_cycle_coalesces_member_changes_into_one_update():
+    init, hass, cycle, (a, b), median = _cycle_setup()
+
+    async def run():
+        for member in (a, b):
+            cycle.add_member_plant(member.entity_id)
+        assert len(hass.timers) == 1
+        await hass.async_fire_timers()
+        assert cycle._median_sensors["moisture"] == 40
+        assert median.writes == 1
+
+        # Mehrere Änderungen innerhalb der Verzögerung ergeben ein Update
+        computed = []
+        compute = cycle._compute_median_values
+        cycle._compute_median_values = lambda: computed.append(1) or compute()
+        hass.fire_state_changed("sensor.a_moisture", SimpleNamespace(state="36"))
+        hass.fire_state_changed("sensor.b_moisture", SimpleNamespace(state="60"))
+        hass.fire_state_changed("sensor.a_moisture", SimpleNamespace(state="40"))
+        assert [timer.delay for timer in hass.timers] == [init.CYCLE_MEDIAN_UPDATE_DELAY]
+        await hass.async_fire_timers()
+        assert computed == [1]
+
+    asyncio.run(run())
+
+    assert cycle._median_sensors["moisture"] == 50
+    assert median.writes == 2
+    assert hass.timers == []
+
+
+def test_cycle_untracks_sensors_of_removed_members():
+    init, hass, cycle, (a, b), median = _cycle_setup()
+
+    async def run():
+        for member in (a, b):
+            cycle.add_member_plant(member.entity_id)
+        await hass.async_fire_timers()
+        assert [ids for ids, _ in hass.trackers] == [{"sensor.a_moisture", "sensor.b_moisture"}]
+
+        cycle.remove_member_plant(b.entity_id)
+        await hass.async_fire_timers()
+        assert [ids for ids, _ in hass.trackers] == [{"sensor.a_moisture"}]
+        assert cycle._median_sensors["moisture"] == 30
+
+        # Der entfernte Member löst kein Update mehr aus
+        hass.fire_state_changed("sensor.b_moisture", SimpleNamespace(state="90"))
+        assert hass.timers == []
+
+        cycle.remove_member_plant(a.entity_id)
+        await hass.async_fire_timers()
+        assert hass.trackers == []
+
+        await cycle.async_will_remove_from_hass()
+
+    asyncio.run(run())
+
+    assert cycle._median_unsub is None
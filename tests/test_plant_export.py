@@ -0,0 +1,272 @@
+import importlib.machinery
+import importlib.util
+import io
+import sys
+import zipfile
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+
+def _load_plant_export_module():
+    path = Path("custom_components/plant/plant_export.py").resolve()
+    name = "plant_export_testmod"
+    loader = importlib.machinery.SourceFileLoader(name, str(path))
+    spec = importlib.util.spec_from_loader(loader.name, loader)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+START = datetime(2025, 6, 1, tzinfo=timezone.utc)
+
+
+def _state(minutes, state, unit="°C"):
+    when = START + timedelta(minutes=minutes)
+    return SimpleNamespace(
+        state=state,
+        last_changed=when,
+        last_updated=when,
+        attributes={"unit_of_measurement": unit} if unit else {},
+    )
+
+
+def _archive_with(write):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as zipf:
+        counts = write(zipf)
+    return zipfile.ZipFile(buffer), counts
+
+
+def test_history_writer_matches_csv_format():
+    mod = _load_plant_export_module()
+
+    def write(zipf):
+        writer = mod.HistoryArchiveWriter(zipf)
+        writer.begin({"sensor.temp": "sensor_data/a_sensor_temp.csv"})
+        writer.write_states(
+            "sensor.temp",
+            [_state(0, "21.5"), _state(5, "unavailable"), _state(10, "22.0")],
+        )
+        return writer.finish()
+
+    archive, counts = _archive_with(write)
+    assert counts == {"sensor.temp": 2}
+    assert archive.read("sensor_data/a_sensor_temp.csv").decode() == (
+        "timestamp,state,unit\n"
+        f"{START.isoformat()},21.5,degC\n"
+        f"{(START + timedelta(minutes=10)).isoformat()},22.0,degC\n"
+    )
+
+
+def test_history_writer_skips_page_overlap_and_empty_sensors():
+    mod = _load_plant_export_module()
+
+    def write(zipf):
+        writer = mod.HistoryArchiveWriter(zipf)
+        writer.begin({"sensor.a": "a.csv", "sensor.b": "b.csv"})
+        writer.write_page({"sensor.a": [_state(0, "1"), _state(10, "2")]})
+        # Die nächste Seite beginnt mit dem zu ihrem Start gültigen Zustand
+        writer.write_page({"sensor.a": [_state(10, "2"), _state(20, "3")]})
+        return writer.finish()
+
+    archive, counts = _archive_with(write)
+    assert counts == {"sensor.a": 3, "sensor.b": 0}
+    assert archive.namelist() == ["a.csv"]
+    rows = archive.read("a.csv").decode().splitlines()
+    assert [row.split(",")[1] for row in rows[1:]] == ["1", "2", "3"]
+
+
+def test_history_writer_skips_attribute_only_updates():
+    mod = _load_plant_export_module()
+    update = _state(10, "1")
+    update.last_changed = START
+
+    def write(zipf):
+        writer = mod.HistoryArchiveWriter(zipf)
+        writer.begin({"sensor.a": "a.csv"})
+        # Nur Attribute geändert: gleiches last_changed, neueres last_updated
+        writer.write_page({"sensor.a": [_state(0, "1"), update, _state(20, "2")]})
+        return writer.finish()
+
+    archive, counts = _archive_with(write)
+    assert counts == {"sensor.a": 2}
+    rows = archive.read("a.csv").decode().splitlines()
+    assert [row.split(",")[1] for row in rows[1:]] == ["1", "2"]
+
+
+def test_history_writer_statistics_before_raw_states():
+    mod = _load_plant_export_module()
+    hour = START.timestamp()
+
+    def write(zipf):
+        writer = mod.HistoryArchiveWriter(zipf)
+        writer.begin({"sensor.m": "m.csv"})
+        writer.write_statistics("sensor.m", [(hour, 40.25), (hour + 3600, 41.0)], "%")
+        writer.write_states("sensor.m", [_state(120, "42", "%")])
+        return writer.finish()
+
+    archive, _ = _archive_with(write)
+    rows = archive.read("m.csv").decode().splitlines()
+    assert rows[1] == f"{START.isoformat()},40.25,%"
+    assert rows[3].endswith(",42,%")
+
+
+def test_history_writer_spills_large_sensors_to_disk():
+    mod = _load_plant_export_module()
+    states = [_state(i, str(i)) for i in range(60000)]
+
+    def write(zipf):
+        writer = mod.HistoryArchiveWriter(zipf)
+        writer.begin({"sensor.big": "big.csv"})
+        for index in range(0, len(states), 10000):
+            writer.write_states("sensor.big", states[index : index + 10000])
+        return writer.finish()
+
+    archive, counts = _archive_with(write)
+    assert counts == {"sensor.big": 60000}
+    assert len(archive.read("big.csv").decode().splitlines()) == 60001
+
+
+def test_columnar_roundtrip_keeps_numeric_states():
+    mod = _load_plant_export_module()
+
+    def write(zipf):
+        writer = mod.HistoryArchiveWriter(zipf, mod.SENSOR_DATA_FORMAT_COLUMNAR)
+        writer.begin({"sensor.m": "m.bin"})
+        writer.write_page({"sensor.m": [_state(0, "41.5", "%"), _state(7, "on", "%")]})
+        writer.write_page({"sensor.m": [_state(30, "40.25", "%"), _state(45, "39", "%")]})
+        return writer.finish()
+
+    archive, counts = _archive_with(write)
+    assert counts == {"sensor.m": 3}
+    history = mod.read_history_file("m.bin", archive.read("m.bin"))
+    start_ms = int(START.timestamp() * 1000)
+    assert list(history.timestamps) == [start_ms, start_ms + 1800000, start_ms + 2700000]
+    assert list(history.values) == [41.5, 40.25, 39.0]
+    assert history.unit == "%"
+
+
+def test_read_history_file_loads_csv_and_rejects_garbage():
+    mod = _load_plant_export_module()
+    text = "timestamp,state,unit\n" f"{START.isoformat()},21.5,degC\n" f"{START.isoformat()},on,\n"
+
+    history = mod.read_history_file("a.csv", text.encode())
+    assert list(history.values) == [21.5]
+    assert history.unit == "degC"
+
+    with pytest.raises(ValueError):
+        mod.read_history_file("a.bin", b"not a history file")
+
+
+def test_columnar_is_smaller_than_csv():
+    mod = _load_plant_export_module()
+    states = [_state(i, f"{20 + (i % 50) / 10:.1f}") for i in range(5000)]
+    sizes = {}
+    for data_format in (mod.SENSOR_DATA_FORMAT_CSV, mod.SENSOR_DATA_FORMAT_COLUMNAR):
+
+        def write(zipf):
+            writer = mod.HistoryArchiveWriter(zipf, data_format)
+            writer.begin({"sensor.t": "t"})
+            writer.write_states("sensor.t", states)
+            return writer.finish()
+
+        archive, _ = _archive_with(write)
+        sizes[data_format] = archive.getinfo("t").compress_size
+    assert sizes[mod.SENSOR_DATA_FORMAT_COLUMNAR] * 3 < sizes[mod.SENSOR_DATA_FORMAT_CSV]
+
+
+def test_incremental_export_skips_rows_up_to_watermark():
+    mod = _load_plant_export_module()
+    since = (START + timedelta(minutes=10)).timestamp()
+
+    def write(zipf):
+        writer = mod.HistoryArchiveWriter(zipf)
+        writer.begin({"sensor.a": "a.csv"}, since=since)
+        writer.write_states("sensor.a", [_state(0, "1"), _state(10, "2"), _state(20, "3")])
+        return writer.finish()
+
+    archive, counts = _archive_with(write)
+    assert counts == {"sensor.a": 1}
+    rows = archive.read("a.csv").decode().splitlines()
+    assert [row.split(",")[1] for row in rows[1:]] == ["3"]
+
+
+def test_fingerprints_ignore_order():
+    mod = _load_plant_export_module()
+    info = {"name": "Basil", "limits": {"max": 1, "min": 0}}
+    same = {"limits": {"min": 0, "max": 1}, "name": "Basil"}
+
+    assert mod.config_fingerprint(info, {}) == mod.config_fingerprint(same, {})
+    assert mod.config_fingerprint(info, {}) != mod.config_fingerprint(info, {"a": 1})
+
+
+def test_images_are_stored_once_by_content(tmp_path):
+    mod = _load_plant_export_module()
+    (tmp_path / "a.jpg").write_bytes(b"strain")
+    (tmp_path / "b.JPG").write_bytes(b"strain")
+    (tmp_path / "c.png").write_bytes(b"other")
+
+    names = mod.content_names(
+        [(str(tmp_path / f), f) for f in ("a.jpg", "a.jpg", "b.JPG", "c.png")]
+    )
+    assert set(names) == {"a.jpg", "b.JPG", "c.png"}
+    assert names["a.jpg"] == names["b.JPG"]
+    assert names["a.jpg"].endswith(".jpg") and len(names["a.jpg"]) == 64 + 4
+    assert names["c.png"] != names["a.jpg"]
+
+
+def test_image_extractor_skips_identical_files(tmp_path):
+    mod = _load_plant_export_module()
+    source = tmp_path / "strain.jpg"
+    source.write_bytes(b"strain")
+    blob = mod.content_names([(str(source), "strain.jpg")])["strain.jpg"]
+    target = tmp_path / "target"
+    target.mkdir()
+    (target / "plant.a.jpg").write_bytes(b"strain")
+    (target / "plant.b.jpg").write_bytes(b"outdated")
+
+    def write(zipf):
+        zipf.writestr(mod.IMAGE_DIR + blob, b"strain")
+        zipf.writestr(mod.IMAGE_DIR + "legacy.jpg", b"legacy")
+
+    archive, _ = _archive_with(write)
+    extractor = mod.ImageExtractor(archive, str(target))
+    member = mod.IMAGE_DIR + blob
+    assert not extractor.extract(member, "plant.a.jpg")
+    assert extractor.extract(member, "plant.b.jpg")
+    assert extractor.extract(member, "plant.c.jpg")
+    assert extractor.extract(mod.IMAGE_DIR + "legacy.jpg", "legacy.jpg")
+    assert not extractor.extract(mod.IMAGE_DIR + "legacy.jpg", "legacy.jpg")
+
+    assert (target / "plant.b.jpg").read_bytes() == b"strain"
+    assert (target / "plant.c.jpg").read_bytes() == b"strain"
+    assert sorted(p.name for p in target.iterdir()) == [
+        "legacy.jpg", "plant.a.jpg", "plant.b.jpg", "plant.c.jpg"
+    ]
+
+
+def test_validate_import_reports_all_problems():
+    mod = _load_plant_export_module()
+    plants = [
+        {"plant_info": {"name": "Basil"}},
+        # Unveränderte Pflanze eines Delta-Exports
+        {"entry_id": "entry_mint", "title": "Mint", "config_changed": False},
+        {"plant_info": {}},
+        "garbage",
+        {"plant_info": {"name": "Basil"}},
+    ]
+
+    assert mod.validate_import(plants) == [
+        "plant 3: missing plant_info or name",
+        "plant 4: missing plant_info or name",
+        "Basil: plant name used more than once",
+    ]
+    assert mod.validate_import(plants[:2]) == []
+    # Ein neuer Name für mehrere Pflanzen ist nicht eindeutig
+    assert mod.validate_import([plants[0], {"plant_info": {"name": "Thyme"}}], "Sage") == [
+        "Sage: plant name used more than once"
+    ]
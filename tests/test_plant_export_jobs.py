@@ -0,0 +1,221 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+from ha_stubs import FakeHass, load_plant
+
+
+class ClockHass(FakeHass):
+    """FakeHass with a loop clock set by the test."""
+
+    def __init__(self):
+        super().__init__()
+        self.now = 1000.0
+        self.events = []
+        self.bus.async_fire = lambda event_type, data: self.events.append(data)
+
+    @property
+    def loop(self):
+        return SimpleNamespace(time=lambda: self.now)
+
+
+class FakeConnection:
+    def __init__(self):
+        self.results = []
+        self.errors = []
+        self.messages = []
+        self.subscriptions = {}
+
+    def send_result(self, msg_id, result=None):
+        self.results.append((msg_id, result))
+
+    def send_error(self, msg_id, code, message):
+        self.errors.append((msg_id, code, message))
+
+    def send_message(self, message):
+        self.messages.append(message)
+
+
+def test_progress_is_throttled_but_the_end_is_always_sent():
+    mod = load_plant("plant_export_jobs")
+    hass = ClockHass()
+    job = mod.ExportJob(hass, "/config/export.zip")
+    updates = []
+    job.async_subscribe(lambda job: updates.append((job.status, job.done)))
+
+    job.async_add_total(4)
+    job.async_advance()
+    job.async_advance()
+    hass.now += mod.EXPORT_PROGRESS_INTERVAL
+    job.async_advance()
+    job.async_finish(mod.EXPORT_STATUS_DONE, result={"exported_plants": 1})
+
+    assert updates == [("running", 0), ("running", 3), ("done", 4)]
+    assert [event["done"] for event in hass.events] == [0, 3, 4]
+    assert hass.events[-1]["result"] == {"exported_plants": 1}
+    # Nach dem Ende gibt es keine Listener mehr
+    job.async_advance()
+    assert len(updates) == 3
+
+
+def _run_job(mod, hass, run, tmp_path, cancel=False):
+    jobs = mod.async_get_export_jobs(hass)
+
+    async def go():
+        job = jobs.async_start(str(tmp_path / "export.zip"), run)
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        if cancel:
+            assert jobs.async_cancel(job.job_id)
+        await job.task
+        return job
+
+    return jobs, asyncio.run(go())
+
+
+def test_cancelled_job_removes_its_partial_archive(tmp_path):
+    mod = load_plant("plant_export_jobs")
+    hass = FakeHass()
+
+    async def run(job):
+        job.archive_started = True
+        (tmp_path / "export.zip").write_bytes(b"partial")
+        await asyncio.Event().wait()
+
+    jobs, job = _run_job(mod, hass, run, tmp_path, cancel=True)
+
+    assert job.status == mod.EXPORT_STATUS_CANCELLED
+    assert list(tmp_path.iterdir()) == []
+    assert not jobs.async_cancel(job.job_id)
+
+
+def test_failed_job_reports_the_error_and_removes_its_archive(tmp_path):
+    mod = load_plant("plant_export_jobs")
+    hass = FakeHass()
+
+    async def run(job):
+        job.archive_started = True
+        (tmp_path / "export.zip").write_bytes(b"partial")
+        raise OSError("disk full")
+
+    _, job = _run_job(mod, hass, run, tmp_path)
+
+    assert job.as_dict()["status"] == mod.EXPORT_STATUS_FAILED
+    assert job.error == "disk full"
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_failure_before_writing_keeps_an_existing_file(tmp_path):
+    mod = load_plant("plant_export_jobs")
+    hass = FakeHass()
+    (tmp_path / "export.zip").write_bytes(b"last export")
+
+    async def run(job):
+        raise OSError("no plants")
+
+    _, job = _run_job(mod, hass, run, tmp_path)
+
+    assert job.status == mod.EXPORT_STATUS_FAILED
+    assert (tmp_path / "export.zip").read_bytes() == b"last export"
+
+
+def test_only_the_newest_finished_jobs_are_kept(tmp_path):
+    mod = load_plant("plant_export_jobs")
+    mod.EXPORT_JOBS_KEEP = 3
+    hass = FakeHass()
+
+    async def run(job):
+        return {}
+
+    async def go():
+        jobs = mod.async_get_export_jobs(hass)
+        started = []
+        for _ in range(5):
+            job = jobs.async_start(str(tmp_path / "export.zip"), run)
+            await job.task
+            started.append(job)
+        running = jobs.async_start(str(tmp_path / "export.zip"), lambda job: asyncio.Event().wait())
+        await asyncio.sleep(0)
+        kept = [job for job in started + [running] if jobs.get(job.job_id) is job]
+        running.task.cancel()
+        await asyncio.gather(running.task, return_exceptions=True)
+        return started, running, kept
+
+    started, running, kept = asyncio.run(go())
+
+    # Der laufende Job zählt nicht, von den beendeten bleiben die neuesten
+    assert kept == started[-2:] + [running]
+
+
+@pytest.mark.parametrize("cancel_twice", [False, True])
+def test_cancel_waits_for_the_running_executor_step(cancel_twice):
+    mod = load_plant("plant_export_jobs")
+    started = threading.Event()
+    release = threading.Event()
+    returned = []
+
+    def write():
+        started.set()
+        release.wait(5)
+        returned.append(True)
+
+    async def go():
+        loop = asyncio.get_running_loop()
+        hass = SimpleNamespace(
+            async_add_executor_job=lambda func, *args: loop.run_in_executor(None, func, *args)
+        )
+        task = asyncio.ensure_future(mod.async_run_executor_job(hass, write))
+        await loop.run_in_executor(None, started.wait, 5)
+        task.cancel()
+        for _ in range(5):
+            await asyncio.sleep(0)
+        if cancel_twice:
+            task.cancel()
+            await asyncio.sleep(0)
+        # Der Thread schreibt noch, die Aufgabe darf nicht weiterlaufen
+        assert not task.done()
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return returned
+
+    assert asyncio.run(go()) == [True]
+
+
+def test_subscribe_sends_progress_and_handles_finished_jobs(tmp_path):
+    init = load_plant()
+    mod = load_plant("plant_export_jobs")
+    hass = FakeHass()
+    connection = FakeConnection()
+    gate = asyncio.Event()
+
+    async def run(job):
+        job.async_add_total(2)
+        await gate.wait()
+        return {"exported_plants": 2}
+
+    async def go():
+        jobs = mod.async_get_export_jobs(hass)
+        job = jobs.async_start(str(tmp_path / "export.zip"), run)
+        await asyncio.sleep(0)
+        init.ws_export_subscribe(hass, connection, {"id": 1, "job_id": job.job_id})
+        gate.set()
+        await job.task
+        init.ws_export_subscribe(hass, connection, {"id": 2, "job_id": job.job_id})
+        init.ws_export_subscribe(hass, connection, {"id": 3, "job_id": "unknown"})
+        init.ws_export_cancel(hass, connection, {"id": 4, "job_id": job.job_id})
+
+    asyncio.run(go())
+
+    assert connection.results == [(1, None), (2, None)]
+    statuses = [(m["id"], m["event"]["status"]) for m in connection.messages]
+    assert statuses == [(1, "running"), (1, "done"), (2, "done")]
+    assert connection.messages[-1]["event"]["result"] == {"exported_plants": 2}
+    # Für beendete Jobs bleibt kein Abonnement übrig
+    assert list(connection.subscriptions) == [1]
+    assert [error[:2] for error in connection.errors] == [
+        (3, "job_not_found"),
+        (4, "job_not_found"),
+    ]
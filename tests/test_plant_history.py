@@ -0,0 +1,179 @@
+import asyncio
+import math
+import random
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from ha_stubs import FakeHass, load_plant
+
+START = datetime(2025, 6, 1, tzinfo=timezone.utc)
+
+
+def _at(minutes):
+    return START + timedelta(minutes=minutes)
+
+
+def _state(minutes, state, changed=None):
+    return SimpleNamespace(
+        state=state,
+        last_changed=_at(minutes if changed is None else changed),
+        last_updated=_at(minutes),
+        attributes={},
+    )
+
+
+def _request(mod, kind, minutes, entity_ids=("sensor.a",)):
+    return mod._HistoryRequest(list(entity_ids), _at(minutes), _at(minutes + 60), kind, None)
+
+
+def test_requests_are_grouped_by_kind_and_start():
+    mod = load_plant("plant_history")
+    tolerance = mod.HISTORY_BATCH_TOLERANCE / 60
+    a = _request(mod, mod._KIND_STATES, 0)
+    b = _request(mod, mod._KIND_STATES, tolerance)
+    c = _request(mod, mod._KIND_STATES, tolerance + 1)
+    d = _request(mod, mod._KIND_STATES_ATTRIBUTES, 0)
+
+    groups = mod._group_requests([c, d, b, a])
+
+    assert groups == [[d], [a, b], [c]]
+
+
+def test_slice_returns_state_valid_at_start():
+    mod = load_plant("plant_history")
+    items = ["a", "b", "c", "d"]
+    timestamps = [0.0, 10.0, 20.0, 30.0]
+
+    assert mod._slice(items, timestamps, 15.0, 30.0) == ["b", "c", "d"]
+    assert mod._slice(items, timestamps, 10.0, 25.0) == ["b", "c"]
+    # Statistiken sind Intervalle: [start, end)
+    assert mod._slice(items, timestamps, 10.0, 30.0, include_start=False) == ["b", "c"]
+
+
+def test_batched_query_is_sliced_back_to_each_request():
+    mod = load_plant("plant_history")
+    hass = FakeHass()
+    calls = []
+    rows = {
+        "sensor.a": [
+            _state(0, "1"),
+            # Nur Attribute geändert
+            _state(5, "1", changed=0),
+            _state(10, "2"),
+            _state(30, "3"),
+        ],
+        "sensor.b": [_state(0, "7"), _state(40, "8")],
+    }
+
+    def get_significant_states(hass_, start, end, entity_ids, **kwargs):
+        calls.append((start, end, list(entity_ids), kwargs))
+        return {entity_id: rows[entity_id] for entity_id in entity_ids}
+
+    mod.history.get_significant_states = get_significant_states
+
+    async def run():
+        history = mod.async_get_plant_history(hass)
+        first = asyncio.ensure_future(
+            history.async_get_states(["sensor.a"], _at(0), _at(20), attributes=False)
+        )
+        second = asyncio.ensure_future(
+            history.async_get_states(["sensor.a", "sensor.b"], _at(15), _at(60), attributes=False)
+        )
+        await asyncio.sleep(0)
+        assert len(hass.timers) == 1
+        await hass.async_fire_timers()
+        return await first, await second
+
+    first, second = asyncio.run(run())
+
+    assert len(calls) == 1
+    start, end, entity_ids, kwargs = calls[0]
+    assert (start, end, entity_ids) == (_at(0), _at(60), ["sensor.a", "sensor.b"])
+    assert kwargs["no_attributes"] is True
+    assert [s.state for s in first["sensor.a"]] == ["1", "2"]
+    assert [s.state for s in second["sensor.a"]] == ["2", "3"]
+    assert [s.state for s in second["sensor.b"]] == ["7", "8"]
+
+
+def test_failed_query_is_raised_to_every_request():
+    mod = load_plant("plant_history")
+    hass = FakeHass()
+
+    def get_significant_states(*args, **kwargs):
+        raise RuntimeError("recorder down")
+
+    mod.history.get_significant_states = get_significant_states
+
+    async def run():
+        history = mod.async_get_plant_history(hass)
+        requests = [
+            asyncio.ensure_future(history.async_get_states([entity_id], _at(0), _at(10)))
+            for entity_id in ("sensor.a", "sensor.b")
+        ]
+        await asyncio.sleep(0)
+        await hass.async_fire_timers()
+        return await asyncio.gather(*requests, return_exceptions=True)
+
+    results = asyncio.run(run())
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_statistics_part_weighs_like_the_raw_readings():
+    mod = load_plant("plant_history")
+    hass = FakeHass()
+    days = 20
+    end = START + timedelta(days=days)
+    rng = random.Random(7)
+    # Feuchte springt beim Gießen alle drei Tage hoch und fällt danach ab
+    readings = []
+    for index in range(days * 288):
+        age = index * 300 % (3 * 86400)
+        value = 30 + 30 * math.exp(-age / (6 * 3600)) + rng.gauss(0, 0.5)
+        readings.append((START.timestamp() + index * 300, round(value, 1)))
+
+    def as_state(timestamp, value):
+        when = datetime.fromtimestamp(timestamp, timezone.utc)
+        return SimpleNamespace(state=str(value), last_changed=when, last_updated=when)
+
+    def get_significant_states(hass_, start, end_, entity_ids, **kwargs):
+        start, end_ = start.timestamp(), end_.timestamp()
+        first = [r for r in readings if r[0] <= start][-1:]
+        rows = first + [r for r in readings if start < r[0] <= end_]
+        return {entity_id: [as_state(*row) for row in rows] for entity_id in entity_ids}
+
+    def statistics_during_period(hass_, start, end_, entity_ids, period, units, types):
+        hours = {}
+        for timestamp, value in readings:
+            hour = timestamp - timestamp % 3600
+            if start.timestamp() <= hour < end_.timestamp():
+                hours.setdefault(hour, []).append(value)
+        rows = [
+            {"start": datetime.fromtimestamp(hour, timezone.utc), "mean": sum(v) / len(v)}
+            for hour, v in sorted(hours.items())
+        ]
+        return {entity_id: rows for entity_id in entity_ids}
+
+    mod.history.get_significant_states = get_significant_states
+    mod.statistics.statistics_during_period = statistics_during_period
+
+    async def run():
+        history = mod.async_get_plant_history(hass)
+        task = asyncio.ensure_future(
+            history.async_get_samples(["sensor.moisture"], START, end, 3 * 86400)
+        )
+        while not task.done():
+            await asyncio.sleep(0)
+            await hass.async_fire_timers()
+        return task.result()["sensor.moisture"]
+
+    def percentile(samples):
+        values = sorted(value for _, value in samples)
+        return values[int(len(values) * 0.95)]
+
+    samples = asyncio.run(run())
+
+    # 17 Tage Statistik mit je 12 Werten pro Stunde, 3 Tage Rohdaten
+    assert len(samples) == len(readings)
+    assert [t for t, _ in samples] == sorted({t for t, _ in samples})
+    assert abs(percentile(samples) - percentile(readings)) < 0.01 * percentile(readings)
@@ -0,0 +1,35 @@
+import asyncio
+
+from ha_stubs import FakeHass, load_plant
+
+
+def test_concurrent_reservations_get_distinct_ids():
+    mod = load_plant("plant_ids")
+    hass = FakeHass()
+
+    async def run():
+        return await asyncio.gather(
+            mod.async_reserve_ids(hass, "plant"),
+            mod.async_reserve_ids(hass, "plant", 3),
+            mod.async_reserve_ids(hass, "plant", 2),
+            mod.async_reserve_ids(hass, "cycle"),
+            mod.async_reserve_ids(hass, "plant"),
+        )
+
+    plant, bulk, pair, cycle, last = asyncio.run(run())
+
+    ids = plant + bulk + pair + last
+    assert sorted(ids) == [f"{n:04d}" for n in range(1, 8)]
+    # Eine Reservierung ist immer zusammenhängend
+    assert [int(i) for i in bulk] == list(range(int(bulk[0]), int(bulk[0]) + 3))
+    assert cycle == ["0001"]
+    assert hass.storage["plant_plant_counter"] == {"counter": 7}
+    assert hass.saves["plant_plant_counter"] == 4
+
+
+def test_reserve_nothing_does_not_touch_the_store():
+    mod = load_plant("plant_ids")
+    hass = FakeHass()
+
+    assert asyncio.run(mod.async_reserve_ids(hass, "plant", 0)) == []
+    assert hass.saves == {}
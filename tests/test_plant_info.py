@@ -0,0 +1,94 @@
+import importlib.machinery
+import importlib.util
+import sys
+from pathlib import Path
+
+
+def _load_plant_info_module():
+    path = Path(__file__).resolve().parents[1] / "custom_components" / "plant" / "plant_info.py"
+    loader = importlib.machinery.SourceFileLoader("plant_info_under_test", str(path))
+    spec = importlib.util.spec_from_loader(loader.name, loader)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[loader.name] = module
+    loader.exec_module(module)
+    return module
+
+
+OLD = {
+    "name": "Basil",
+    "temperature": {"current": "21.5", "max": "30", "min": "10"},
+    "helpers": {"cycle": {"current": "A", "options": ["A", "B"]}},
+    "diagnostic_sensors": {"total_integral": {"current": 1.0}},
+}
+
+
+def test_diff_only_contains_changed_leaves():
+    mod = _load_plant_info_module()
+    new = {
+        "name": "Basil",
+        "temperature": {"current": "22.0", "max": "30", "min": "10"},
+        "helpers": {"cycle": {"current": "A", "options": ["A", "B", "C"]}},
+        "diagnostic_sensors": {},
+    }
+
+    ops = mod.info_diff(OLD, new)
+    assert ops == [
+        {"op": "replace", "path": "/temperature/current", "value": "22.0"},
+        {"op": "replace", "path": "/helpers/cycle/options", "value": ["A", "B", "C"]},
+        {"op": "remove", "path": "/diagnostic_sensors/total_integral"},
+    ]
+    assert mod.apply_info_diff(OLD, ops) == new
+    # Der alte Snapshot bleibt unverändert
+    assert OLD["temperature"]["current"] == "21.5"
+
+
+def test_diff_of_equal_snapshots_is_empty_and_keys_are_escaped():
+    mod = _load_plant_info_module()
+    assert mod.info_diff(OLD, dict(OLD)) == []
+
+    new = dict(OLD, **{"a/b~c": 1})
+    ops = mod.info_diff(OLD, new)
+    assert ops == [{"op": "add", "path": "/a~1b~0c", "value": 1}]
+    assert mod.apply_info_diff(OLD, ops) == new
+    # Typwechsel wird erkannt (1 == 1.0)
+    assert mod.info_diff({"v": 1}, {"v": 1.0}) == [{"op": "replace", "path": "/v", "value": 1.0}]
+
+
+def test_project_info_keeps_requested_sections():
+    mod = _load_plant_info_module()
+    assert mod.project_info(OLD) is OLD
+    assert mod.project_info(OLD, []) is OLD
+    assert mod.project_info(OLD, ["name", "temperature", "missing"]) == {
+        "name": "Basil",
+        "temperature": OLD["temperature"],
+    }
+
+
+def test_project_info_selects_paths_with_wildcards():
+    mod = _load_plant_info_module()
+    projected = mod.project_info(OLD, ["*.current", "temperature.max", "helpers.*.current"])
+    assert projected == {
+        "temperature": {"current": "21.5", "max": "30"},
+        "helpers": {"cycle": {"current": "A"}},
+    }
+
+
+def test_static_info_version_follows_metadata_only():
+    mod = _load_plant_info_module()
+    info = {
+        "name": "Basil",
+        "state": "ok",
+        "temperature": {"current": "21.5", "max": "30", "unit_of_measurement": "°C"},
+        "helpers": {"pot_size": {"current": "5", "min": 0, "max": 100, "entity_id": "number.pot"}},
+    }
+    static, version = mod.static_info(info)
+    assert static == {
+        "name": "Basil",
+        "temperature": {"unit_of_measurement": "°C"},
+        "helpers": {"pot_size": {"min": 0, "max": 100, "entity_id": "number.pot"}},
+    }
+
+    changed = dict(info, state="problem", temperature=dict(info["temperature"], current="40"))
+    assert mod.static_info(changed)[1] == version
+    renamed = dict(info, name="Thyme")
+    assert mod.static_info(renamed)[1] != version
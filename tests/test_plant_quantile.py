@@ -0,0 +1,135 @@
+import importlib.machinery
+import importlib.util
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+
+def _load_plant_quantile_module():
+    path = Path("custom_components/plant/plant_quantile.py").resolve()
+    name = "plant_quantile_testmod"
+    loader = importlib.machinery.SourceFileLoader(name, str(path))
+    spec = importlib.util.spec_from_loader(loader.name, loader)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def _exact_percentile(values, p):
+    # Gleiche Definition wie die bisherige Normalisierung
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * p), len(ordered) - 1)]
+
+
+def test_p2_small_counts_are_exact():
+    mod = _load_plant_quantile_module()
+    sketch = mod.P2Quantile(0.95)
+    assert sketch.value is None
+
+    for value in (40.0, 10.0, 30.0, 20.0):
+        sketch.add(value)
+    assert len(sketch) == 4
+    assert sketch.value == 40.0
+
+
+def test_p2_tracks_percentile_of_moisture_readings():
+    mod = _load_plant_quantile_module()
+    rng = random.Random(42)
+    sketch = mod.P2Quantile(0.95)
+    values = []
+    for _ in range(5000):
+        value = 30 + rng.gauss(0, 10)
+        values.append(value)
+        sketch.add(value)
+
+    assert sketch.value == pytest.approx(_exact_percentile(values, 0.95), abs=0.5)
+
+
+def test_windowed_quantile_forgets_old_readings():
+    mod = _load_plant_quantile_module()
+    window = mod.WindowedQuantile(0.95, 100, start=0.0)
+
+    for t in range(0, 100):
+        window.add(float(t), 80.0)
+    assert window.value == 80.0
+
+    # Nach mehr als einem Fenster stammen alle Werte des Schätzers aus der neuen Phase
+    for t in range(100, 250):
+        window.add(float(t), 40.0)
+    assert window.value == 40.0
+
+
+def test_windowed_quantile_restarts_after_gap():
+    mod = _load_plant_quantile_module()
+    window = mod.WindowedQuantile(0.5, 100, start=0.0)
+    window.add(10.0, 5.0)
+    window.add(1000.0, 7.0)
+
+    assert len(window) == 1  # nur der neu gestartete ältere Sketch
+    assert window.value == 7.0
+
+
+def test_windowed_quantile_snapshot_roundtrip():
+    mod = _load_plant_quantile_module()
+    rng = random.Random(1)
+    window = mod.WindowedQuantile(0.95, 86400, start=0.0)
+    for t in range(0, 86400, 60):
+        window.add(float(t), rng.uniform(10, 60))
+
+    restored = mod.WindowedQuantile(0.95, 86400)
+    restored.load_bytes(window.to_bytes())
+    assert restored.value == window.value
+    assert len(restored) == len(window)
+
+    # Beide laufen danach identisch weiter
+    for t in range(86400, 90000, 60):
+        value = rng.uniform(10, 60)
+        window.add(float(t), value)
+        restored.add(float(t), value)
+    assert restored.value == window.value
+
+
+def test_windowed_quantile_rejects_mismatching_snapshot():
+    mod = _load_plant_quantile_module()
+    window = mod.WindowedQuantile(0.95, 86400)
+    window.add(1.0, 2.0)
+    data = window.to_bytes()
+
+    with pytest.raises(ValueError):
+        mod.WindowedQuantile(0.9, 86400).load_bytes(data)
+    with pytest.raises(ValueError):
+        mod.WindowedQuantile(0.95, 3600).load_bytes(data)
+    with pytest.raises(ValueError):
+        mod.WindowedQuantile(0.95, 86400).load_bytes(data[:-1])
+
+
+def test_windowed_quantile_cursor_skips_known_samples():
+    mod = _load_plant_quantile_module()
+    window = mod.WindowedQuantile(0.5, 1000, start=0.0)
+    assert window.add(10.0, 1.0)
+    assert window.add(20.0, 2.0)
+
+    # Überlappende Historie: bereits übernommene Werte werden übersprungen
+    assert not window.add(10.0, 1.0)
+    assert not window.add(20.0, 2.0)
+    assert window.add(30.0, 3.0)
+    assert window.last == 30.0
+    assert len(window) == 3
+
+
+def test_windowed_quantile_snapshot_keeps_cursor():
+    mod = _load_plant_quantile_module()
+    window = mod.WindowedQuantile(0.5, 1000, start=0.0)
+    window.add(10.0, 1.0)
+    window.add(25.0, 2.0)
+
+    restored = mod.WindowedQuantile(0.5, 1000)
+    assert restored.last == float("-inf")
+    restored.load_bytes(window.to_bytes())
+    assert restored.last == 25.0
+
+    restored.reset(100.0)
+    assert restored.last == float("-inf")
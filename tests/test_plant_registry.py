@@ -0,0 +1,155 @@
+import importlib.machinery
+import importlib.util
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+
+def _load_plant_registry_module():
+    path = Path("custom_components/plant/plant_registry.py").resolve()
+    name = "plant_registry_testmod"
+    loader = importlib.machinery.SourceFileLoader(name, str(path))
+    spec = importlib.util.spec_from_loader(loader.name, loader)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def _plant(entity_id, unique_id, device_type="plant", device_id=None):
+    return SimpleNamespace(
+        entity_id=entity_id,
+        unique_id=unique_id,
+        device_type=device_type,
+        device_id=device_id,
+    )
+
+
+def test_register_and_lookup_by_all_keys():
+    mod = _load_plant_registry_module()
+    registry = mod.PlantRegistry()
+    plant = _plant("plant.tomato", "entry_1")
+
+    registry.register("entry_1", plant, "device_1")
+
+    assert registry.get_by_entry_id("entry_1") is plant
+    assert registry.get_by_entity_id("plant.tomato") is plant
+    assert registry.get_by_unique_id("entry_1") is plant
+    assert registry.get_by_device_id("device_1") is plant
+    assert "entry_1" in registry
+    assert len(registry) == 1
+
+
+def test_unregister_removes_all_keys():
+    mod = _load_plant_registry_module()
+    registry = mod.PlantRegistry()
+    plant = _plant("plant.tomato", "entry_1")
+    sensor = SimpleNamespace(entity_id="sensor.tomato_temperature")
+    registry.register("entry_1", plant, "device_1")
+    registry.register_sensors("entry_1", [sensor])
+
+    assert registry.unregister("entry_1") is plant
+    assert registry.get_by_entity_id("plant.tomato") is None
+    assert registry.get_by_device_id("device_1") is None
+    assert registry.get_sensor("sensor.tomato_temperature") is None
+    assert len(registry) == 0
+    assert registry.unregister("entry_1") is None
+
+
+def test_rename_and_reindex():
+    mod = _load_plant_registry_module()
+    registry = mod.PlantRegistry()
+    plant = _plant("plant.tomato", "entry_1")
+    registry.register("entry_1", plant, "device_1")
+
+    assert registry.rename("plant.tomato", "plant.tomato_2")
+    assert registry.get_by_entity_id("plant.tomato") is None
+    assert registry.get_by_entity_id("plant.tomato_2") is plant
+    assert not registry.rename("plant.unknown", "plant.other")
+
+    # Entity Registry vergibt nachträglich eine andere entity_id
+    plant.entity_id = "plant.tomato_3"
+    registry.reindex("entry_1")
+    assert registry.get_by_entity_id("plant.tomato_2") is None
+    assert registry.get_by_entity_id("plant.tomato_3") is plant
+    assert registry.get_by_device_id("device_1") is plant
+
+
+def test_sensor_lookup_and_rename():
+    mod = _load_plant_registry_module()
+    registry = mod.PlantRegistry()
+    sensor = SimpleNamespace(entity_id="sensor.tomato_moisture")
+    registry.register("entry_1", _plant("plant.tomato", "entry_1"))
+    registry.register_sensors("entry_1", [sensor])
+
+    assert registry.get_sensor("sensor.tomato_moisture") is sensor
+    assert registry.rename("sensor.tomato_moisture", "sensor.tomato_soil")
+    assert registry.get_sensor("sensor.tomato_soil") is sensor
+
+    registry.unregister("entry_1")
+    assert registry.get_sensor("sensor.tomato_soil") is None
+
+
+def test_plants_filtered_by_device_type():
+    mod = _load_plant_registry_module()
+    registry = mod.PlantRegistry()
+    plant = _plant("plant.tomato", "entry_1")
+    cycle = _plant("cycle.summer", "entry_2", device_type="cycle")
+    registry.register("entry_1", plant)
+    registry.register("entry_2", cycle)
+
+    assert registry.plants("plant") == [plant]
+    assert registry.plants("cycle") == [cycle]
+    assert set(map(id, registry)) == {id(plant), id(cycle)}
+
+
+def test_cycle_membership_index():
+    mod = _load_plant_registry_module()
+    registry = mod.PlantRegistry()
+    cycle = _plant("cycle.summer", "entry_c", device_type="cycle")
+    other_cycle = _plant("cycle.winter", "entry_w", device_type="cycle")
+    plant = _plant("plant.tomato", "entry_1")
+    registry.register("entry_c", cycle, "device_c")
+    registry.register("entry_w", other_cycle, "device_w")
+    registry.register("entry_1", plant, "device_1")
+
+    assert registry.get_cycle(plant) is None
+    assert registry.get_members(cycle) == []
+
+    registry.set_via_device("device_1", "device_c")
+    assert registry.get_cycle(plant) is cycle
+    assert registry.get_members(cycle) == [plant]
+
+    # Umzug in einen anderen Cycle
+    registry.set_via_device("device_1", "device_w")
+    assert registry.get_cycle(plant) is other_cycle
+    assert registry.get_members(cycle) == []
+    assert registry.get_members(other_cycle) == [plant]
+
+    registry.set_via_device("device_1", None)
+    assert registry.get_cycle(plant) is None
+    assert registry.get_members(other_cycle) == []
+
+
+def test_cycle_membership_survives_reload_and_device_removal():
+    mod = _load_plant_registry_module()
+    registry = mod.PlantRegistry()
+    cycle = _plant("cycle.summer", "entry_c", device_type="cycle")
+    plant = _plant("plant.tomato", "entry_1")
+    registry.register("entry_1", plant, "device_1")
+    registry.set_via_device("device_1", "device_c")
+
+    # Cycle wird erst nach der Plant geladen
+    assert registry.get_cycle(plant) is None
+    registry.register("entry_c", cycle, "device_c")
+    assert registry.get_cycle(plant) is cycle
+
+    # Reload des Cycles behält die Zuordnung auf Device-Ebene
+    registry.unregister("entry_c")
+    assert registry.get_cycle(plant) is None
+    registry.register("entry_c", cycle, "device_c")
+    assert registry.get_members(cycle) == [plant]
+
+    registry.remove_device("device_c")
+    assert registry.get_cycle(plant) is None
+    assert registry.get_members(cycle) == []
@@ -0,0 +1,143 @@
+import importlib.machinery
+import importlib.util
+import math
+import sys
+from pathlib import Path
+
+
+def _load_plant_status_module():
+    path = Path("custom_components/plant/plant_status.py").resolve()
+    name = "plant_status_testmod"
+    loader = importlib.machinery.SourceFileLoader(name, str(path))
+    spec = importlib.util.spec_from_loader(loader.name, loader)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def _engine(mod):
+    engine = mod.ThresholdEngine()
+    for key, current, minimum, maximum in (
+        ("temperature", 15, 18, 28),
+        ("moisture", 40, 20, 60),
+        ("humidity", 90, 40, 70),
+    ):
+        engine.set_enabled(key, True)
+        engine.set_trigger(key, True)
+        engine.set_current(key, current)
+        engine.set_min(key, minimum)
+        engine.set_max(key, maximum)
+    return engine
+
+
+def test_parse_value():
+    mod = _load_plant_status_module()
+    assert mod.parse_value("12.5") == 12.5
+    assert mod.parse_value(3) == 3.0
+    for value in (None, "", "unavailable", "unknown", "abc"):
+        assert math.isnan(mod.parse_value(value))
+
+
+def test_evaluate_low_ok_high():
+    mod = _load_plant_status_module()
+    engine = _engine(mod)
+
+    statuses, problem = engine.evaluate()
+    assert statuses == {
+        "temperature": mod.STATUS_LOW,
+        "moisture": mod.STATUS_OK,
+        "humidity": mod.STATUS_HIGH,
+    }
+    assert problem
+
+
+def test_evaluate_skips_unknown_and_disabled_slots():
+    mod = _load_plant_status_module()
+    engine = _engine(mod)
+
+    engine.set_current("temperature", "unavailable")
+    engine.set_enabled("humidity", False)
+    statuses, problem = engine.evaluate()
+    assert statuses == {"moisture": mod.STATUS_OK}
+    assert not problem
+
+
+def test_trigger_off_keeps_status_but_no_problem():
+    mod = _load_plant_status_module()
+    engine = _engine(mod)
+
+    engine.set_trigger("temperature", False)
+    engine.set_trigger("humidity", False)
+    statuses, problem = engine.evaluate()
+    assert statuses["temperature"] == mod.STATUS_LOW
+    assert statuses["humidity"] == mod.STATUS_HIGH
+    assert not problem
+
+
+def test_setters_report_changes():
+    mod = _load_plant_status_module()
+    engine = _engine(mod)
+
+    assert not engine.set_current("moisture", "40")
+    assert engine.set_current("moisture", 41)
+    assert engine.set_current("moisture", None)
+    assert not engine.set_current("moisture", "unknown")
+
+
+def test_evaluate_engines_matches_single_evaluation():
+    mod = _load_plant_status_module()
+    first = _engine(mod)
+    second = _engine(mod)
+    second.set_current("temperature", 20)
+    second.set_current("humidity", 50)
+
+    assert mod.evaluate_engines([]) == []
+    assert mod.evaluate_engines([first, second]) == [
+        first.evaluate(),
+        second.evaluate(),
+    ]
+
+
+def test_refresh_only_reevaluates_dirty_slots():
+    mod = _load_plant_status_module()
+    engine = _engine(mod)
+    engine.evaluate()
+    assert not engine.dirty
+
+    # Nichts geändert: kein Status, Problem aus dem Zwischenspeicher
+    assert engine.refresh() == ({}, True)
+
+    assert engine.set_current("temperature", 20)
+    assert engine.dirty
+    changed, problem = engine.refresh()
+    assert changed == {"temperature": mod.STATUS_OK}
+    assert problem  # humidity ist weiterhin zu hoch
+
+    engine.set_max("humidity", 95)
+    changed, problem = engine.refresh()
+    assert changed == {"humidity": mod.STATUS_OK}
+    assert not problem
+    assert engine.statuses == {
+        "temperature": mod.STATUS_OK,
+        "moisture": mod.STATUS_OK,
+        "humidity": mod.STATUS_OK,
+    }
+
+
+def test_refresh_drops_unknown_and_untriggered_slots():
+    mod = _load_plant_status_module()
+    engine = _engine(mod)
+    engine.evaluate()
+
+    engine.set_current("humidity", "unavailable")
+    changed, problem = engine.refresh()
+    assert changed == {}
+    assert "humidity" not in engine.statuses
+    assert problem  # temperature ist weiterhin zu niedrig
+
+    assert engine.set_trigger("temperature", False)
+    assert not engine.set_trigger("temperature", False)
+    changed, problem = engine.refresh()
+    assert changed == {}
+    assert not problem
@@ -0,0 +1,179 @@
+import asyncio
+import base64
+from types import SimpleNamespace
+
+from ha_stubs import FakeHass, load_plant
+
+
+class FakeConnection:
+    def __init__(self):
+        self.results = []
+        self.errors = []
+
+    def send_result(self, msg_id, result=None):
+        self.results.append((msg_id, result))
+
+    def send_error(self, msg_id, code, message):
+        self.errors.append((msg_id, code, message))
+
+
+class FakeContent:
+    def __init__(self, chunks, before_chunk=None):
+        self.chunks = chunks
+        self.before_chunk = before_chunk
+
+    async def iter_chunked(self, size):
+        for index, chunk in enumerate(self.chunks):
+            if self.before_chunk is not None:
+                await self.before_chunk(index)
+            yield chunk
+
+
+def _setup(mod, tmp_path):
+    hass = FakeHass()
+    plant = SimpleNamespace(
+        entity_id="plant.basil",
+        unique_id="entry_basil",
+        _attr_entity_picture=None,
+        _plant_info={mod.ATTR_BREEDER: "Seeds Co", mod.ATTR_STRAIN: "Basil"},
+        _images=[],
+        async_write_ha_state=lambda: None,
+    )
+    entry = SimpleNamespace(entry_id="entry_basil", data={mod.FLOW_PLANT_INFO: {}}, options={})
+    config = SimpleNamespace(
+        entry_id="config",
+        data={"is_config": True, mod.FLOW_PLANT_INFO: {mod.FLOW_DOWNLOAD_PATH: str(tmp_path)}},
+        options={},
+    )
+    hass.config_entries.entries = {"config": config, "entry_basil": entry}
+    hass.data[mod.DATA_PLANT_REGISTRY] = SimpleNamespace(
+        get_by_entity_id=lambda entity_id: plant if entity_id == plant.entity_id else None
+    )
+    return hass, plant, entry
+
+
+def test_finish_renames_file_and_updates_entry(tmp_path):
+    mod = load_plant("plant_upload")
+    hass, plant, entry = _setup(mod, tmp_path)
+
+    async def run():
+        uploads = mod.async_get_image_uploads(hass)
+        first = await uploads.async_begin(plant, entry, "photo.JPG")
+        await uploads.async_write(first, b"main")
+        await uploads.async_finish(plant, entry, first)
+        second = await uploads.async_begin(plant, entry, "more.png")
+        await uploads.async_write(second, b"more")
+        await uploads.async_finish(plant, entry, second)
+        return uploads, first, second
+
+    uploads, first, second = asyncio.run(run())
+
+    assert first.final_filename == "Seeds_Co_Basil.JPG"
+    assert (tmp_path / first.final_filename).read_bytes() == b"main"
+    assert (tmp_path / second.final_filename).read_bytes() == b"more"
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(
+        [first.final_filename, second.final_filename]
+    )
+    info = entry.data[mod.FLOW_PLANT_INFO]
+    assert info[mod.ATTR_ENTITY_PICTURE] == "/local/images/plants/Seeds_Co_Basil.JPG"
+    assert info["images"] == [second.final_filename]
+    assert plant._images == [second.final_filename]
+    assert uploads.get(plant.entity_id) is None
+    assert hass.timers == []
+
+
+def test_idle_upload_times_out_and_removes_part_file(tmp_path):
+    mod = load_plant("plant_upload")
+    hass, plant, entry = _setup(mod, tmp_path)
+
+    async def run():
+        uploads = mod.async_get_image_uploads(hass)
+        upload = await uploads.async_begin(plant, entry, "photo.jpg")
+        await uploads.async_write(upload, b"partial")
+        assert [timer.delay for timer in hass.timers] == [mod.IMAGE_UPLOAD_TIMEOUT]
+        await hass.async_fire_timers()
+        return uploads, upload
+
+    uploads, upload = asyncio.run(run())
+
+    assert uploads.get(plant.entity_id) is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_view_aborts_only_its_own_upload(tmp_path):
+    mod = load_plant("plant_upload")
+    hass, plant, entry = _setup(mod, tmp_path)
+    uploads = mod.async_get_image_uploads(hass)
+    newer = []
+
+    async def before_chunk(index):
+        if index == 1:
+            # Ein neuer Upload derselben Pflanze ersetzt den laufenden
+            newer.append(await uploads.async_begin(plant, entry, "other.jpg"))
+
+    request = SimpleNamespace(
+        app={"hass": hass},
+        query={"filename": "photo.jpg"},
+        content_length=None,
+        content=FakeContent([b"a", b"b"], before_chunk),
+    )
+
+    response = asyncio.run(mod.PlantImageUploadView().post(request, plant.entity_id))
+
+    assert response.status == 500
+    assert uploads.get(plant.entity_id) is newer[0]
+    assert [p.name for p in tmp_path.iterdir()] == [f"{newer[0].final_filename}.part"]
+
+
+def test_view_rejects_too_large_images(tmp_path):
+    mod = load_plant("plant_upload")
+    mod.IMAGE_UPLOAD_MAX_SIZE = 10
+    hass, plant, entry = _setup(mod, tmp_path)
+
+    def request(content_length):
+        return SimpleNamespace(
+            app={"hass": hass},
+            query={"filename": "photo.jpg"},
+            content_length=content_length,
+            content=FakeContent([b"12345678", b"12345678"]),
+        )
+
+    view = mod.PlantImageUploadView()
+    declared = asyncio.run(view.post(request(16), plant.entity_id))
+    streamed = asyncio.run(view.post(request(None), plant.entity_id))
+
+    assert declared.status == streamed.status == 413
+    assert mod.async_get_image_uploads(hass).get(plant.entity_id) is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_websocket_chunks_in_order_and_base64(tmp_path):
+    init = load_plant()
+    hass, plant, entry = _setup(init, tmp_path)
+    connection = FakeConnection()
+
+    def chunk(index, data, encoding="base64"):
+        payload = base64.b64encode(data).decode() if encoding == "base64" else data.hex()
+        msg = {
+            "id": index + 1,
+            "entity_id": plant.entity_id,
+            "filename": "photo.jpg",
+            "chunk": payload,
+            "chunk_index": index,
+            "total_chunks": 3,
+            "encoding": encoding,
+        }
+        return init.ws_upload_image(hass, connection, msg)
+
+    async def run():
+        await chunk(0, b"abc")
+        # Übersprungener Chunk wird abgelehnt, die Session bleibt erhalten
+        await chunk(2, b"xyz")
+        await chunk(1, b"def", encoding="hex")
+        await chunk(2, b"ghi")
+
+    asyncio.run(run())
+
+    assert [error[2] for error in connection.errors] == ["Expected chunk 1, got 2"]
+    assert [result[1]["chunk_index"] for result in connection.results] == [0, 1, 2]
+    assert (tmp_path / "Seeds_Co_Basil.jpg").read_bytes() == b"abcdefghi"
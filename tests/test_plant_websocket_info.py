@@ -0,0 +1,264 @@
+import asyncio
+from types import SimpleNamespace
+
+from ha_stubs import FakeHass, load_plant
+
+
+class FakeConnection:
+    def __init__(self):
+        self.results = []
+        self.errors = []
+        self.messages = []
+        self.subscriptions = {}
+
+    def send_result(self, msg_id, result=None):
+        self.results.append((msg_id, result))
+
+    def send_error(self, msg_id, code, message):
+        self.errors.append((msg_id, code, message))
+
+    def send_message(self, message):
+        self.messages.append(message)
+
+
+def _plant_class(init):
+    class Plant(init.PlantDevice):
+        """PlantDevice with a small snapshot instead of all its entities."""
+
+        builds = 0
+        moisture = "40"
+
+        @property
+        def unique_id(self):
+            # Wie homeassistant.helpers.entity.Entity
+            return self._attr_unique_id
+
+        @property
+        def threshold_entities(self):
+            return []
+
+        def _build_websocket_info(self):
+            self.builds += 1
+            return {
+                "entity_id": self.entity_id,
+                "name": self.name,
+                "moisture": {"current": self.moisture, "sensor": "sensor.moisture"},
+                "diagnostic_sensors": {},
+                "helpers": {},
+            }
+
+    return Plant
+
+
+def _setup(init, names=("Basil",)):
+    hass = FakeHass()
+    hass.data[init.DOMAIN] = {}
+    registry = init.PlantRegistry()
+    hass.data[init.DATA_PLANT_REGISTRY] = registry
+    Plant = _plant_class(init)
+    plants = []
+    for name in names:
+        entry = SimpleNamespace(
+            entry_id=f"entry_{name}",
+            data={init.FLOW_PLANT_INFO: {init.ATTR_NAME: name}},
+            options={},
+        )
+        plant = Plant(hass, entry)
+        plant.hass = hass
+        plant.plant_complete = True
+        registry.register(entry.entry_id, plant)
+        plants.append(plant)
+    return hass, registry, plants
+
+
+def test_snapshot_is_reused_until_a_tracked_entity_changes():
+    init = load_plant()
+    hass, _, (plant,) = _setup(init)
+
+    first = plant.websocket_info
+    version = plant.websocket_info_version
+    assert plant.websocket_info is first
+    assert plant.websocket_info_version == version
+    assert plant.builds == 1
+    assert hass.trackers[0][0] == {plant.entity_id, "sensor.moisture"}
+
+    # Andere Entities verwerfen den Snapshot nicht
+    hass.fire_state_changed("sensor.other")
+    assert plant.websocket_info is first
+
+    plant.moisture = "35"
+    hass.fire_state_changed("sensor.moisture")
+    second = plant.websocket_info
+    assert second["moisture"]["current"] == "35"
+    assert plant.builds == 2
+    assert plant.websocket_info_version > version
+    # Gleiche Entities: keine neue Verfolgung
+    assert len(hass.trackers) == 1
+
+
+def test_get_info_answers_not_modified_for_the_current_version():
+    init = load_plant()
+    hass, _, (plant,) = _setup(init)
+    connection = FakeConnection()
+
+    def get_info(msg_id, **msg):
+        init.ws_get_info(
+            hass, connection, {"id": msg_id, "entity_id": plant.entity_id, **msg}
+        )
+        return connection.results[-1][1]
+
+    full = get_info(1)
+    version = full["version"]
+    assert full["result"]["moisture"]["current"] == "40"
+    assert get_info(2, if_version=version) == {"not_modified": True, "version": version}
+    assert get_info(3, fields=["moisture.current"]) == {
+        "result": {"moisture": {"current": "40"}},
+        "version": version,
+    }
+
+    hass.fire_state_changed(plant.entity_id)
+    changed = get_info(4, if_version=version)
+    assert "not_modified" not in changed
+    assert changed["version"] > version
+    assert connection.errors == []
+
+
+def _reload(init, hass, registry, plant):
+    """Set up a new PlantDevice for the config entry of plant, like a reload."""
+    new_plant = _plant_class(init)(hass, plant._config)
+    new_plant.hass = hass
+    new_plant.plant_complete = True
+    registry.register(plant._config.entry_id, new_plant)
+    init.async_plant_added(hass, new_plant)
+    return new_plant
+
+
+def test_subscription_follows_a_reloaded_plant():
+    init = load_plant()
+    hass, registry, (plant,) = _setup(init)
+    connection = FakeConnection()
+    events = []
+
+    async def flush():
+        await hass.async_fire_timers()
+        events.extend(message["event"] for message in connection.messages)
+        connection.messages.clear()
+
+    async def run():
+        init.ws_subscribe_info(
+            hass, connection, {"id": 1, "entity_ids": [plant.entity_id]}
+        )
+        await flush()
+
+        await plant.async_will_remove_from_hass()
+        registry.unregister(plant._config.entry_id)
+        assert plant._info_listeners == []
+        await flush()
+
+        new_plant = _reload(init, hass, registry, plant)
+        new_plant.moisture = "30"
+        await flush()
+
+        # Der alte PlantDevice meldet nichts mehr
+        plant.invalidate_websocket_info()
+        new_plant.moisture = "25"
+        hass.fire_state_changed("sensor.moisture")
+        await flush()
+        return new_plant
+
+    new_plant = asyncio.run(run())
+
+    entity_id = plant.entity_id
+    snapshot, removed, added, changed = events
+    assert snapshot["snapshots"][entity_id]["info"]["moisture"]["current"] == "40"
+    assert removed == {"removed": [entity_id]}
+    assert list(added) == ["snapshots"]
+    assert added["snapshots"][entity_id]["info"]["moisture"]["current"] == "30"
+    assert changed["changes"][entity_id] == {
+        "version": new_plant.websocket_info_version,
+        "patch": [{"op": "replace", "path": "/moisture/current", "value": "25"}],
+    }
+    assert added["snapshots"][entity_id]["version"] < new_plant.websocket_info_version
+
+
+def test_fast_reload_only_sends_the_changes():
+    init = load_plant()
+    hass, registry, (plant,) = _setup(init)
+    connection = FakeConnection()
+
+    async def run():
+        init.ws_subscribe_info(
+            hass, connection, {"id": 1, "entity_ids": [plant.entity_id]}
+        )
+        await hass.async_fire_timers()
+        connection.messages.clear()
+        # Entfernen und Hinzufügen vor dem nächsten Senden
+        await plant.async_will_remove_from_hass()
+        new_plant = _reload(init, hass, registry, plant)
+        new_plant.moisture = "30"
+        await hass.async_fire_timers()
+
+    asyncio.run(run())
+
+    (message,) = connection.messages
+    assert list(message["event"]) == ["changes"]
+    assert message["event"]["changes"][plant.entity_id]["patch"] == [
+        {"op": "replace", "path": "/moisture/current", "value": "30"}
+    ]
+
+
+def test_get_all_info_filters():
+    init = load_plant()
+    hass = FakeHass()
+    hass.data[init.DOMAIN] = {}
+    registry = init.PlantRegistry()
+    hass.data[init.DATA_PLANT_REGISTRY] = registry
+    Plant = _plant_class(init)
+    areas = {}
+
+    def add(name, device_type=init.DEVICE_TYPE_PLANT, area=None, cycle=None, complete=True):
+        entry = SimpleNamespace(
+            entry_id=f"entry_{name}",
+            data={init.FLOW_PLANT_INFO: {init.ATTR_NAME: name, init.ATTR_DEVICE_TYPE: device_type}},
+            options={},
+        )
+        plant = Plant(hass, entry)
+        plant.hass = hass
+        plant.plant_complete = complete
+        plant._device_id = f"device_{name}"
+        registry.register(entry.entry_id, plant)
+        areas[plant.device_id] = SimpleNamespace(area_id=area)
+        if cycle is not None:
+            registry.set_via_device(plant.device_id, cycle.device_id)
+        return plant
+
+    hass.device_registry = SimpleNamespace(async_get=areas.get)
+    grow = add("Grow", init.DEVICE_TYPE_CYCLE, area="tent")
+    basil = add("Basil", area="kitchen", cycle=grow)
+    add("Mint", area="kitchen", cycle=grow, complete=False)
+    sage = add("Sage", area="garden")
+    connection = FakeConnection()
+
+    def get_all(**msg):
+        init.ws_get_all_info(hass, connection, {"id": 1, **msg})
+        return sorted(connection.results[-1][1]["plants"])
+
+    # Noch nicht eingerichtete Pflanzen fehlen
+    assert get_all() == sorted([grow.entity_id, basil.entity_id, sage.entity_id])
+    assert get_all(device_type=init.DEVICE_TYPE_CYCLE) == [grow.entity_id]
+    assert get_all(device_type=init.DEVICE_TYPE_PLANT) == sorted([basil.entity_id, sage.entity_id])
+    assert get_all(area_id="kitchen") == [basil.entity_id]
+    assert get_all(cycle=grow.entity_id) == [basil.entity_id]
+    assert get_all(cycle=grow.entity_id, area_id="garden") == []
+    assert get_all(cycle=grow.entity_id, device_type=init.DEVICE_TYPE_CYCLE) == []
+
+    init.ws_get_all_info(
+        hass, connection, {"id": 2, "cycle": grow.entity_id, "fields": ["moisture.current"]}
+    )
+    assert connection.results[-1][1]["plants"][basil.entity_id] == {
+        "version": basil.websocket_info_version,
+        "info": {"moisture": {"current": "40"}},
+    }
+
+    init.ws_get_all_info(hass, connection, {"id": 3, "cycle": sage.entity_id})
+    assert connection.errors == [(3, "entity_not_found", f"Cycle {sage.entity_id} not found")]
@@ -0,0 +1,164 @@
+import importlib.machinery
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+
+def _load_plant_windows_module():
+    path = Path("custom_components/plant/plant_windows.py").resolve()
+    name = "plant_windows_testmod"
+    loader = importlib.machinery.SourceFileLoader(name, str(path))
+    spec = importlib.util.spec_from_loader(loader.name, loader)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def test_time_window_evicts_old_samples():
+    mod = _load_plant_windows_module()
+    window = mod.TimeWindow(100)
+
+    window.append(1000.0, 1.0)
+    window.append(1050.0, 2.0)
+    window.append(1100.0, 3.0)
+    # Genau auf der Grenze bleibt der Wert erhalten
+    assert len(window) == 3
+    assert window.first() == (1000.0, 1.0)
+
+    window.append(1101.0, 4.0)
+    assert len(window) == 3
+    assert window.first() == (1050.0, 2.0)
+    assert window.last() == (1101.0, 4.0)
+
+
+def test_time_window_empty_and_clear():
+    mod = _load_plant_windows_module()
+    window = mod.TimeWindow(10)
+
+    with pytest.raises(IndexError):
+        window.first()
+    window.append(1.0, 1.0)
+    window.clear()
+    assert len(window) == 0
+    with pytest.raises(IndexError):
+        window.last()
+
+
+def test_time_window_compacts_buffers():
+    mod = _load_plant_windows_module()
+    window = mod.TimeWindow(60)
+
+    # 1 Hz über mehrere Stunden: Speicher bleibt auf das Fenster begrenzt
+    for second in range(5 * 3600):
+        window.append(float(second), float(second))
+    assert len(window) == 61
+    assert len(window.times) <= 2 * 61 + 64
+    assert window.first() == (float(5 * 3600 - 61), float(5 * 3600 - 61))
+
+
+def test_drop_accumulator_sums_only_decreases():
+    mod = _load_plant_windows_module()
+    drops = mod.DropAccumulator()
+
+    assert drops.add(50.0) == 0.0
+    assert drops.add(45.0) == 5.0
+    assert drops.add(60.0) == 0.0  # Gießen
+    assert drops.add(57.5) == 2.5
+    assert drops.total == 7.5
+    assert drops.samples == 4
+    assert drops.last_value == 57.5
+
+    drops.reset()
+    assert drops.total == 0.0
+    assert drops.add(10.0) == 0.0
+
+
+def test_drop_accumulator_rising():
+    mod = _load_plant_windows_module()
+    rises = mod.DropAccumulator(rising=True)
+
+    for value in (1000, 1200, 1100, 1500):
+        rises.add(float(value))
+    assert rises.total == 600.0
+
+
+def test_drop_window_matches_rescan():
+    mod = _load_plant_windows_module()
+    window = mod.DropWindow(3600)
+    samples = []
+    value = 60.0
+
+    for step in range(3000):
+        timestamp = step * 7.0
+        # Langsames Austrocknen, gelegentlich gießen
+        value = 70.0 if step % 400 == 0 else value - (step % 3) * 0.1
+        window.append(timestamp, value)
+        samples.append((timestamp, value))
+        samples = [(t, v) for t, v in samples if t >= timestamp - 3600]
+
+        expected = sum(
+            max(0.0, samples[i - 1][1] - samples[i][1]) for i in range(1, len(samples))
+        )
+        assert abs(window.total - expected) < 1e-6
+        assert len(window) == len(samples)
+
+
+def test_drop_window_gap_longer_than_window():
+    mod = _load_plant_windows_module()
+    window = mod.DropWindow(100)
+
+    window.append(0.0, 50.0)
+    window.append(10.0, 40.0)
+    assert window.total == 10.0
+
+    # Nach einer langen Pause bleibt nur der neue Wert übrig
+    window.append(1000.0, 20.0)
+    assert len(window) == 1
+    assert window.total == 0.0
+
+
+def test_window_snapshot_roundtrip():
+    mod = _load_plant_windows_module()
+    window = mod.TimeWindow(100)
+    for second in range(0, 300, 10):
+        window.append(float(second), second / 10)
+
+    data = window.to_bytes()
+    # Header + zwei float64 Spalten
+    assert len(data) == 6 + len(window) * 16
+
+    restored = mod.TimeWindow(100)
+    restored.load_bytes(data)
+    assert len(restored) == len(window)
+    assert restored.first() == window.first()
+    assert restored.last() == window.last()
+
+
+def test_drop_window_snapshot_keeps_running_sum():
+    mod = _load_plant_windows_module()
+    window = mod.DropWindow(100)
+    for second, value in enumerate((50, 48, 47, 60, 55, 54)):
+        window.append(second * 30.0, float(value))
+
+    restored = mod.DropWindow(100)
+    restored.load_bytes(window.to_bytes())
+    assert restored.total == window.total
+    restored.append(200.0, 50.0)
+    window.append(200.0, 50.0)
+    assert restored.total == window.total
+
+
+def test_window_snapshot_rejects_other_layout():
+    mod = _load_plant_windows_module()
+    window = mod.TimeWindow(100)
+    window.append(1.0, 1.0)
+
+    with pytest.raises(ValueError):
+        mod.DropWindow(100).load_bytes(window.to_bytes())
+    with pytest.raises(ValueError):
+        mod.TimeWindow(100).load_bytes(window.to_bytes()[:-1])
+    with pytest.raises(ValueError):
+        mod.TimeWindow(100).load_bytes(b"")
@@ -28,6 +28,8 @@ def test_apply_rounding_for_temperature_humidity_illuminance():
         STATE_UNAVAILABLE="unavailable",
         STATE_OK="ok",
         STATE_PROBLEM="problem",
+        EVENT_HOMEASSISTANT_STARTED="homeassistant_started",
+        EVENT_HOMEASSISTANT_STOP="homeassistant_stop",
         UnitOfConductivity=SimpleNamespace(MICROSIEMENS_PER_CM="μS/cm"),
         UnitOfTemperature=SimpleNamespace(CELSIUS="°C"),
         UnitOfTime=SimpleNamespace(HOURS="h"),
@@ -41,7 +43,9 @@ def test_apply_rounding_for_temperature_humidity_illuminance():
         SensorEntity=object,
         SensorStateClass=SimpleNamespace(MEASUREMENT="m"),
     )
-    sys.modules["homeassistant.core"] = SimpleNamespace(HomeAssistant=object, callback=lambda f: f)
+    sys.modules["homeassistant.core"] = SimpleNamespace(
+        HomeAssistant=object, State=object, CALLBACK_TYPE=object, callback=lambda f: f
+    )
     sys.modules["homeassistant.helpers.entity"] = SimpleNamespace(
         Entity=object,
         EntityCategory=SimpleNamespace(DIAGNOSTIC="diagnostic"),
@@ -57,10 +61,14 @@ def test_apply_rounding_for_temperature_humidity_illuminance():
     )
     sys.modules["homeassistant.components.utility_meter.sensor"] = SimpleNamespace(UtilityMeterSensor=object)
     sys.modules["homeassistant.helpers.dispatcher"] = SimpleNamespace(async_dispatcher_connect=lambda *a, **k: None)
-    sys.modules["homeassistant.helpers.event"] = SimpleNamespace(async_track_state_change_event=lambda *a, **k: None, async_call_later=lambda *a, **k: None)
+    sys.modules["homeassistant.helpers.event"] = SimpleNamespace(async_track_state_change_event=lambda *a, **k: None, async_call_later=lambda *a, **k: None, async_track_time_interval=lambda *a, **k: None)
     sys.modules["homeassistant.util.dt"] = SimpleNamespace(utcnow=lambda: None)
     sys.modules["homeassistant.util"] = SimpleNamespace(dt=sys.modules["homeassistant.util.dt"])  # stub package for 'from homeassistant.util import dt'
-    sys.modules["homeassistant.components.recorder"] = SimpleNamespace(history=object, get_instance=lambda: None)
+    sys.modules["homeassistant.components.http"] = SimpleNamespace(HomeAssistantView=object)
+    sys.modules["homeassistant.exceptions"] = SimpleNamespace(HomeAssistantError=Exception)
+    sys.modules["homeassistant.components.recorder"] = SimpleNamespace(
+        history=object, statistics=object, get_instance=lambda: None
+    )
     sys.modules["homeassistant.config_entries"] = SimpleNamespace(ConfigEntry=object, SOURCE_IMPORT="import")
     sys.modules["homeassistant.helpers.entity_platform"] = SimpleNamespace(AddEntitiesCallback=object)
     # Stub voluptuous for __init__ import chain
@@ -55,6 +55,8 @@ def test_plant_device_decimals_for_with_overrides():
     setattr(dummy_ha_const, "STATE_PROBLEM", "problem")
     setattr(dummy_ha_const, "STATE_UNAVAILABLE", "unavailable")
     setattr(dummy_ha_const, "STATE_UNKNOWN", "unknown")
+    setattr(dummy_ha_const, "EVENT_HOMEASSISTANT_STARTED", "homeassistant_started")
+    setattr(dummy_ha_const, "EVENT_HOMEASSISTANT_STOP", "homeassistant_stop")
     sys.modules["homeassistant.const"] = dummy_ha_const
 
     # Stub websocket_api used in __init__
@@ -73,7 +75,9 @@ def test_plant_device_decimals_for_with_overrides():
     sys.modules["homeassistant.components.integration.sensor"] = SimpleNamespace(IntegrationSensor=object)
     # Stub additional HA modules referenced in __init__
     sys.modules["homeassistant.config_entries"] = SimpleNamespace(SOURCE_IMPORT="import", ConfigEntry=object)
-    sys.modules["homeassistant.core"] = SimpleNamespace(HomeAssistant=object, callback=lambda f: f)
+    sys.modules["homeassistant.core"] = SimpleNamespace(
+        HomeAssistant=object, State=object, CALLBACK_TYPE=object, callback=lambda f: f
+    )
     # Provide helpers subpackages used in __init__ imports
     sys.modules["homeassistant.helpers.config_validation"] = SimpleNamespace()
     # Create helpers package root to satisfy 'from homeassistant.helpers import (...)'
@@ -96,8 +100,12 @@ def test_plant_device_decimals_for_with_overrides():
     )
     sys.modules["homeassistant.helpers.storage"] = SimpleNamespace(Store=object)
     sys.modules["homeassistant.helpers.event"] = SimpleNamespace(
-        async_call_later=lambda *args, **kwargs: None
+        async_call_later=lambda *args, **kwargs: None,
+        async_track_state_change_event=lambda *args, **kwargs: None,
+        async_track_time_interval=lambda *args, **kwargs: None,
     )
+    sys.modules["homeassistant.components.http"] = SimpleNamespace(HomeAssistantView=object)
+    sys.modules["homeassistant.exceptions"] = SimpleNamespace(HomeAssistantError=Exception)
     # Provide components root with websocket_api
     dummy_components = type(sys)("homeassistant.components")
     setattr(dummy_components, "websocket_api", dummy_ws)